@@ -0,0 +1,272 @@
+#  Copyright (c) 2017 Jon Cooper
+#
+#  This file is part of pygame-xbox360controller.
+#  Documentation, related files, and licensing can be found at
+#
+#      <https://github.com/joncoop/pygame-xbox360controller>.
+
+
+import json
+import os
+
+import xbox360_controller
+
+# d-pad directions, in the order of ControllerState.pad
+PAD_DIRECTIONS = ("PAD_UP", "PAD_RIGHT", "PAD_DOWN", "PAD_LEFT")
+
+# analog inputs, in the order update() reads them from the state
+ANALOG_INPUTS = ("LEFT_STICK_X", "LEFT_STICK_Y", "RIGHT_STICK_X", "RIGHT_STICK_Y",
+                 "LEFT_TRIGGER", "RIGHT_TRIGGER", "TRIGGERS")
+
+# Bit positions in the input mask. Buttons use their button numbers, and the
+# d-pad and analog thresholds go above them.
+PAD_SHIFT = 32
+THRESHOLD_SHIFT = PAD_SHIFT + len(PAD_DIRECTIONS)
+
+
+class ActionMap:
+    """
+    Maps named actions such as "jump" or "move_x" to the inputs that trigger
+    them, so games don't need to check physical buttons and players can rebind
+    them.
+
+    A binding is a string naming one input:
+
+        "A", "START", "PAD_UP"      a button or d-pad direction
+        "LEFT_STICK_X", "TRIGGERS"  an analog input, as its value
+        "RIGHT_TRIGGER>0.5"         an analog input past a threshold
+        "LEFT_STICK_Y<-0.5"
+        "LEFT_BUMP+A"               a chord, held together
+        "-PAD_LEFT"                 a leading - negates the value
+
+    Buttons, d-pad directions, thresholds and chords give 1 when active. An
+    action can have several bindings, and its value is whichever is furthest
+    from 0. LEFT_TRIGGER and RIGHT_TRIGGER go from 0 to 1 and TRIGGERS is the
+    combined value of get_triggers(). Windows with pygame 1 reports both
+    triggers on one axis, so there pulling both triggers releases both
+    LEFT_TRIGGER and RIGHT_TRIGGER.
+
+    The bindings are compiled into flat tables when they are set, so update()
+    resolves every action in one pass over the controller state.
+    """
+
+    def __init__(self, bindings=None, layout=None):
+        """
+        Args:
+            bindings: A dict mapping action names to a binding string or a list
+                of them. (default None)
+            layout: The Layout that gives the button numbers. If None, the
+                current platform's is used. (default None)
+        """
+
+        self.layout = layout if layout is not None else xbox360_controller.get_layout()
+        self.path = None
+        self.mtime = None
+
+        self.indices = {}
+        self.values = []
+        self.mask = 0
+
+        self.bind(bindings or {})
+
+    def bind(self, bindings):
+        """
+        Replaces every binding. The values of actions that are still bound carry
+        over, so this can be done mid-game.
+
+        Args:
+            bindings: A dict mapping action names to a binding string or a list
+                of them.
+        """
+
+        names = list(bindings)
+        indices = {name: index for index, name in enumerate(names)}
+
+        thresholds = []
+        digital = []
+        analog = []
+
+        for name, specs in bindings.items():
+            if isinstance(specs, str):
+                specs = [specs]
+
+            for spec in specs:
+                self._compile(indices[name], name, spec, thresholds, digital, analog)
+
+        values = [0.0] * len(names)
+        mask = 0
+        for name, index in indices.items():
+            if name in self.indices:
+                old_index = self.indices[name]
+                values[index] = self.values[old_index]
+                mask |= (self.mask >> old_index & 1) << index
+
+        # everything update() needs is swapped in at once
+        self.names = names
+        self.indices = indices
+        self.thresholds = tuple(thresholds)
+        self.digital = tuple(digital)
+        self.analog = tuple(analog)
+        self.zeros = [0.0] * len(names)
+        self.values = values
+        self.mask = self.previous_mask = mask
+
+    def load(self, path):
+        """
+        Sets the bindings from a JSON file of the dict passed to bind(). The file
+        is remembered for reload().
+        """
+
+        with open(path) as f:
+            bindings = json.load(f)
+
+        self.bind(bindings)
+        self.path = path
+        self.mtime = os.path.getmtime(path)
+
+    def reload(self):
+        """
+        Loads the bindings file again if it has changed since it was loaded.
+
+        Returns:
+            True if the bindings were reloaded, False otherwise.
+        """
+
+        if self.path is None:
+            return False
+
+        mtime = os.path.getmtime(self.path)
+        if mtime == self.mtime:
+            return False
+
+        self.load(self.path)
+
+        return True
+
+    def update(self, state):
+        """
+        Resolves every action from a controller's state. Call this once per
+        frame.
+
+        Args:
+            state: A ControllerState, e.g. the result of Controller.poll().
+
+        Returns:
+            The list of action values, in the order the actions were bound. The
+            same list is reused every frame.
+        """
+
+        up, right, down, left = state.pad
+        mask = state.button_mask | (up | right << 1 | down << 2 | left << 3) << PAD_SHIFT
+
+        analog = (*state.left_stick, *state.right_stick,
+                  state.left_trigger, state.right_trigger, state.triggers)
+
+        for bit, source, above, limit in self.thresholds:
+            value = analog[source]
+            if (value > limit) if above else (value < limit):
+                mask |= bit
+
+        values = self.values
+        values[:] = self.zeros
+        active = 0
+
+        for index, bit, required, sign in self.digital:
+            if mask & required == required:
+                values[index] = sign
+                active |= bit
+
+        for index, bit, source, sign in self.analog:
+            value = analog[source] * sign
+            if value:
+                active |= bit
+                if abs(value) > abs(values[index]):
+                    values[index] = value
+
+        self.previous_mask = self.mask
+        self.mask = active
+
+        return values
+
+    def get(self, action):
+        """
+        Returns:
+            The value of an action as of the last update(). Digital actions are
+            1 or 0.
+        """
+
+        return self.values[self.indices[action]]
+
+    def is_active(self, action):
+        return self.mask >> self.indices[action] & 1 == 1
+
+    def just_activated(self, action):
+        """
+        Returns:
+            True if the action became active on the last update().
+        """
+
+        bit = 1 << self.indices[action]
+
+        return self.mask & ~self.previous_mask & bit != 0
+
+    def just_deactivated(self, action):
+        bit = 1 << self.indices[action]
+
+        return self.previous_mask & ~self.mask & bit != 0
+
+    def _compile(self, index, name, spec, thresholds, digital, analog):
+        sign = 1.0
+        if spec.startswith("-"):
+            sign = -1.0
+            spec = spec[1:]
+
+        parts = spec.split("+")
+
+        # a lone analog input is read as its value
+        if len(parts) == 1 and parts[0].strip() in ANALOG_INPUTS:
+            analog.append((index, 1 << index, ANALOG_INPUTS.index(parts[0].strip()), sign))
+            return
+
+        required = 0
+
+        for part in parts:
+            part = part.strip()
+
+            if ">" in part or "<" in part:
+                comparison = ">" if ">" in part else "<"
+                input_name, limit = part.split(comparison)
+                input_name = input_name.strip()
+
+                if input_name not in ANALOG_INPUTS:
+                    raise ValueError("unknown analog input {!r} in binding {!r} for action {!r}".format(
+                        input_name, spec, name))
+
+                try:
+                    limit = float(limit)
+                except ValueError:
+                    raise ValueError("bad threshold in binding {!r} for action {!r}".format(
+                        spec, name)) from None
+
+                # identical thresholds share a bit
+                threshold = (ANALOG_INPUTS.index(input_name), comparison == ">", limit)
+                for bit, *existing in thresholds:
+                    if tuple(existing) == threshold:
+                        break
+                else:
+                    bit = 1 << (THRESHOLD_SHIFT + len(thresholds))
+                    thresholds.append((bit, *threshold))
+
+                required |= bit
+            elif part in PAD_DIRECTIONS:
+                required |= 1 << (PAD_SHIFT + PAD_DIRECTIONS.index(part))
+            elif part in self.layout.buttons:
+                required |= 1 << self.layout.buttons[part]
+            elif part in ANALOG_INPUTS:
+                raise ValueError("analog input {!r} in chord {!r} for action {!r} needs a threshold".format(
+                    part, spec, name))
+            else:
+                raise ValueError("unknown input {!r} in binding {!r} for action {!r}".format(
+                    part, spec, name))
+
+        digital.append((index, 1 << index, required, sign))
@@ -0,0 +1,277 @@
+#  Copyright (c) 2017 Jon Cooper
+#
+#  This file is part of pygame-xbox360controller.
+#  Documentation, related files, and licensing can be found at
+#
+#      <https://github.com/joncoop/pygame-xbox360controller>.
+
+
+"""
+Benchmarks the Controller read path against virtual joysticks, so no hardware
+or display is needed. Every platform layout is measured regardless of the
+platform it runs on. A visualizer frame is measured by drawing its panel to an
+offscreen surface. Results are written as JSON so runs can be compared.
+
+    python benchmark.py --output results.json
+    python benchmark.py --compare old.json results.json
+"""
+
+import argparse
+import itertools
+import json
+import platform
+import sys
+import timeit
+import tracemalloc
+
+import pygame
+import visualizer
+import xbox360_controller
+
+PLATFORMS = {"linux": xbox360_controller.LINUX,
+             "mac": xbox360_controller.MAC,
+             "windows": xbox360_controller.WINDOWS}
+
+PYGAME_VERSIONS = (1, 2)
+
+CONTROLLER_COUNTS = (1, 4, 8, 16)
+
+GETTERS = ("get_buttons", "get_left_stick", "get_right_stick", "get_triggers", "get_pad", "poll")
+
+
+def make_controllers(platform_id, pygame_version, count):
+    """
+    Returns:
+        count Controllers using the given platform's layout, each reading from a
+        VirtualJoystick with some inputs held.
+    """
+
+    layout = xbox360_controller.LAYOUTS[platform_id, pygame_version]
+    controllers = []
+
+    for i in range(count):
+        joystick = xbox360_controller.VirtualJoystick(i)
+        joystick.press(0)
+        joystick.set_axis(0, 0.5)
+        joystick.set_axis(4, -0.75)
+        joystick.set_hat((1, 0))
+        controllers.append(xbox360_controller.Controller(joystick=joystick, layout=layout))
+
+    return controllers
+
+
+def time_call(function, number, repeat):
+    """
+    Returns:
+        The best time for one call to function, in nanoseconds.
+    """
+
+    best = min(timeit.Timer(function).repeat(repeat, number))
+
+    return best / number * 1e9
+
+
+def measure_allocations(function, number):
+    """
+    tracemalloc only sees memory that is still allocated, so blocks that are
+    allocated and freed within a call show up in the peak but aren't counted.
+
+    Returns:
+        A tuple of the most memory, in bytes, allocated above the starting point
+        during any one call to function, and the average number of memory blocks
+        each call left allocated.
+    """
+
+    function()
+    tracemalloc.start()
+    peak = 0
+
+    try:
+        before = tracemalloc.take_snapshot()
+
+        for _ in range(number):
+            start = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            function()
+            peak = max(peak, tracemalloc.get_traced_memory()[1] - start)
+
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+
+    # the snapshots' own bookkeeping isn't part of function
+    ignore = [tracemalloc.Filter(False, tracemalloc.__file__)]
+    before = before.filter_traces(ignore)
+    after = after.filter_traces(ignore)
+    blocks = sum(stat.count_diff for stat in after.compare_to(before, "lineno"))
+
+    return peak, max(blocks, 0) / number
+
+
+def result(function, number, repeat):
+    nanoseconds = time_call(function, number, repeat)
+    peak, blocks = measure_allocations(function, min(number, 1000))
+
+    return {"ns_per_call": round(nanoseconds, 1),
+            "calls_per_second": round(1e9 / nanoseconds),
+            "peak_alloc_bytes": peak,
+            "retained_blocks_per_call": round(blocks, 2)}
+
+
+def legacy_frame(controllers):
+    # what games do without poll(): every getter hits the joystick
+    def frame():
+        for controller in controllers:
+            controller.get_buttons()
+            controller.get_left_stick()
+            controller.get_right_stick()
+            controller.get_triggers()
+            controller.get_pad()
+
+    return frame
+
+
+def polled_frame(controllers):
+    # one poll() per controller, then the getters are served from the snapshot
+    def frame():
+        for controller in controllers:
+            controller.poll()
+            controller.get_buttons()
+            controller.get_left_stick()
+            controller.get_right_stick()
+            controller.get_triggers()
+            controller.get_pad()
+
+    return frame
+
+
+def panel_frame(controller, moving):
+    """
+    Returns:
+        A function that polls controller and redraws a visualizer panel with its
+        state on an offscreen surface, like one frame of visualizer.py. If moving
+        is True, the left stick, triggers and A button change every frame.
+    """
+
+    panel = visualizer.ControllerPanel(pygame.Surface(visualizer.PANEL_SIZE))
+    panel.draw_static()
+
+    joystick = controller.joystick
+    stick_x = controller.left_stick_axes[0]
+    trigger = controller.trigger_axes[0]
+    a = controller.layout.buttons["A"]
+
+    # enough distinct values to cycle through the text cache
+    values = [n / 100 - 1 for n in range(201)]
+    frames = itertools.count()
+
+    def frame():
+        if moving:
+            n = next(frames)
+            joystick.set_axis(stick_x, values[n % len(values)])
+            joystick.set_axis(trigger, values[-1 - n % len(values)])
+            if n % 2:
+                joystick.press(a)
+            else:
+                joystick.release(a)
+
+        panel.update(controller.poll())
+
+    return frame
+
+
+def run(number, repeat):
+    """
+    Returns:
+        A dict of results keyed by "platform/pygame version", then by benchmark
+        name.
+    """
+
+    results = {}
+
+    for platform_name, platform_id in PLATFORMS.items():
+        for pygame_version in PYGAME_VERSIONS:
+            branch = {}
+
+            controller = make_controllers(platform_id, pygame_version, 1)[0]
+            for getter in GETTERS:
+                branch[getter] = result(getattr(controller, getter), number, repeat)
+
+            branch["dead_zone_adjustment"] = result(lambda: controller.dead_zone_adjustment(0.5),
+                                                    number, repeat)
+
+            for count in CONTROLLER_COUNTS:
+                # Fresh controllers, since polling switches the getters to the
+                # snapshot.
+                controllers = make_controllers(platform_id, pygame_version, count)
+                frame_number = max(number // count, 1)
+
+                branch["legacy_frame_x{}".format(count)] = result(legacy_frame(controllers),
+                                                                   frame_number, repeat)
+
+                controllers = make_controllers(platform_id, pygame_version, count)
+                branch["polled_frame_x{}".format(count)] = result(polled_frame(controllers),
+                                                                   frame_number, repeat)
+
+            results["{}/pygame{}".format(platform_name, pygame_version)] = branch
+
+    # The panel reads buttons by this platform's numbers, so it uses this
+    # platform's layout.
+    frame_number = max(number // 10, 1)
+    branch = {}
+    for name, moving in (("panel_idle_frame", False), ("panel_moving_frame", True)):
+        controller = xbox360_controller.Controller(joystick=xbox360_controller.VirtualJoystick(0))
+        branch[name] = result(panel_frame(controller, moving), frame_number, repeat)
+    results["visualizer"] = branch
+
+    return results
+
+
+def compare(old_path, new_path):
+    """
+    Prints the change in time per call for every benchmark in both files.
+    """
+
+    with open(old_path) as f:
+        old = json.load(f)["results"]
+    with open(new_path) as f:
+        new = json.load(f)["results"]
+
+    for branch in sorted(set(old) & set(new)):
+        for name in sorted(set(old[branch]) & set(new[branch])):
+            before = old[branch][name]["ns_per_call"]
+            after = new[branch][name]["ns_per_call"]
+            print("{:<20} {:<24} {:>10.1f} ns -> {:>10.1f} ns  ({:+.1%})".format(
+                branch, name, before, after, after / before - 1))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the xbox360_controller read path.")
+    parser.add_argument("--output", help="write results to this JSON file instead of stdout")
+    parser.add_argument("--number", type=int, default=10000, help="calls per timing run")
+    parser.add_argument("--repeat", type=int, default=5, help="timing runs per benchmark; the best is kept")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="compare two result files")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    report = {"python": sys.version.split()[0],
+              "pygame": pygame.version.ver,
+              "machine": platform.platform(),
+              "number": args.number,
+              "repeat": args.repeat,
+              "results": run(args.number, args.repeat)}
+
+    text = json.dumps(report, indent=2, sort_keys=True)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+#  Copyright (c) 2017 Jon Cooper
+#
+#  This file is part of pygame-xbox360controller.
+#  Documentation, related files, and licensing can be found at
+#
+#      <https://github.com/joncoop/pygame-xbox360controller>.
+
+
+import json
+import os
+
+import xbox360_controller
+
+
+class Calibration:
+    """
+    The measured range of every axis on one pad. Sticks are recorded as the
+    lowest value, the value at rest (the center) and the highest value. Triggers
+    are recorded the same way, where the rest value is the fully released
+    position.
+    """
+
+    def __init__(self, axes=None, name=None):
+        """
+        Args:
+            axes: A dict mapping axis numbers to (low, rest, high) tuples. Axes
+                that aren't included are left as they are. (default None)
+            name: The name of the pad, for reference. (default None)
+        """
+
+        self.axes = dict(axes or {})
+        self.name = name
+
+    def compile(self, layout):
+        """
+        Works out the correction for every axis so that each read only needs a
+        subtraction, a multiplication and an addition.
+
+        Args:
+            layout: The Layout of the controller the calibration will be used
+                with, so its triggers can be told apart from its sticks.
+
+        Returns:
+            A dict mapping axis numbers to (rest, scale below rest, scale above
+            rest, offset) tuples.
+        """
+
+        if layout.triggers == xbox360_controller.TRIGGERS_COMBINED:
+            trigger_axes = ()
+        else:
+            trigger_axes = (layout.axes["LEFT_TRIGGER"], layout.axes["RIGHT_TRIGGER"])
+
+        coefficients = {}
+
+        for axis, (low, rest, high) in self.axes.items():
+            if axis in trigger_axes:
+                # Released reads -1 and fully pulled reads 1. A trigger rests at
+                # its lowest value, but lazy triggers read 0 until first pulled,
+                # so the rest value may have been measured as 0.
+                rest = min(low, rest)
+                scale = 2 / (high - rest) if high > rest else 1.0
+                coefficients[axis] = (rest, scale, scale, -1.0)
+            else:
+                # the center reads 0 and each end reads -1 or 1
+                below = 1 / (rest - low) if rest > low else 1.0
+                above = 1 / (high - rest) if high > rest else 1.0
+                coefficients[axis] = (rest, below, above, 0.0)
+
+        return coefficients
+
+    def wrap(self, joystick, layout):
+        """
+        Returns:
+            A CalibratedJoystick that reads from joystick with this calibration
+            applied.
+        """
+
+        lazy = layout.triggers == xbox360_controller.TRIGGERS_SPLIT_LAZY
+
+        return CalibratedJoystick(joystick, self.compile(layout), lazy)
+
+    def to_dict(self):
+        return {"name": self.name,
+                "axes": {str(axis): list(values) for axis, values in self.axes.items()}}
+
+    @classmethod
+    def from_dict(cls, data):
+        axes = {int(axis): tuple(values) for axis, values in data.get("axes", {}).items()}
+
+        return cls(axes, data.get("name"))
+
+
+class CalibratedJoystick:
+    """
+    Wraps a joystick so that get_axis() returns calibrated values. Every other
+    method is passed straight through to the wrapped joystick. Controllers
+    create these themselves; see Controller.calibrate().
+    """
+
+    def __init__(self, joystick, coefficients, lazy_triggers=False):
+        """
+        Args:
+            joystick: An object with the same methods as pygame.joystick.Joystick.
+            coefficients: The result of Calibration.compile().
+            lazy_triggers: Whether the layout reports untouched triggers as
+                exactly 0, which must be passed through unchanged so the
+                Controller can still tell. (default False)
+        """
+
+        self.joystick = joystick
+        self.lazy_triggers = lazy_triggers
+
+        # one entry per axis so get_axis() never has to look anything up by key
+        identity = (0.0, 1.0, 1.0, 0.0)
+        self.coefficients = [coefficients.get(axis, identity)
+                             for axis in range(joystick.get_numaxes())]
+        # triggers are the axes whose rest value is moved to -1
+        self.trigger_axes = {axis for axis, values in coefficients.items() if values[3] != 0}
+
+        # bound once, since the wrapper adds nothing to them
+        self.init = joystick.init
+        self.quit = joystick.quit
+        self.get_init = joystick.get_init
+        self.get_id = joystick.get_id
+        self.get_name = joystick.get_name
+        self.get_numaxes = joystick.get_numaxes
+        self.get_numbuttons = joystick.get_numbuttons
+        self.get_numhats = joystick.get_numhats
+        self.get_button = joystick.get_button
+        self.get_hat = joystick.get_hat
+
+    def get_axis(self, axis_number):
+        value = self.joystick.get_axis(axis_number)
+
+        if value == 0 and self.lazy_triggers and axis_number in self.trigger_axes:
+            return value
+
+        rest, below, above, offset = self.coefficients[axis_number]
+
+        if value < rest:
+            value = (value - rest) * below + offset
+        else:
+            value = (value - rest) * above + offset
+
+        return max(-1.0, min(1.0, value))
+
+
+class Calibrator:
+    """
+    Measures a pad to make a Calibration. Call rest() while nothing on the pad is
+    touched, then call sample() every frame while the player rotates both sticks
+    around their edges and pulls both triggers all the way, then call
+    calibration().
+    """
+
+    def __init__(self, joystick):
+        """
+        Args:
+            joystick: The joystick to measure, usually Controller.joystick so
+                the raw values are seen.
+        """
+
+        self.joystick = joystick
+        num_axes = joystick.get_numaxes()
+
+        self.rests = [0.0] * num_axes
+        self.lows = [0.0] * num_axes
+        self.highs = [0.0] * num_axes
+
+    def rest(self):
+        """
+        Records the current value of every axis as its rest value.
+        """
+
+        for axis in range(len(self.rests)):
+            value = self.joystick.get_axis(axis)
+
+            self.rests[axis] = value
+            self.lows[axis] = value
+            self.highs[axis] = value
+
+    def sample(self):
+        """
+        Widens each axis's range to include its current value.
+        """
+
+        for axis in range(len(self.rests)):
+            value = self.joystick.get_axis(axis)
+
+            if value < self.lows[axis]:
+                self.lows[axis] = value
+            elif value > self.highs[axis]:
+                self.highs[axis] = value
+
+    def calibration(self):
+        """
+        Returns:
+            A Calibration of the measurements so far.
+        """
+
+        axes = {axis: (self.lows[axis], self.rests[axis], self.highs[axis])
+                for axis in range(len(self.rests))}
+
+        return Calibration(axes, self.joystick.get_name())
+
+
+class CalibrationStore:
+    """
+    Keeps calibrations in a JSON file, keyed by each pad's GUID (or name where
+    GUIDs aren't available), so a pad is corrected the same way every time it is
+    connected. Pass one to ControllerManager(calibrations=...) to have each pad
+    calibrated as it connects.
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path: The JSON file. It is read now if it exists and written by
+                save().
+        """
+
+        self.path = path
+        self.calibrations = {}
+
+        if os.path.exists(path):
+            with open(path) as f:
+                data = json.load(f)
+
+            for key, values in data.items():
+                self.calibrations[key] = Calibration.from_dict(values)
+
+    def get(self, key):
+        """
+        Returns:
+            The Calibration stored for a device key, or None.
+        """
+
+        return self.calibrations.get(key)
+
+    def set(self, key, calibration):
+        self.calibrations[key] = calibration
+
+    def save(self):
+        data = {key: calibration.to_dict() for key, calibration in self.calibrations.items()}
+
+        with open(self.path, "w") as f:
+            json.dump(data, f, indent=2, sort_keys=True)
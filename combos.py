@@ -0,0 +1,214 @@
+#  Copyright (c) 2017 Jon Cooper
+#
+#  This file is part of pygame-xbox360controller.
+#  Documentation, related files, and licensing can be found at
+#
+#      <https://github.com/joncoop/pygame-xbox360controller>.
+
+
+import xbox360_controller
+
+# The eight directions and neutral, numbered (y + 1) * 3 + (x + 1) where y is
+# positive downwards, as it is for pygame's axes.
+DIRECTIONS = ("UP_LEFT", "UP", "UP_RIGHT",
+              "LEFT", "NEUTRAL", "RIGHT",
+              "DOWN_LEFT", "DOWN", "DOWN_RIGHT")
+NEUTRAL = 4
+
+
+class ComboRecognizer:
+    """
+    Recognizes input sequences such as fighting game special moves and stick
+    gestures:
+
+        {"fireball": ("DOWN DOWN_RIGHT RIGHT X", 20),
+         "dash": ("RIGHT NEUTRAL RIGHT", 12)}
+
+    Each controller's input is turned into a stream of symbols: a direction
+    whenever the direction held on the d-pad or left stick changes, and a button
+    name whenever a button is pressed. A combo matches when its steps are the
+    latest symbols in the stream and all of them happened within its window.
+
+    Every combo is compiled into one automaton (an Aho-Corasick trie with its
+    failure links resolved into a transition table), so each symbol costs one
+    table lookup however many combos there are.
+    """
+
+    def __init__(self, combos, count=8, stick_threshold=0.5, layout=None):
+        """
+        Args:
+            combos: A dict mapping combo names to (steps, window) tuples. Steps
+                are a string of direction and button names separated by spaces,
+                or a list of them. The window is the longest time from the first
+                step to the last, in the units of the timestamps passed to
+                update(), or None for no limit.
+            count: The number of controllers to track (default 8)
+            stick_threshold: How far the left stick must be pushed to count as
+                a direction (default 0.5)
+            layout: The Layout that gives the button numbers. If None, the
+                current platform's is used. (default None)
+        """
+
+        self.layout = layout if layout is not None else xbox360_controller.get_layout()
+        self.stick_threshold = stick_threshold
+
+        # symbols 0 to 8 are directions and the rest are button numbers
+        self.symbols = {name: symbol for symbol, name in enumerate(DIRECTIONS)}
+        for name, button in self.layout.buttons.items():
+            self.symbols[name] = len(DIRECTIONS) + button
+        self.alphabet = len(DIRECTIONS) + self.layout.num_buttons
+
+        self._compile(combos)
+
+        # per controller: the automaton state, the last direction, the last
+        # button mask and the timestamps of the latest symbols
+        self.states = [0] * count
+        self.directions = [NEUTRAL] * count
+        self.masks = [0] * count
+        self.histories = [[0] * self.history_size for _ in range(count)]
+        self.positions = [0] * count
+
+        # (controller index, combo name, timestamp) for each match
+        self.matches = []
+
+    def update(self, states, timestamp):
+        """
+        Feeds one frame of every controller to the recognizer.
+
+        Args:
+            states: A sequence with a ControllerState for each controller, or
+                None for controllers that aren't connected, such as the result of
+                ControllerManager.poll().
+            timestamp: The frame number or time of this frame.
+
+        Returns:
+            The list of matches as (controller index, combo name, timestamp)
+            tuples. The same list is reused on every call.
+        """
+
+        self.matches.clear()
+        threshold = self.stick_threshold
+
+        for index, state in enumerate(states):
+            if state is None:
+                continue
+
+            up, right, down, left = state.pad
+            x = right - left
+            y = down - up
+
+            # the d-pad takes priority over the stick
+            if not (x or y):
+                stick_x, stick_y = state.left_stick
+                x = (stick_x > threshold) - (stick_x < -threshold)
+                y = (stick_y > threshold) - (stick_y < -threshold)
+
+            direction = (y + 1) * 3 + (x + 1)
+            if direction != self.directions[index]:
+                self.directions[index] = direction
+                self.feed(index, direction, timestamp)
+
+            mask = state.button_mask
+            pressed = mask & ~self.masks[index]
+            self.masks[index] = mask
+
+            while pressed:
+                lowest = pressed & -pressed
+                self.feed(index, len(DIRECTIONS) + lowest.bit_length() - 1, timestamp)
+                pressed ^= lowest
+
+        return self.matches
+
+    def feed(self, index, symbol, timestamp):
+        """
+        Advances one controller's automaton by a single symbol. update() calls
+        this, but it can also be used to feed symbols from another source.
+        Matches are appended to matches.
+
+        Args:
+            index: The controller index.
+            symbol: A direction number, or len(DIRECTIONS) plus a button number.
+            timestamp: When the symbol happened.
+        """
+
+        history = self.histories[index]
+        position = self.positions[index]
+        size = self.history_size
+
+        history[position % size] = timestamp
+        position += 1
+        self.positions[index] = position
+
+        state = self.table[self.states[index] * self.alphabet + symbol]
+        self.states[index] = state
+
+        for name, length, window in self.outputs[state]:
+            # the stream can be shorter than the combo after a reset
+            if length > position:
+                continue
+            if window is None or timestamp - history[(position - length) % size] <= window:
+                self.matches.append((index, name, timestamp))
+
+    def reset(self, index):
+        """
+        Forgets a controller's input so far, e.g. when its pad is reconnected.
+        """
+
+        self.states[index] = 0
+        self.directions[index] = NEUTRAL
+        self.masks[index] = 0
+        self.positions[index] = 0
+
+    def _compile(self, combos):
+        # the trie, as a dict of transitions for each node
+        children = [{}]
+        outputs = [[]]
+
+        for name, (steps, window) in combos.items():
+            if isinstance(steps, str):
+                steps = steps.split()
+            if not steps:
+                raise ValueError("combo {!r} has no steps".format(name))
+
+            node = 0
+            for step in steps:
+                if step not in self.symbols:
+                    raise ValueError("unknown step {!r} in combo {!r}".format(step, name))
+
+                symbol = self.symbols[step]
+                if symbol not in children[node]:
+                    children[node][symbol] = len(children)
+                    children.append({})
+                    outputs.append([])
+                node = children[node][symbol]
+
+            outputs[node].append((name, len(steps), window))
+
+        # Breadth first, each node's missing transitions are copied from its
+        # failure node, the longest proper suffix that is also in the trie. A
+        # node also matches everything its failure node matches.
+        alphabet = self.alphabet
+        table = [0] * (len(children) * alphabet)
+        failures = [0] * len(children)
+        queue = []
+
+        for symbol, child in children[0].items():
+            table[symbol] = child
+            queue.append(child)
+
+        for node in queue:
+            outputs[node].extend(outputs[failures[node]])
+
+            for symbol in range(alphabet):
+                child = children[node].get(symbol)
+
+                if child is None:
+                    table[node * alphabet + symbol] = table[failures[node] * alphabet + symbol]
+                else:
+                    failures[child] = table[failures[node] * alphabet + symbol]
+                    table[node * alphabet + symbol] = child
+                    queue.append(child)
+
+        self.table = table
+        self.outputs = [tuple(output) for output in outputs]
+        self.history_size = max([length for output in outputs for _, length, _ in output], default=1)
@@ -0,0 +1,246 @@
+#  Copyright (c) 2017 Jon Cooper
+#
+#  This file is part of pygame-xbox360controller.
+#  Documentation, related files, and licensing can be found at
+#
+#      <https://github.com/joncoop/pygame-xbox360controller>.
+
+
+import mmap
+import struct
+import time
+
+import xbox360_controller
+
+# File layout: a fixed header followed by fixed-width frames. Each frame holds
+# the seconds since recording started, the buttons as a bitmask, every axis and
+# the x & y of every hat.
+MAGIC = b"X360"
+FORMAT_VERSION = 2
+
+# Version 2 added the platform and pygame version the file was recorded with,
+# so it can be read with the right layout anywhere.
+PREFIX = struct.Struct("<4sH")
+HEADERS = {1: struct.Struct("<4sHBBBB"),
+           2: struct.Struct("<4sHBBBBBB")}
+HEADER = HEADERS[FORMAT_VERSION]
+
+
+def frame_struct(num_axes, num_hats):
+    """
+    Returns:
+        The struct.Struct used for each frame of a recording with the given
+        number of axes and hats.
+    """
+
+    return struct.Struct("<dI{}f{}b".format(num_axes, num_hats * 2))
+
+
+class Recorder:
+    """
+    Appends the raw joystick state of a controller to a binary log file once per
+    frame. Once attached, the controller records a frame every time poll() is
+    called.
+    """
+
+    def __init__(self, controller, path):
+        """
+        Args:
+            controller: The Controller to record.
+            path: The file to write. An existing file is overwritten.
+        """
+
+        self.controller = controller
+        joystick = controller.joystick
+
+        self.num_axes = joystick.get_numaxes()
+        self.num_buttons = min(joystick.get_numbuttons(), 32)
+        self.num_hats = joystick.get_numhats()
+
+        self.frame = frame_struct(self.num_axes, self.num_hats)
+        self.frames = 0
+        self.start = time.perf_counter()
+
+        platform_id, pygame_version = xbox360_controller.layout_key(controller.layout)
+
+        self.file = open(path, "wb")
+        self.file.write(HEADER.pack(MAGIC, FORMAT_VERSION, joystick.get_id(),
+                                    self.num_axes, self.num_buttons, self.num_hats,
+                                    platform_id, pygame_version))
+
+        controller.recorder = self
+
+    def record(self):
+        """
+        Reads every button, axis and hat on the joystick and writes them as one
+        frame.
+        """
+
+        joystick = self.controller.joystick
+
+        buttons = 0
+        for i in range(self.num_buttons):
+            if joystick.get_button(i):
+                buttons |= 1 << i
+
+        values = [joystick.get_axis(i) for i in range(self.num_axes)]
+        for i in range(self.num_hats):
+            values.extend(joystick.get_hat(i))
+
+        self.file.write(self.frame.pack(time.perf_counter() - self.start, buttons, *values))
+        self.frames += 1
+
+    def close(self):
+        """
+        Detaches from the controller and closes the file.
+        """
+
+        if self.controller.recorder is self:
+            self.controller.recorder = None
+
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class ReplayJoystick:
+    """
+    Plays back a file written by Recorder. It has the same methods as
+    pygame.joystick.Joystick so it can be passed to Controller(joystick=...).
+    The file is memory-mapped, so only the current frame is ever decoded.
+    """
+
+    def __init__(self, path, loop=False):
+        """
+        Args:
+            path: A file written by Recorder.
+            loop: Whether to start over after the last frame (default False)
+        """
+
+        self.file = open(path, "rb")
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self.data) < PREFIX.size:
+            raise ValueError("{} is not a controller recording".format(path))
+
+        magic, format_version = PREFIX.unpack_from(self.data, 0)
+
+        if magic != MAGIC or format_version not in HEADERS:
+            raise ValueError("{} is not a controller recording".format(path))
+
+        header = HEADERS[format_version]
+        values = header.unpack_from(self.data, 0)
+        self.id, self.num_axes, self.num_buttons, self.num_hats = values[2:6]
+
+        # the platform and pygame version it was recorded with, if known
+        if format_version >= 2:
+            self.platform_id, self.pygame_version = values[6:8]
+        else:
+            self.platform_id = self.pygame_version = None
+
+        self.header_size = header.size
+        self.frame = frame_struct(self.num_axes, self.num_hats)
+        self.frame_count = (len(self.data) - self.header_size) // self.frame.size
+        self.loop = loop
+
+        # State of the current frame. Everything reads as released until the
+        # first call to advance().
+        self.index = -1
+        self.timestamp = 0.0
+        self.buttons = 0
+        self.axes = (0.0,) * self.num_axes
+        self.hats = ((0, 0),) * self.num_hats
+
+    def seek(self, index):
+        """
+        Makes the given frame the current frame.
+        """
+
+        values = self.frame.unpack_from(self.data, self.header_size + index * self.frame.size)
+
+        self.index = index
+        self.timestamp = values[0]
+        self.buttons = values[1]
+        self.axes = values[2:2 + self.num_axes]
+
+        hats = values[2 + self.num_axes:]
+        self.hats = tuple(zip(hats[::2], hats[1::2]))
+
+    def advance(self):
+        """
+        Moves to the next frame.
+
+        Returns:
+            False if the recording has ended, True otherwise.
+        """
+
+        index = self.index + 1
+
+        if index >= self.frame_count:
+            if not self.loop or self.frame_count == 0:
+                return False
+            index = 0
+
+        self.seek(index)
+
+        return True
+
+    def __iter__(self):
+        """
+        Advances through the remaining frames, yielding each frame's timestamp.
+        """
+
+        while self.advance():
+            yield self.timestamp
+
+    def get_layout(self):
+        """
+        Returns:
+            The Layout of the platform the file was recorded on, or None if the
+            file doesn't say.
+        """
+
+        return xbox360_controller.LAYOUTS.get((self.platform_id, self.pygame_version))
+
+    def close(self):
+        self.data.close()
+        self.file.close()
+
+    # pygame.joystick.Joystick methods
+
+    def init(self):
+        pass
+
+    def quit(self):
+        pass
+
+    def get_init(self):
+        return True
+
+    def get_id(self):
+        return self.id
+
+    def get_name(self):
+        return "Replay"
+
+    def get_numaxes(self):
+        return self.num_axes
+
+    def get_numbuttons(self):
+        return self.num_buttons
+
+    def get_numhats(self):
+        return self.num_hats
+
+    def get_axis(self, axis_number):
+        return self.axes[axis_number]
+
+    def get_button(self, button):
+        return (self.buttons >> button) & 1
+
+    def get_hat(self, hat_number):
+        return self.hats[hat_number]
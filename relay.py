@@ -0,0 +1,310 @@
+#  Copyright (c) 2017 Jon Cooper
+#
+#  This file is part of pygame-xbox360controller.
+#  Documentation, related files, and licensing can be found at
+#
+#      <https://github.com/joncoop/pygame-xbox360controller>.
+
+
+import random
+import socket
+import struct
+import time
+
+import xbox360_controller
+
+# Packet layout: a format version, the player slot, the sender's session id, the
+# slot's sequence number, a timestamp, then the buttons and d-pad as bitmasks and
+# the sticks and triggers as int16s. 31 bytes, so 8 players at 120 Hz is about
+# 30 KB/s.
+FORMAT_VERSION = 2
+PACKET = struct.Struct("<BBIIdHB5h")
+
+# Buttons are sent in this order rather than by button number, so the sender
+# and receiver can be on different platforms.
+BUTTON_NAMES = ("A", "B", "X", "Y", "LEFT_BUMP", "RIGHT_BUMP", "BACK", "START",
+                "LEFT_STICK_BTN", "RIGHT_STICK_BTN")
+
+AXIS_SCALE = 32767
+
+
+def quantize(value):
+    return int(round(max(-1.0, min(1.0, value)) * AXIS_SCALE))
+
+
+class RelaySender:
+    """
+    Sends controller states to a RelayReceiver over UDP. A frame is only sent
+    when something changed, or when keepalive seconds have passed, so idle
+    controllers cost almost nothing.
+    """
+
+    def __init__(self, address, keepalive=1.0, sock=None):
+        """
+        Args:
+            address: The (host, port) of the receiver.
+            keepalive: The longest time between packets for an unchanged
+                controller, so the receiver knows it's still there. (default 1.0)
+            sock: A UDP socket to send from. If None, one is created.
+                (default None)
+        """
+
+        self.address = address
+        self.keepalive = keepalive
+        self.sock = sock if sock is not None else socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+        self.buffer = bytearray(PACKET.size)
+
+        # A random id for this sender, so the receiver can tell that a restarted
+        # sender's sequence numbers start again.
+        self.session = random.getrandbits(32)
+
+        # per slot: the last sequence number, the last values sent and when
+        self.sequences = {}
+        self.last_values = {}
+        self.last_sent = {}
+
+        # (button number, bit) pairs for each layout seen so far
+        self.button_bits = {}
+
+    def send(self, slot, controller, timestamp=None):
+        """
+        Sends a controller's state as of its last poll().
+
+        Args:
+            slot: The player slot, from 0 to 255.
+            controller: A Controller that has been polled this frame.
+            timestamp: The time to put in the packet. If None, time.time() is
+                used. (default None)
+
+        Returns:
+            True if a packet was sent, False if the state was unchanged.
+        """
+
+        state = controller.state
+        layout = controller.layout
+
+        bits = self.button_bits.get(layout)
+        if bits is None:
+            bits = tuple((layout.buttons[name], 1 << i) for i, name in enumerate(BUTTON_NAMES))
+            self.button_bits[layout] = bits
+
+        mask = state.button_mask
+        buttons = 0
+        for button, bit in bits:
+            if mask >> button & 1:
+                buttons |= bit
+
+        up, right, down, left = state.pad
+        pad = up | right << 1 | down << 2 | left << 3
+
+        left_x, left_y = state.left_stick
+        right_x, right_y = state.right_stick
+
+        values = (buttons, pad, quantize(left_x), quantize(left_y),
+                  quantize(right_x), quantize(right_y), quantize(state.triggers))
+
+        now = time.monotonic()
+        if values == self.last_values.get(slot) and now - self.last_sent[slot] < self.keepalive:
+            return False
+
+        if timestamp is None:
+            timestamp = time.time()
+
+        sequence = (self.sequences.get(slot, 0) + 1) & 0xFFFFFFFF
+        PACKET.pack_into(self.buffer, 0, FORMAT_VERSION, slot, self.session, sequence, timestamp, *values)
+        self.sock.sendto(self.buffer, self.address)
+
+        self.sequences[slot] = sequence
+        self.last_values[slot] = values
+        self.last_sent[slot] = now
+
+        return True
+
+    def close(self):
+        self.sock.close()
+
+
+class RelayReceiver:
+    """
+    Receives controller states sent by a RelaySender. Each player slot gets a
+    Controller that reads from the received values, so remote players are used
+    exactly like local ones.
+    """
+
+    def __init__(self, address, max_players=8, timeout=3.0, layout=None, sock=None):
+        """
+        Args:
+            address: The (host, port) to listen on.
+            max_players: The number of player slots (default 8)
+            timeout: Seconds without a packet before a slot's Controller is
+                detached and reads as released, or None to never time out.
+                (default 3.0)
+            layout: The Layout for the remote Controllers, which decides the
+                button numbers the game sees. If None, the current platform's is
+                used. (default None)
+            sock: A UDP socket to receive on. If None, one is created and bound
+                to address. (default None)
+        """
+
+        if sock is None:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            sock.bind(address)
+        sock.setblocking(False)
+
+        self.sock = sock
+        self.timeout = timeout
+
+        if layout is None:
+            layout = xbox360_controller.get_layout()
+
+        # The remote values are written straight into a virtual joystick, so
+        # the triggers can't be left looking untouched.
+        if layout.triggers == xbox360_controller.TRIGGERS_SPLIT_LAZY:
+            layout = xbox360_controller.Layout(layout.buttons, layout.axes,
+                                               xbox360_controller.TRIGGERS_SPLIT, layout.pad_buttons)
+        self.layout = layout
+
+        axes = layout.axes
+        self.stick_axes = (axes["LEFT_STICK_X"], axes["LEFT_STICK_Y"],
+                           axes["RIGHT_STICK_X"], axes["RIGHT_STICK_Y"])
+        self.button_numbers = tuple(layout.buttons[name] for name in BUTTON_NAMES)
+
+        if layout.pad_buttons is None:
+            self.pad_numbers = None
+        else:
+            pad = layout.pad_buttons
+            self.pad_numbers = (pad["PAD_UP"], pad["PAD_RIGHT"], pad["PAD_DOWN"], pad["PAD_LEFT"])
+
+        self.joysticks = [None] * max_players
+        self.controllers = [None] * max_players
+        self.connected = [False] * max_players
+
+        # per slot: the sender's session id, the last sequence number and
+        # timestamp, when the last packet arrived and how many packets went
+        # missing
+        self.sessions = [None] * max_players
+        self.sequences = [None] * max_players
+        self.timestamps = [0.0] * max_players
+        self.received = [0.0] * max_players
+        self.lost = [0] * max_players
+
+        self.buffer = bytearray(PACKET.size)
+
+    def receive(self):
+        """
+        Reads every packet waiting on the socket and applies the newest state for
+        each slot. Call this once per frame, before polling the controllers. It
+        never blocks.
+
+        Returns:
+            The number of packets applied.
+        """
+
+        applied = 0
+        now = time.monotonic()
+
+        while True:
+            try:
+                size = self.sock.recv_into(self.buffer)
+            except (BlockingIOError, InterruptedError):
+                break
+
+            if size != PACKET.size:
+                continue
+
+            version, slot, session, sequence, timestamp, *values = PACKET.unpack_from(self.buffer)
+
+            if version != FORMAT_VERSION or slot >= len(self.controllers):
+                continue
+
+            # a restarted sender counts from the start again
+            if session != self.sessions[slot]:
+                self.sessions[slot] = session
+                self.sequences[slot] = None
+
+            # drop packets that arrive late or twice
+            last = self.sequences[slot]
+            if last is not None:
+                gap = (sequence - last) & 0xFFFFFFFF
+                if gap == 0 or gap >= 0x80000000:
+                    continue
+                self.lost[slot] += gap - 1
+
+            self.sequences[slot] = sequence
+            self.timestamps[slot] = timestamp
+            self.received[slot] = now
+
+            self._apply(slot, values)
+            applied += 1
+
+        if self.timeout is not None:
+            for slot, connected in enumerate(self.connected):
+                if connected and now - self.received[slot] > self.timeout:
+                    self.connected[slot] = False
+                    self.sequences[slot] = None
+                    self.controllers[slot].detach()
+
+        return applied
+
+    def get(self, slot):
+        """
+        Returns:
+            The Controller for a slot if it's receiving, None otherwise.
+        """
+
+        if self.connected[slot]:
+            return self.controllers[slot]
+
+        return None
+
+    def poll(self):
+        """
+        Polls every receiving controller. Call this once per frame after
+        receive().
+
+        Returns:
+            A list with the ControllerState of each slot, or None for slots that
+            aren't receiving.
+        """
+
+        return [controller.poll() if connected else None
+                for controller, connected in zip(self.controllers, self.connected)]
+
+    def close(self):
+        self.sock.close()
+
+    def _apply(self, slot, values):
+        buttons, pad, left_x, left_y, right_x, right_y, triggers = values
+
+        joystick = self.joysticks[slot]
+        if joystick is None:
+            joystick = xbox360_controller.VirtualJoystick(slot, name="Remote Controller")
+            self.joysticks[slot] = joystick
+            self.controllers[slot] = xbox360_controller.Controller(0, joystick, layout=self.layout)
+        elif not self.connected[slot]:
+            self.controllers[slot].attach(joystick)
+
+        self.connected[slot] = True
+
+        for bit, button in enumerate(self.button_numbers):
+            joystick.buttons[button] = buttons >> bit & 1
+
+        if self.pad_numbers is None:
+            joystick.hats[0] = ((pad >> 1 & 1) - (pad >> 3 & 1), (pad & 1) - (pad >> 2 & 1))
+        else:
+            for bit, button in enumerate(self.pad_numbers):
+                joystick.buttons[button] = pad >> bit & 1
+
+        axes = joystick.axes
+        for axis, value in zip(self.stick_axes, (left_x, left_y, right_x, right_y)):
+            axes[axis] = value / AXIS_SCALE
+
+        # Undo get_triggers(), which combines both triggers into one value.
+        triggers /= AXIS_SCALE
+        layout_axes = self.layout.axes
+        if self.layout.triggers == xbox360_controller.TRIGGERS_COMBINED:
+            axes[layout_axes["TRIGGERS"]] = -triggers
+        else:
+            axes[layout_axes["LEFT_TRIGGER"]] = -1 + 2 * max(-triggers, 0)
+            axes[layout_axes["RIGHT_TRIGGER"]] = -1 + 2 * max(triggers, 0)
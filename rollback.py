@@ -0,0 +1,220 @@
+#  Copyright (c) 2017 Jon Cooper
+#
+#  This file is part of pygame-xbox360controller.
+#  Documentation, related files, and licensing can be found at
+#
+#      <https://github.com/joncoop/pygame-xbox360controller>.
+
+
+import array
+
+import xbox360_controller
+
+# Each frame of each player is stored as these values: the buttons with the
+# d-pad in bits 16 to 19, then the sticks and triggers quantized to int16.
+FIELDS = 6
+PAD_SHIFT = 16
+AXIS_SCALE = 32767
+
+# slot flags
+EMPTY = 0
+CONFIRMED = 1
+PREDICTED = 2
+
+# prediction modes
+PREDICT_REPEAT = 0   # the player keeps doing what they did last frame
+PREDICT_NEUTRAL = 1  # everything released and centered
+
+
+def quantize(value):
+    return int(round(max(-1.0, min(1.0, value)) * AXIS_SCALE))
+
+
+class RollbackBuffer:
+    """
+    Keeps the inputs of every player for the last few frames, for rollback
+    netplay. Local inputs are added as they're polled and remote inputs as they
+    arrive. Frames whose remote input hasn't arrived yet are predicted. When the
+    real input arrives and doesn't match the prediction, the buffer reports the
+    earliest frame that needs to be simulated again.
+
+    Storage is a preallocated circular array indexed by frame number, so any
+    frame still in the buffer is found in constant time.
+    """
+
+    def __init__(self, players=8, capacity=64, predict=PREDICT_REPEAT, layout=None):
+        """
+        Args:
+            players: The number of players (default 8)
+            capacity: The number of frames kept. It must be more than the
+                longest rollback. (default 64)
+            predict: PREDICT_REPEAT or PREDICT_NEUTRAL (default PREDICT_REPEAT)
+            layout: The Layout used to rebuild the buttons tuple of each state.
+                If None, the current platform's is used. (default None)
+        """
+
+        if predict not in (PREDICT_REPEAT, PREDICT_NEUTRAL):
+            raise ValueError("unknown prediction mode {!r}".format(predict))
+
+        self.players = players
+        self.capacity = capacity
+        self.predict = predict
+
+        layout = layout if layout is not None else xbox360_controller.get_layout()
+        self.button_range = range(layout.num_buttons)
+
+        entries = players * capacity
+        self.values = array.array("l", [0]) * (FIELDS * entries)
+        self.frames = array.array("q", [-1]) * entries
+        self.flags = bytearray(entries)
+
+        # the earliest frame whose prediction turned out wrong, until taken, and
+        # the latest frame added or predicted
+        self.rollback_frame = None
+        self.newest_frame = None
+
+        # one state per player, refilled by get()
+        self.states = [xbox360_controller.ControllerState() for _ in range(players)]
+
+    def add(self, player, frame, state):
+        """
+        Stores a player's real input for a frame, e.g. a local player's
+        Controller.poll() or a remote player's state when it arrives. Inputs
+        for frames that have already left the buffer are ignored.
+
+        Args:
+            player: The player number.
+            frame: The frame number.
+            state: A ControllerState.
+
+        Returns:
+            True if the frame had been predicted wrongly, False otherwise.
+        """
+
+        entry = self._entry(player, frame)
+        if self._expired(entry, frame):
+            return False
+
+        if self.newest_frame is None or frame > self.newest_frame:
+            self.newest_frame = frame
+
+        offset = entry * FIELDS
+        values = self.values
+
+        up, right, down, left = state.pad
+        left_x, left_y = state.left_stick
+        right_x, right_y = state.right_stick
+
+        new_values = (state.button_mask | (up | right << 1 | down << 2 | left << 3) << PAD_SHIFT,
+                      quantize(left_x), quantize(left_y),
+                      quantize(right_x), quantize(right_y), quantize(state.triggers))
+
+        changed = False
+        for field, value in enumerate(new_values, offset):
+            if values[field] != value:
+                values[field] = value
+                changed = True
+
+        mispredicted = changed and self.frames[entry] == frame and self.flags[entry] == PREDICTED
+
+        self.frames[entry] = frame
+        self.flags[entry] = CONFIRMED
+
+        if mispredicted and (self.rollback_frame is None or frame < self.rollback_frame):
+            self.rollback_frame = frame
+
+        return mispredicted
+
+    def get(self, player, frame):
+        """
+        Gets a player's input for a frame. If the real input hasn't been added,
+        it is predicted from the frame before. Frames are predicted again every
+        time they're read, so read them in order when simulating again after a
+        rollback.
+
+        Returns:
+            A ControllerState, or None if the frame has left the buffer. The same
+            object is reused for each player.
+        """
+
+        entry = self._entry(player, frame)
+        if self._expired(entry, frame):
+            return None
+
+        offset = entry * FIELDS
+        values = self.values
+
+        if self.frames[entry] != frame or self.flags[entry] != CONFIRMED:
+            previous = self._entry(player, frame - 1)
+
+            if self.predict == PREDICT_REPEAT and self.frames[previous] == frame - 1:
+                for field in range(FIELDS):
+                    values[offset + field] = values[previous * FIELDS + field]
+            else:
+                for field in range(offset, offset + FIELDS):
+                    values[field] = 0
+
+            self.frames[entry] = frame
+            self.flags[entry] = PREDICTED
+
+            if self.newest_frame is None or frame > self.newest_frame:
+                self.newest_frame = frame
+
+        bits = values[offset]
+        left_x = values[offset + 1]
+        left_y = values[offset + 2]
+        right_x = values[offset + 3]
+        right_y = values[offset + 4]
+        triggers = values[offset + 5]
+
+        state = self.states[player]
+        mask = bits & ((1 << PAD_SHIFT) - 1)
+        pad = bits >> PAD_SHIFT
+
+        state.button_mask = mask
+        state.buttons = tuple(mask >> button & 1 for button in self.button_range)
+        state.pad = (pad & 1, pad >> 1 & 1, pad >> 2 & 1, pad >> 3 & 1)
+        state.left_stick = (left_x / AXIS_SCALE, left_y / AXIS_SCALE)
+        state.right_stick = (right_x / AXIS_SCALE, right_y / AXIS_SCALE)
+        state.triggers = triggers / AXIS_SCALE
+        # only the combined value is kept, so pulling both triggers reads as neither
+        state.split_triggers()
+
+        return state
+
+    def is_confirmed(self, player, frame):
+        """
+        Returns:
+            True if the player's real input for the frame has been added and the
+            frame is still in the buffer.
+        """
+
+        entry = self._entry(player, frame)
+
+        return (not self._expired(entry, frame) and self.frames[entry] == frame
+                and self.flags[entry] == CONFIRMED)
+
+    def take_rollback(self):
+        """
+        Returns:
+            The earliest frame that was predicted wrongly since the last call,
+            or None. The game should restore its state from before that frame
+            and simulate from it again.
+        """
+
+        frame = self.rollback_frame
+        self.rollback_frame = None
+
+        return frame
+
+    def _entry(self, player, frame):
+        return (frame % self.capacity) * self.players + player
+
+    def _expired(self, entry, frame):
+        # Frames more than capacity behind the newest have left the buffer, and
+        # an entry that holds a newer frame has been reused.
+        newest = self.newest_frame
+        if newest is not None and frame <= newest - self.capacity:
+            return True
+
+        return self.frames[entry] > frame
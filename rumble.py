@@ -0,0 +1,264 @@
+#  Copyright (c) 2017 Jon Cooper
+#
+#  This file is part of pygame-xbox360controller.
+#  Documentation, related files, and licensing can be found at
+#
+#      <https://github.com/joncoop/pygame-xbox360controller>.
+
+
+import heapq
+import itertools
+import time
+
+# Motor strengths are rounded to this many steps before being compared with
+# what was last sent, so envelopes don't call the driver on every frame.
+RUMBLE_STEPS = 32
+
+
+class Effect:
+    """
+    A rumble effect. The strength ramps up from 0 over attack seconds, holds,
+    then ramps down to 0 over the last fade seconds.
+    """
+
+    __slots__ = ("duration", "low", "high", "attack", "fade", "priority")
+
+    def __init__(self, duration, low=0.0, high=0.0, attack=0.0, fade=0.0, priority=0):
+        """
+        Args:
+            duration: Seconds the effect lasts, or None to play until stopped.
+            low: The strength of the low frequency (left, heavy) motor, from 0
+                to 1. (default 0.0)
+            high: The strength of the high frequency (right, light) motor, from
+                0 to 1. (default 0.0)
+            attack: Seconds to ramp up from 0 (default 0.0)
+            fade: Seconds to ramp down to 0 at the end. Ignored for effects
+                without a duration. (default 0.0)
+            priority: Only the effects with the highest priority are felt.
+                Effects with the same priority are combined. (default 0)
+        """
+
+        self.duration = duration
+        self.low = low
+        self.high = high
+        self.attack = attack
+        self.fade = fade
+        self.priority = priority
+
+    def envelope(self, elapsed):
+        """
+        Returns:
+            How much of the effect's strength is felt after elapsed seconds,
+            from 0 to 1.
+        """
+
+        level = 1.0
+
+        if self.attack > 0 and elapsed < self.attack:
+            level = elapsed / self.attack
+
+        if self.duration is not None and self.fade > 0:
+            remaining = self.duration - elapsed
+            if remaining < self.fade:
+                level = min(level, max(remaining, 0) / self.fade)
+
+        return level
+
+
+class NullRumble:
+    """
+    A rumble backend that does nothing, for joysticks that can't rumble.
+    """
+
+    def rumble(self, low_frequency, high_frequency, duration):
+        return False
+
+    def stop_rumble(self):
+        pass
+
+
+class RecordingRumble:
+    """
+    A rumble backend that keeps a list of the calls made to it, for testing
+    without hardware. Each call is recorded as (time, low, high, duration), and
+    stop_rumble() as (time, 0, 0, 0).
+    """
+
+    def __init__(self):
+        self.calls = []
+
+    def rumble(self, low_frequency, high_frequency, duration):
+        self.calls.append((time.monotonic(), low_frequency, high_frequency, duration))
+        return True
+
+    def stop_rumble(self):
+        self.calls.append((time.monotonic(), 0, 0, 0))
+
+
+class RumbleScheduler:
+    """
+    Plays rumble effects on a controller. Effects are kept in a priority queue
+    and combined into one motor setting, and the driver is only called when that
+    setting changes. Once attached, the scheduler is updated every time the
+    controller is polled, so games only need to call play().
+    """
+
+    def __init__(self, controller, backend=None):
+        """
+        Args:
+            controller: The Controller to rumble.
+            backend: An object with rumble() and stop_rumble() methods like
+                pygame.joystick.Joystick's, such as RecordingRumble. If None, the
+                controller's joystick is used, or nothing if it can't rumble.
+                (default None)
+        """
+
+        self.controller = controller
+        self.backend = backend
+
+        # (-priority, -order, start, effect). The newest of the highest
+        # priority effects is first.
+        self.queue = []
+        self.order = itertools.count()
+
+        # what the driver was last told, when it was told to stop by itself,
+        # and which joystick it was told to
+        self.sent = (0, 0)
+        self.sent_until = 0.0
+        self.joystick = None
+
+        controller.rumble = self
+
+    def play(self, effect, now=None):
+        """
+        Starts an effect.
+
+        Args:
+            effect: The Effect to play.
+            now: The current time from time.monotonic(). If None, it is read.
+                (default None)
+
+        Returns:
+            A handle that can be passed to stop().
+        """
+
+        if now is None:
+            now = time.monotonic()
+
+        entry = (-effect.priority, -next(self.order), now, effect)
+        heapq.heappush(self.queue, entry)
+        self.update(now)
+
+        return entry
+
+    def stop(self, handle, now=None):
+        """
+        Stops an effect started by play().
+        """
+
+        if handle in self.queue:
+            self.queue.remove(handle)
+            heapq.heapify(self.queue)
+
+        self.update(now)
+
+    def stop_all(self, now=None):
+        self.queue.clear()
+        self.update(now)
+
+    def update(self, now=None):
+        """
+        Removes finished effects and tells the driver about any change in motor
+        strength. Controller.poll() calls this.
+
+        Returns:
+            The (low, high) motor strengths now being played.
+        """
+
+        if now is None:
+            now = time.monotonic()
+
+        queue = self.queue
+
+        # finished effects are dropped when they reach the front
+        while queue and self._finished(queue[0], now):
+            heapq.heappop(queue)
+
+        low = high = 0.0
+        until = None
+
+        if queue:
+            top_priority = queue[0][0]
+            finished = False
+
+            for entry in queue:
+                priority, _, start, effect = entry
+
+                if priority != top_priority:
+                    continue
+                if self._finished(entry, now):
+                    finished = True
+                    continue
+
+                level = effect.envelope(now - start)
+                low = max(low, effect.low * level)
+                high = max(high, effect.high * level)
+
+                if effect.duration is not None:
+                    end = start + effect.duration
+                    until = end if until is None else max(until, end)
+                else:
+                    until = float("inf")
+
+            if finished:
+                self.queue = queue = [entry for entry in queue if not self._finished(entry, now)]
+                heapq.heapify(queue)
+
+        setting = (round(low * RUMBLE_STEPS), round(high * RUMBLE_STEPS))
+        joystick = self.controller.joystick
+
+        # a reconnected pad needs to be told again
+        if joystick is not self.joystick:
+            self.joystick = joystick
+            self.sent = (0, 0)
+            self.sent_until = 0.0
+
+        # A longer effect starting means the driver has to be told again even if
+        # the strength is the same, or it stops when the earlier one would have.
+        changed = setting != self.sent or (setting != (0, 0) and until > self.sent_until)
+
+        if changed and self.controller.connected:
+            backend = self.backend if self.backend is not None else joystick
+
+            if setting == (0, 0):
+                if hasattr(backend, "stop_rumble"):
+                    backend.stop_rumble()
+            elif hasattr(backend, "rumble"):
+                # The duration is a safety net in case the game stops updating.
+                # 0 means until told otherwise.
+                if until == float("inf"):
+                    duration = 0
+                else:
+                    duration = max(int((until - now) * 1000), 1)
+
+                backend.rumble(setting[0] / RUMBLE_STEPS, setting[1] / RUMBLE_STEPS, duration)
+
+            self.sent = setting
+            self.sent_until = until if setting != (0, 0) else 0.0
+
+        return setting[0] / RUMBLE_STEPS, setting[1] / RUMBLE_STEPS
+
+    def close(self):
+        """
+        Stops every effect and detaches from the controller.
+        """
+
+        self.stop_all()
+
+        if self.controller.rumble is self:
+            self.controller.rumble = None
+
+    def _finished(self, entry, now):
+        effect = entry[3]
+
+        return effect.duration is not None and now - entry[2] >= effect.duration
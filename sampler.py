@@ -0,0 +1,286 @@
+#  Copyright (c) 2017 Jon Cooper
+#
+#  This file is part of pygame-xbox360controller.
+#  Documentation, related files, and licensing can be found at
+#
+#      <https://github.com/joncoop/pygame-xbox360controller>.
+
+
+import array
+import threading
+import time
+
+import xbox360_controller
+
+# Each sample is stored as these values, in order, in the ring buffer.
+SAMPLE_FIELDS = ("time", "index", "button_mask", "pad_mask",
+                 "left_x", "left_y", "right_x", "right_y", "left_trigger", "right_trigger")
+SAMPLE_WIDTH = len(SAMPLE_FIELDS)
+
+
+class Sample:
+    """
+    One reading of a controller taken by a Sampler. Axis values are calibrated
+    but have no dead zone, so pass them through
+    Controller.dead_zone_adjustment() if needed. Bit n of
+    button_mask is button n, and bits 0 to 3 of pad_mask are up, right, down and
+    left.
+    """
+
+    __slots__ = SAMPLE_FIELDS
+
+    def __init__(self):
+        for field in SAMPLE_FIELDS:
+            setattr(self, field, 0)
+
+
+class Sampler:
+    """
+    Captures controller input in more detail than one read per frame, so taps
+    and flicks shorter than a frame aren't missed. Samples are written to a
+    fixed-size ring buffer that the game drains once per frame.
+
+    SDL keeps every joystick event in its queue, but only refreshes the values
+    joysticks return when events are pumped, which games do once per frame. So
+    in a game, pass every event to handle_event(), which takes one sample per
+    joystick event. For tools with no display or event loop of their own,
+    start() runs a background thread that samples at rate_hz instead; see
+    pump. Either way there is one writer and one reader (the game), so no
+    lock is needed.
+    """
+
+    def __init__(self, controllers, rate_hz=1000, capacity=4096, pump=False):
+        """
+        Args:
+            controllers: A sequence of Controller objects to sample. A sample's
+                index is the controller's position in this sequence.
+            rate_hz: Samples per second for each controller when sampling on a
+                thread (default 1000)
+            capacity: The number of samples the ring buffer holds. Samples older
+                than this are dropped if the game falls behind. (default 4096)
+            pump: Whether the thread calls pygame.event.pump() before each
+                sample. Without it, the thread only sees values as fresh as the
+                last time something else pumped events. SDL only supports
+                pumping events on the thread that initialized the display, on
+                every platform, so this is unsupported and only meant for tools
+                with no display. (default False)
+        """
+
+        self.controllers = list(controllers)
+        self.period = 1.0 / rate_hz
+        self.capacity = capacity
+        self.pump = pump
+
+        self.buffer = array.array("d", bytes(8 * SAMPLE_WIDTH * capacity))
+        self.write_count = 0
+        self.read_count = 0
+        self.dropped = 0
+
+        # per controller: (joystick, raw copy, what samples read) for
+        # handle_event(). See _event_inputs().
+        self.event_inputs = [None] * len(self.controllers)
+
+        self.sample = Sample()
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        """
+        Starts the sampling thread. Don't use handle_event() while it runs.
+        """
+
+        if self.running:
+            return
+
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name="xbox360-sampler", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """
+        Stops the sampling thread and waits for it to finish.
+        """
+
+        self.running = False
+
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def handle_event(self, event):
+        """
+        Takes a sample from a pygame joystick event. Pass every event from
+        pygame.event.get() to this function. Each event is applied to a copy of
+        its controller's values, so a press and release within one frame give
+        two samples. pygame doesn't pass on SDL's event timestamps, so a sample's
+        time is when the event was handled; samples are in the order the events
+        happened, but events from the same frame have nearly the same time.
+
+        Returns:
+            True if a sample was taken, False if the event isn't from one of the
+            sampled controllers.
+        """
+
+        if event.type not in xbox360_controller.JOYSTICK_EVENTS:
+            return False
+
+        if self.running:
+            raise RuntimeError("handle_event() can't be used while the sampling thread runs")
+
+        instance_id = getattr(event, "instance_id", event.joy)
+
+        for index, controller in enumerate(self.controllers):
+            if controller.connected and controller.instance_id == instance_id:
+                break
+        else:
+            return False
+
+        values, inputs = self._event_inputs(index, controller)
+
+        if event.type == xbox360_controller.JOYAXISMOTION:
+            values.axes[event.axis] = event.value
+        elif event.type == xbox360_controller.JOYHATMOTION:
+            values.hats[event.hat] = event.value
+        else:
+            values.buttons[event.button] = int(event.type == xbox360_controller.JOYBUTTONDOWN)
+
+        self._take_sample(index, controller, inputs, time.perf_counter())
+
+        return True
+
+    def drain(self):
+        """
+        Yields every sample taken since the last drain, oldest first. The same
+        Sample object is reused for each one, so copy any values that need to be
+        kept. Samples overwritten before they could be read are counted in
+        dropped.
+        """
+
+        buffer = self.buffer
+        sample = self.sample
+        capacity = self.capacity
+
+        end = self.write_count
+        start = max(self.read_count, end - capacity)
+        self.dropped += start - self.read_count
+
+        for count in range(start, end):
+            slot = (count % capacity) * SAMPLE_WIDTH
+
+            sample.time = buffer[slot]
+            sample.index = int(buffer[slot + 1])
+            sample.button_mask = int(buffer[slot + 2])
+            sample.pad_mask = int(buffer[slot + 3])
+            sample.left_x = buffer[slot + 4]
+            sample.left_y = buffer[slot + 5]
+            sample.right_x = buffer[slot + 6]
+            sample.right_y = buffer[slot + 7]
+            sample.left_trigger = buffer[slot + 8]
+            sample.right_trigger = buffer[slot + 9]
+
+            # The writer starts overwriting this slot as soon as write_count
+            # reaches count + capacity, before it publishes the new count, so
+            # the copy is only good if that hasn't happened yet.
+            if self.write_count - count >= capacity:
+                self.dropped += 1
+                continue
+
+            self.read_count = count + 1
+            yield sample
+
+        self.read_count = end
+
+    def _event_inputs(self, index, controller):
+        # Events are applied to a copy of the controller's raw values, made again
+        # whenever the controller gets a new joystick. Samples read the copy
+        # through the controller's calibration, like the controller itself.
+        entry = self.event_inputs[index]
+
+        if entry is None or entry[0] is not controller.joystick:
+            joystick = controller.joystick
+            values = xbox360_controller.VirtualJoystick(joystick.get_id(), joystick.get_numaxes(),
+                                                        joystick.get_numbuttons(), joystick.get_numhats())
+            values.axes[:] = map(joystick.get_axis, range(joystick.get_numaxes()))
+            values.buttons[:] = map(joystick.get_button, range(joystick.get_numbuttons()))
+            values.hats[:] = map(joystick.get_hat, range(joystick.get_numhats()))
+
+            inputs = values
+            if controller.calibration is not None:
+                inputs = controller.calibration.wrap(values, controller.layout)
+
+            entry = (joystick, values, inputs)
+            self.event_inputs[index] = entry
+
+        return entry[1], entry[2]
+
+    def _run(self):
+        next_time = time.perf_counter()
+
+        if self.pump:
+            pump_events = xbox360_controller.import_pygame().event.pump
+
+        while self.running:
+            if self.pump:
+                pump_events()
+
+            now = time.perf_counter()
+            for index, controller in enumerate(self.controllers):
+                self._take_sample(index, controller, controller.inputs, now)
+
+            next_time += self.period
+            delay = next_time - time.perf_counter()
+
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                # fell behind; don't try to catch up with a burst of samples
+                next_time = time.perf_counter()
+
+    def _take_sample(self, index, controller, inputs, now):
+        get_button = inputs.get_button
+        get_axis = inputs.get_axis
+
+        button_mask = 0
+        for button in controller.layout.button_reads:
+            if get_button(button):
+                button_mask |= 1 << button
+
+        if controller.layout.pad_buttons is None:
+            hat_x, hat_y = inputs.get_hat(0)
+            pad_mask = (hat_y == 1) | (hat_x == 1) << 1 | (hat_y == -1) << 2 | (hat_x == -1) << 3
+        else:
+            pad_mask = 0
+            for bit, button in enumerate(controller.pad_buttons):
+                if get_button(button):
+                    pad_mask |= 1 << bit
+
+        left_x, left_y = controller.left_stick_axes
+        right_x, right_y = controller.right_stick_axes
+        triggers = controller.trigger_axes
+
+        left_trigger = get_axis(triggers[0])
+        right_trigger = get_axis(triggers[1]) if len(triggers) > 1 else 0.0
+
+        buffer = self.buffer
+        slot = (self.write_count % self.capacity) * SAMPLE_WIDTH
+
+        buffer[slot] = now
+        buffer[slot + 1] = index
+        buffer[slot + 2] = button_mask
+        buffer[slot + 3] = pad_mask
+        buffer[slot + 4] = get_axis(left_x)
+        buffer[slot + 5] = get_axis(left_y)
+        buffer[slot + 6] = get_axis(right_x)
+        buffer[slot + 7] = get_axis(right_y)
+        buffer[slot + 8] = left_trigger
+        buffer[slot + 9] = right_trigger
+
+        # Publishing the new count is what makes the sample visible to drain().
+        self.write_count += 1
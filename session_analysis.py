@@ -0,0 +1,182 @@
+#  Copyright (c) 2017 Jon Cooper
+#
+#  This file is part of pygame-xbox360controller.
+#  Documentation, related files, and licensing can be found at
+#
+#      <https://github.com/joncoop/pygame-xbox360controller>.
+
+
+"""
+Analyzes sessions recorded with recording.Recorder across a pool of worker
+processes. Each file is replayed through a Controller, so the results match
+what the game saw, and is summarized as one JSON object per line.
+
+    python session_analysis.py sessions/*.x360 --workers 4 --output results.jsonl
+"""
+
+import argparse
+import concurrent.futures
+import json
+import os
+import sys
+
+import recording
+import xbox360_controller
+
+PAD_DIRECTIONS = ("up", "right", "down", "left")
+
+
+def heatmap_cell(value, size):
+    """
+    Returns:
+        The cell in a row of size cells that an axis value from -1 to 1 falls in.
+    """
+
+    return min(int((value + 1) / 2 * size), size - 1)
+
+
+def analyze_session(path, dead_zone=0.15, heatmap_size=16, layout=None):
+    """
+    Replays one recorded session and summarizes how the controller was used.
+
+    Args:
+        path: A file written by recording.Recorder.
+        dead_zone: The dead zone to read the sticks with. (default 0.15)
+        heatmap_size: The number of rows and columns in each stick heatmap.
+            (default 16)
+        layout: The Layout to read the file with. None means the one it was
+            recorded with, or the current platform's for files that don't say.
+            (default None)
+
+    Returns:
+        A dict of the results. If the file can't be read, the dict has the path
+        and an "error" message instead.
+    """
+
+    try:
+        replay = recording.ReplayJoystick(path)
+    except (OSError, ValueError) as e:
+        return {"path": path, "error": str(e)}
+
+    try:
+        if layout is None:
+            layout = replay.get_layout() or xbox360_controller.get_layout()
+
+        controller = xbox360_controller.Controller(dead_zone, joystick=replay, layout=layout)
+        state = controller.state
+
+        button_names = {number: name for name, number in layout.buttons.items()}
+        presses = dict.fromkeys(layout.buttons, 0)
+        pad_presses = dict.fromkeys(PAD_DIRECTIONS, 0)
+        previous_pad = (0, 0, 0, 0)
+
+        left_heatmap = [[0] * heatmap_size for _ in range(heatmap_size)]
+        right_heatmap = [[0] * heatmap_size for _ in range(heatmap_size)]
+        trigger_histogram = [0] * heatmap_size
+        left_trigger_frames = 0
+        right_trigger_frames = 0
+
+        for _ in replay:
+            controller.poll()
+
+            # rising edges only, so a held button counts once
+            pressed = state.button_mask & ~controller.previous_mask
+            while pressed:
+                lowest = pressed & -pressed
+                presses[button_names[lowest.bit_length() - 1]] += 1
+                pressed ^= lowest
+
+            pad = state.pad
+            if pad != previous_pad:
+                for direction, now, before in zip(PAD_DIRECTIONS, pad, previous_pad):
+                    if now and not before:
+                        pad_presses[direction] += 1
+                previous_pad = pad
+
+            x, y = state.left_stick
+            left_heatmap[heatmap_cell(y, heatmap_size)][heatmap_cell(x, heatmap_size)] += 1
+            x, y = state.right_stick
+            right_heatmap[heatmap_cell(y, heatmap_size)][heatmap_cell(x, heatmap_size)] += 1
+
+            triggers = state.triggers
+            trigger_histogram[heatmap_cell(triggers, heatmap_size)] += 1
+            if triggers < 0:
+                left_trigger_frames += 1
+            elif triggers > 0:
+                right_trigger_frames += 1
+
+        return {"path": path,
+                "frames": replay.frame_count,
+                "duration": replay.timestamp,
+                "platform_id": replay.platform_id,
+                "pygame_version": replay.pygame_version,
+                "button_presses": presses,
+                "pad_presses": pad_presses,
+                "left_stick_heatmap": left_heatmap,
+                "right_stick_heatmap": right_heatmap,
+                "trigger_histogram": trigger_histogram,
+                "left_trigger_frames": left_trigger_frames,
+                "right_trigger_frames": right_trigger_frames}
+    finally:
+        replay.close()
+
+
+def analyze_sessions(paths, workers=None, **options):
+    """
+    Analyzes many sessions in parallel. Every file is replayed from start to end
+    by one worker, since trigger and edge detection depend on earlier frames. At
+    most twice as many files as workers are queued at a time, so results don't
+    pile up in memory when there are thousands of files.
+
+    Args:
+        paths: An iterable of files written by recording.Recorder.
+        workers: The number of worker processes. None means one per CPU.
+            (default None)
+        options: Keyword arguments passed on to analyze_session().
+
+    Yields:
+        The result of analyze_session() for each file, in the order they finish.
+    """
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    paths = iter(paths)
+
+    with concurrent.futures.ProcessPoolExecutor(workers) as executor:
+        pending = set()
+
+        for path in paths:
+            pending.add(executor.submit(analyze_session, path, **options))
+
+            if len(pending) >= workers * 2:
+                done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+
+        for future in concurrent.futures.as_completed(pending):
+            yield future.result()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyze recorded controller sessions.")
+    parser.add_argument("paths", nargs="+", help="recordings written by recording.Recorder")
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per CPU)")
+    parser.add_argument("--dead-zone", type=float, default=0.15, help="stick dead zone")
+    parser.add_argument("--heatmap-size", type=int, default=16, help="rows and columns in each stick heatmap")
+    parser.add_argument("--output", help="write JSON lines to this file instead of stdout")
+    args = parser.parse_args()
+
+    out = open(args.output, "w") if args.output else sys.stdout
+
+    try:
+        for result in analyze_sessions(args.paths, args.workers,
+                                       dead_zone=args.dead_zone, heatmap_size=args.heatmap_size):
+            out.write(json.dumps(result, sort_keys=True) + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
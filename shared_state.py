@@ -0,0 +1,296 @@
+#  Copyright (c) 2017 Jon Cooper
+#
+#  This file is part of pygame-xbox360controller.
+#  Documentation, related files, and licensing can be found at
+#
+#      <https://github.com/joncoop/pygame-xbox360controller>.
+
+
+import os
+import struct
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+import xbox360_controller
+
+# Block layout: a header, then one 64-byte slot per controller so that slots
+# never share a cache line. Each slot starts with a sequence number that is odd
+# while the publisher is writing the slot, followed by the state: whether it's
+# connected, the d-pad and buttons as bitmasks, the publisher's frame count, a
+# timestamp, and the sticks and triggers.
+MAGIC = b"X36S"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sHHBB")
+SEQUENCE = struct.Struct("<I")
+BODY = struct.Struct("<BBxxIIdddddd")
+SLOT_SIZE = 64
+HEADER_SIZE = SLOT_SIZE
+
+# how many times a reader retries a slot that is being written before it keeps
+# its last snapshot
+READ_ATTEMPTS = 100
+
+
+class SharedStatePublisher:
+    """
+    Publishes the state of a set of controllers to a shared memory block that
+    any number of other processes can read with SharedStateReader. Only the
+    publishing process opens the joysticks. Slots are written with a seqlock,
+    so the publisher never waits for readers.
+    """
+
+    def __init__(self, controllers, name=None):
+        """
+        Args:
+            controllers: A list of Controllers, with None for empty slots. The
+                list is read on every publish(), so ControllerManager.controllers
+                can be passed to follow pads being connected.
+            name: The name of the shared memory block. If None, a unique name is
+                chosen. Readers need the name to attach. (default None)
+        """
+
+        self.controllers = controllers
+        self.count = len(controllers)
+
+        self.memory = shared_memory.SharedMemory(name, create=True,
+                                                 size=HEADER_SIZE + SLOT_SIZE * self.count)
+        self.name = self.memory.name
+        self.buffer = self.memory.buf
+
+        # readers need the layout to turn the button mask back into a tuple
+        layout = next((controller.layout for controller in controllers if controller is not None),
+                      xbox360_controller.get_layout())
+        platform_id, pygame_version = xbox360_controller.layout_key(layout)
+
+        HEADER.pack_into(self.buffer, 0, MAGIC, FORMAT_VERSION, self.count, platform_id, pygame_version)
+
+        self.sequences = [0] * self.count
+
+    def publish(self):
+        """
+        Writes the state of every controller as of its last poll(). Call this
+        once per frame after polling.
+        """
+
+        buffer = self.buffer
+        now = time.monotonic()
+
+        for slot, controller in enumerate(self.controllers):
+            offset = HEADER_SIZE + slot * SLOT_SIZE
+            sequence = self.sequences[slot]
+
+            # odd while writing, so readers know to try again
+            SEQUENCE.pack_into(buffer, offset, sequence + 1)
+
+            if controller is None:
+                BODY.pack_into(buffer, offset + SEQUENCE.size, 0, 0, 0, 0, now, 0.0, 0.0, 0.0, 0.0, 0.0)
+            else:
+                state = controller.state
+                up, right, down, left = state.pad
+                left_x, left_y = state.left_stick
+                right_x, right_y = state.right_stick
+
+                BODY.pack_into(buffer, offset + SEQUENCE.size,
+                               controller.connected, up | right << 1 | down << 2 | left << 3,
+                               state.button_mask, controller.frame, now,
+                               left_x, left_y, right_x, right_y, state.triggers)
+
+            self.sequences[slot] = (sequence + 2) & 0xFFFFFFFF
+            SEQUENCE.pack_into(buffer, offset, self.sequences[slot])
+
+    def close(self):
+        """
+        Closes and removes the shared memory block. Readers that are still
+        attached keep their mapping until they close.
+        """
+
+        self.buffer = None
+        self.memory.close()
+
+        # Readers started with multiprocessing share this process's resource
+        # tracker, and unregistered the block when they attached (see
+        # SharedStateReader), so it's registered again for unlink() to remove.
+        if os.name == "posix":
+            resource_tracker.register(self.memory._name, "shared_memory")
+
+        self.memory.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class SharedStateReader:
+    """
+    Attaches to a block written by SharedStatePublisher. Each slot can be read
+    through a SharedController, which has the read methods of a Controller.
+    """
+
+    def __init__(self, name):
+        """
+        Args:
+            name: The name of the publisher's shared memory block.
+        """
+
+        try:
+            self.memory = shared_memory.SharedMemory(name, track=False)
+        except TypeError:
+            # Before Python 3.13, every process that attaches a block on POSIX
+            # also removes it when it exits, unless it's unregistered.
+            self.memory = shared_memory.SharedMemory(name)
+            if os.name == "posix":
+                resource_tracker.unregister(self.memory._name, "shared_memory")
+
+        self.buffer = self.memory.buf.toreadonly()
+
+        magic, format_version, self.count, platform_id, pygame_version = HEADER.unpack_from(self.buffer, 0)
+
+        if magic != MAGIC or format_version != FORMAT_VERSION:
+            self.close()
+            raise ValueError("{} is not a controller state block".format(name))
+
+        self.layout = xbox360_controller.LAYOUTS[platform_id, pygame_version]
+        self.controllers = [SharedController(self, slot) for slot in range(self.count)]
+
+    def get(self, slot):
+        """
+        Returns:
+            The SharedController for a slot.
+        """
+
+        return self.controllers[slot]
+
+    def poll(self):
+        """
+        Polls every slot.
+
+        Returns:
+            A list with the ControllerState of each slot, or None for slots with
+            no pad connected.
+        """
+
+        states = []
+
+        for controller in self.controllers:
+            state = controller.poll()
+            states.append(state if controller.connected else None)
+
+        return states
+
+    def close(self):
+        self.buffer.release()
+        self.memory.close()
+
+
+class SharedController:
+    """
+    A read-only view of one slot of a SharedStateReader. Its state is copied out
+    of shared memory by poll(), so all reads within a frame are consistent.
+    """
+
+    def __init__(self, reader, slot):
+        self.reader = reader
+        self.slot = slot
+        self.offset = HEADER_SIZE + slot * SLOT_SIZE
+        self.layout = reader.layout
+
+        self.state = xbox360_controller.ControllerState()
+        self.previous_mask = 0
+        self.connected = False
+        self.frame = 0
+        self.timestamp = 0.0
+        self.polled = False
+
+        self.button_range = range(self.layout.num_buttons)
+
+    def poll(self):
+        """
+        Copies the slot's latest state out of shared memory. If the publisher is
+        writing the slot the whole time, the previous state is kept rather than
+        waiting.
+
+        Returns:
+            The SharedController's ControllerState. The same object is reused on
+            every call.
+        """
+
+        self.polled = True
+        self.previous_mask = self.state.button_mask
+        self._read()
+
+        return self.state
+
+    def get_id(self):
+        return self.slot
+
+    def just_pressed(self, button):
+        return bool((self.state.button_mask & ~self.previous_mask) >> button & 1)
+
+    def just_released(self, button):
+        return bool((self.previous_mask & ~self.state.button_mask) >> button & 1)
+
+    def get_changed_mask(self):
+        return self.state.button_mask ^ self.previous_mask
+
+    def get_buttons(self):
+        if not self.polled:
+            self._read()
+
+        return self.state.buttons
+
+    def get_left_stick(self):
+        if not self.polled:
+            self._read()
+
+        return self.state.left_stick
+
+    def get_right_stick(self):
+        if not self.polled:
+            self._read()
+
+        return self.state.right_stick
+
+    def get_triggers(self):
+        if not self.polled:
+            self._read()
+
+        return self.state.triggers
+
+    def get_pad(self):
+        if not self.polled:
+            self._read()
+
+        return self.state.pad
+
+    def _read(self):
+        buffer = self.reader.buffer
+        offset = self.offset
+
+        for _ in range(READ_ATTEMPTS):
+            before = SEQUENCE.unpack_from(buffer, offset)[0]
+            if before & 1:
+                continue
+
+            values = BODY.unpack_from(buffer, offset + SEQUENCE.size)
+
+            if SEQUENCE.unpack_from(buffer, offset)[0] == before:
+                break
+        else:
+            return False
+
+        connected, pad, mask, self.frame, self.timestamp, left_x, left_y, right_x, right_y, triggers = values
+
+        state = self.state
+        self.connected = bool(connected)
+        state.button_mask = mask
+        state.buttons = tuple(mask >> button & 1 for button in self.button_range)
+        state.pad = (pad & 1, pad >> 1 & 1, pad >> 2 & 1, pad >> 3 & 1)
+        state.left_stick = (left_x, left_y)
+        state.right_stick = (right_x, right_y)
+        state.triggers = triggers
+        # only the combined value is kept, so pulling both triggers reads as neither
+        state.split_triggers()
+
+        return True
@@ -0,0 +1,250 @@
+#  Copyright (c) 2017 Jon Cooper
+#
+#  This file is part of pygame-xbox360controller.
+#  Documentation, related files, and licensing can be found at
+#
+#      <https://github.com/joncoop/pygame-xbox360controller>.
+
+
+import array
+import math
+
+# the axes that are filtered, in the order they're stored
+AXES = ("left_x", "left_y", "right_x", "right_y", "triggers")
+
+# names that set the filter of more than one axis
+AXIS_GROUPS = {"left_stick": ("left_x", "left_y"),
+               "right_stick": ("right_x", "right_y")}
+
+
+class ExponentialFilter:
+    """
+    An exponential moving average. Each output moves alpha of the way from the
+    last output to the new value, so smaller alphas are smoother but lag more.
+    """
+
+    __slots__ = ("alpha",)
+
+    # state: whether started, last output
+    size = 2
+
+    def __init__(self, alpha=0.5):
+        self.alpha = alpha
+
+    def update(self, state, offset, value, dt):
+        if state[offset]:
+            value = state[offset + 1] + self.alpha * (value - state[offset + 1])
+        else:
+            state[offset] = 1.0
+
+        state[offset + 1] = value
+
+        return value
+
+
+class OneEuroFilter:
+    """
+    The One Euro filter (Casiez et al., 2012). It smooths heavily while an axis
+    is nearly still, which hides jitter, and less as it moves faster, which
+    keeps lag low on quick movements.
+    """
+
+    __slots__ = ("min_cutoff", "beta", "d_cutoff")
+
+    # state: whether started, last output, last speed
+    size = 3
+
+    def __init__(self, min_cutoff=1.0, beta=0.05, d_cutoff=1.0):
+        """
+        Args:
+            min_cutoff: The cutoff frequency in Hz when the axis is still. Lower
+                is smoother. (default 1.0)
+            beta: How much the cutoff rises with speed. Higher means less lag
+                on fast movements. (default 0.05)
+            d_cutoff: The cutoff frequency in Hz for the speed estimate.
+                (default 1.0)
+        """
+
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+
+    def update(self, state, offset, value, dt):
+        if not state[offset] or dt <= 0:
+            state[offset] = 1.0
+            state[offset + 1] = value
+            state[offset + 2] = 0.0
+            return value
+
+        previous = state[offset + 1]
+
+        # smoothing factor for a cutoff frequency: 1 / (1 + tau / dt)
+        a = 1 / (1 + 1 / (2 * math.pi * self.d_cutoff * dt))
+        speed = state[offset + 2] + a * ((value - previous) / dt - state[offset + 2])
+
+        cutoff = self.min_cutoff + self.beta * abs(speed)
+        a = 1 / (1 + 1 / (2 * math.pi * cutoff * dt))
+        value = previous + a * (value - previous)
+
+        state[offset + 1] = value
+        state[offset + 2] = speed
+
+        return value
+
+
+class MedianFilter:
+    """
+    The median of the last window values, which removes single-sample spikes
+    without blurring steady movement.
+    """
+
+    __slots__ = ("window", "size")
+
+    def __init__(self, window=5):
+        self.window = window
+
+        # state: values seen (up to window), next position, the values, and
+        # scratch space for sorting them
+        self.size = 2 + 2 * window
+
+    def update(self, state, offset, value, dt):
+        window = self.window
+        filled = int(state[offset])
+        position = int(state[offset + 1])
+
+        values = offset + 2
+        scratch = values + window
+
+        state[values + position] = value
+        state[offset + 1] = (position + 1) % window
+        if filled < window:
+            filled += 1
+            state[offset] = filled
+
+        # insertion sort into the scratch space, which is quick for the few
+        # values in a window
+        for i in range(filled):
+            item = state[values + i]
+            j = i
+            while j > 0 and state[scratch + j - 1] > item:
+                state[scratch + j] = state[scratch + j - 1]
+                j -= 1
+            state[scratch + j] = item
+
+        middle = filled // 2
+        if filled % 2:
+            return state[scratch + middle]
+
+        return (state[scratch + middle - 1] + state[scratch + middle]) / 2
+
+
+class Smoother:
+    """
+    Filters the sticks and triggers of several controllers. Each axis can have
+    its own filter. All filter state is kept in one preallocated array, so
+    filtering allocates nothing per frame beyond the float results.
+    """
+
+    def __init__(self, count=1, filters=None):
+        """
+        Args:
+            count: The number of controllers (default 1)
+            filters: A dict mapping axis names ("left_x", "left_y", "right_x",
+                "right_y", "triggers") or the groups "left_stick" and
+                "right_stick" to an ExponentialFilter, OneEuroFilter or
+                MedianFilter. Axes without a filter are passed through.
+                (default None)
+        """
+
+        chosen = {}
+        for name, axis_filter in (filters or {}).items():
+            for axis in AXIS_GROUPS.get(name, (name,)):
+                if axis not in AXES:
+                    raise ValueError("unknown axis {!r}".format(name))
+                chosen[axis] = axis_filter
+
+        self.count = count
+
+        # (update function, state offset of controller 0, state size) per axis
+        self.channels = []
+        total = 0
+
+        for axis in AXES:
+            axis_filter = chosen.get(axis)
+
+            if axis_filter is None:
+                self.channels.append(None)
+            else:
+                self.channels.append((axis_filter.update, total, axis_filter.size))
+                total += axis_filter.size * count
+
+        self.state = array.array("d", [0.0]) * max(total, 1)
+        self.values = array.array("d", [0.0]) * (len(AXES) * count)
+
+    def update(self, index, state, dt):
+        """
+        Filters one controller's axes.
+
+        Args:
+            index: The controller's index, from 0 to count - 1.
+            state: Its ControllerState, e.g. from Controller.poll().
+            dt: Seconds since the last update.
+        """
+
+        left_stick = state.left_stick
+        right_stick = state.right_stick
+
+        base = index * len(AXES)
+        self._filter(0, index, base, left_stick[0], dt)
+        self._filter(1, index, base, left_stick[1], dt)
+        self._filter(2, index, base, right_stick[0], dt)
+        self._filter(3, index, base, right_stick[1], dt)
+        self._filter(4, index, base, state.triggers, dt)
+
+    def update_all(self, states, dt):
+        """
+        Filters every controller in one call.
+
+        Args:
+            states: A sequence with a ControllerState for each controller, or
+                None for controllers that aren't connected, such as the result of
+                ControllerManager.poll().
+            dt: Seconds since the last update.
+        """
+
+        for index, state in enumerate(states):
+            if state is not None:
+                self.update(index, state, dt)
+
+    def reset(self, index):
+        """
+        Forgets a controller's history, e.g. when its pad is reconnected. The
+        next update starts the filters from scratch.
+        """
+
+        for channel in self.channels:
+            if channel is not None:
+                _, offset, size = channel
+                start = offset + index * size
+                for i in range(start, start + size):
+                    self.state[i] = 0.0
+
+    def get_left_stick(self, index):
+        base = index * len(AXES)
+        return (self.values[base], self.values[base + 1])
+
+    def get_right_stick(self, index):
+        base = index * len(AXES)
+        return (self.values[base + 2], self.values[base + 3])
+
+    def get_triggers(self, index):
+        return self.values[index * len(AXES) + 4]
+
+    def _filter(self, axis, index, base, value, dt):
+        channel = self.channels[axis]
+
+        if channel is not None:
+            update, offset, size = channel
+            value = update(self.state, offset + index * size, value, dt)
+
+        self.values[base + axis] = value
@@ -0,0 +1,169 @@
+#  Copyright (c) 2017 Jon Cooper
+#
+#  This file is part of pygame-xbox360controller.
+#  Documentation, related files, and licensing can be found at
+#
+#      <https://github.com/joncoop/pygame-xbox360controller>.
+
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# dead zone shapes
+RADIAL = 0
+AXIAL = 1
+
+# response curves
+LINEAR = 0
+QUADRATIC = 1
+CUBIC = 2
+
+
+class StickProcessor:
+    """
+    Applies dead zones and response curves to the analog sticks of many
+    controllers in one batched NumPy call. This is an optional alternative to
+    Controller.dead_zone_adjustment(), which works on a single axis at a time.
+    """
+
+    def __init__(self, count, dead_zone=0.15, outer_dead_zone=0.0, shape=RADIAL, curve=LINEAR):
+        """
+        Args:
+            count: The number of controllers read() will be given.
+            dead_zone: The size of the inner dead zone (default 0.15)
+            outer_dead_zone: The size of the region near the edge of the stick's
+                range that is treated as full deflection (default 0.0)
+            shape: RADIAL to measure the dead zone on the stick's distance from
+                center, or AXIAL to measure it on each axis separately, like
+                Controller.dead_zone_adjustment() (default RADIAL)
+            curve: LINEAR, QUADRATIC, CUBIC, or a sequence of values used as a
+                lookup table. A lookup table is sampled evenly over 0.0 to 1.0
+                and interpolated between entries. (default LINEAR)
+        """
+
+        if np is None:
+            raise ImportError("StickProcessor requires NumPy")
+
+        if dead_zone + outer_dead_zone >= 1:
+            raise ValueError("dead zones must leave part of the stick's range usable")
+
+        self.dead_zone = dead_zone
+        self.outer_dead_zone = outer_dead_zone
+        self.shape = shape
+        self.set_curve(curve)
+
+        # Each row is (left x, left y, right x, right y) for one controller.
+        self.raw = np.zeros((count, 4))
+        self.out = np.zeros((count, 4))
+
+        self.scratch = np.zeros((2, 0))
+
+    def set_curve(self, curve):
+        """
+        Changes the response curve. See __init__() for the accepted values.
+        """
+
+        if isinstance(curve, int):
+            self.curve = curve
+            self.lut = None
+        else:
+            self.curve = None
+            self.lut = np.asarray(curve, dtype=np.float64)
+            self.lut_x = np.linspace(0.0, 1.0, len(self.lut))
+
+    def read(self, controllers):
+        """
+        Reads the stick axes of each controller, calibrated but without its dead
+        zone, and processes them.
+
+        Args:
+            controllers: A sequence of at most count Controller objects.
+
+        Returns:
+            The processor's output array with one row per controller in the form
+            (left x, left y, right x, right y). The same array is reused on every
+            call.
+        """
+
+        raw = self.raw
+
+        for i, controller in enumerate(controllers):
+            get_axis = controller.inputs.get_axis
+            left_x, left_y = controller.left_stick_axes
+            right_x, right_y = controller.right_stick_axes
+
+            raw[i, 0] = get_axis(left_x)
+            raw[i, 1] = get_axis(left_y)
+            raw[i, 2] = get_axis(right_x)
+            raw[i, 3] = get_axis(right_y)
+
+        return self.process(raw, self.out)
+
+    def process(self, axes, out=None):
+        """
+        Applies the dead zones and response curve to an array of stick values.
+        This works on recorded data as well as live values.
+
+        Args:
+            axes: An array whose last dimension holds (x, y) pairs. Arrays shaped
+                like the output of read() work too, since each row is two pairs.
+            out: An optional array the same shape as axes to write into.
+
+        Returns:
+            The processed values. Each component is in the range
+            -1.0 <= value <= 1.0.
+        """
+
+        axes = np.asarray(axes, dtype=np.float64)
+        if out is None:
+            out = np.empty_like(axes)
+
+        pairs = axes.reshape(-1, 2)
+        out_pairs = out.reshape(-1, 2)
+
+        if self.shape == RADIAL:
+            scratch = self._scratch(len(pairs))
+            magnitude = scratch[0]
+            np.hypot(pairs[:, 0], pairs[:, 1], out=magnitude)
+
+            scale = self._response(magnitude, scratch[1])
+            np.maximum(magnitude, 1e-12, out=magnitude)
+            np.divide(scale, magnitude, out=scale)
+
+            np.multiply(pairs, scale[:, np.newaxis], out=out_pairs)
+        else:
+            # the signs are kept aside first, since out may be axes itself
+            signs = self._scratch(len(pairs)).T
+            np.copysign(1.0, pairs, out=signs)
+
+            np.abs(pairs, out=out_pairs)
+            self._response(out_pairs, out_pairs)
+            np.multiply(out_pairs, signs, out=out_pairs)
+
+        return out
+
+    def _scratch(self, size):
+        if self.scratch.shape[1] != size:
+            self.scratch = np.zeros((2, size))
+
+        return self.scratch
+
+    def _response(self, distance, out):
+        # Maps distances from center onto 0.0 to 1.0 after removing the dead
+        # zones, then applies the curve.
+        span = 1 - self.dead_zone - self.outer_dead_zone
+
+        np.subtract(distance, self.dead_zone, out=out)
+        np.divide(out, span, out=out)
+        np.clip(out, 0.0, 1.0, out=out)
+
+        if self.curve == QUADRATIC:
+            np.square(out, out=out)
+        elif self.curve == CUBIC:
+            np.power(out, 3, out=out)
+        elif self.lut is not None:
+            out[...] = np.interp(out, self.lut_x, self.lut)
+
+        return out
@@ -54,6 +54,13 @@ pygame.joystick.init()
 # Get ready to print
 textPrint = TextPrint()
 
+# Joysticks are opened once and only reopened when one is plugged in or
+# removed. pygame 1 has no events for that, so there they're opened once.
+DEVICE_EVENTS = (getattr(pygame, "JOYDEVICEADDED", None),
+                 getattr(pygame, "JOYDEVICEREMOVED", None))
+joysticks = []
+refresh = True
+
 # Game Loop
 running = True
 
@@ -62,22 +69,27 @@ while running:
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
             running = False
+        elif event.type in DEVICE_EVENTS:
+            refresh = True
+
+    if refresh:
+        joysticks = [pygame.joystick.Joystick(i) for i in range(pygame.joystick.get_count())]
+        for joystick in joysticks:
+            joystick.init()
+        refresh = False
 
     # Drawing code
     screen.fill(BLACK)
     textPrint.reset()
 
     # Get count of joysticks
-    joystick_count = pygame.joystick.get_count()
+    joystick_count = len(joysticks)
 
     textPrint.print(screen, "Number of joysticks: {}".format(joystick_count) )
     textPrint.indent()
 
     # For each joystick:
-    for i in range(joystick_count):
-        joystick = pygame.joystick.Joystick(i)
-        joystick.init()
-
+    for i, joystick in enumerate(joysticks):
         textPrint.print(screen, "Joystick {}".format(i) )
         textPrint.indent()
 
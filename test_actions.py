@@ -0,0 +1,130 @@
+#  Copyright (c) 2017 Jon Cooper
+#
+#  This file is part of pygame-xbox360controller.
+#  Documentation, related files, and licensing can be found at
+#
+#      <https://github.com/joncoop/pygame-xbox360controller>.
+
+
+import json
+import os
+import tempfile
+import unittest
+
+# Run headless with no controller attached.
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("XBOX360_BACKEND", "virtual")
+
+import actions
+import xbox360_controller
+
+LINUX_2 = xbox360_controller.LAYOUTS[xbox360_controller.LINUX, 2]
+WINDOWS_1 = xbox360_controller.LAYOUTS[xbox360_controller.WINDOWS, 1]
+
+BINDINGS = {"jump": ["A", "PAD_UP"],
+            "aim": "LEFT_TRIGGER>0.5",
+            "fire": "RIGHT_TRIGGER>0.5",
+            "move_x": ["LEFT_STICK_X", "PAD_RIGHT", "-PAD_LEFT"],
+            "quit": "BACK+START"}
+
+
+class ActionMapTest(unittest.TestCase):
+
+    def setUp(self):
+        self.joystick = xbox360_controller.VirtualJoystick(0)
+        self.controller = xbox360_controller.Controller(dead_zone=0.0, joystick=self.joystick,
+                                                        layout=LINUX_2)
+        self.action_map = actions.ActionMap(BINDINGS, layout=LINUX_2)
+
+    def update(self):
+        return self.action_map.update(self.controller.poll())
+
+    def test_buttons_and_chords(self):
+        buttons = LINUX_2.buttons
+
+        self.joystick.press(buttons["START"])
+        self.update()
+        self.assertFalse(self.action_map.is_active("quit"))
+
+        self.joystick.press(buttons["BACK"])
+        self.joystick.press(buttons["A"])
+        self.update()
+        self.assertTrue(self.action_map.is_active("quit"))
+        self.assertTrue(self.action_map.just_activated("jump"))
+
+        self.update()
+        self.assertTrue(self.action_map.is_active("jump"))
+        self.assertFalse(self.action_map.just_activated("jump"))
+
+        self.joystick.release(buttons["A"])
+        self.update()
+        self.assertTrue(self.action_map.just_deactivated("jump"))
+
+    def test_analog_values(self):
+        self.joystick.set_axis(LINUX_2.axes["LEFT_STICK_X"], 0.25)
+        self.update()
+        self.assertEqual(self.action_map.get("move_x"), 0.25)
+
+        # the binding furthest from 0 wins
+        self.joystick.set_hat((-1, 0))
+        self.update()
+        self.assertEqual(self.action_map.get("move_x"), -1.0)
+
+    def test_both_triggers(self):
+        self.joystick.set_axis(LINUX_2.axes["LEFT_TRIGGER"], 1.0)
+        self.joystick.set_axis(LINUX_2.axes["RIGHT_TRIGGER"], 1.0)
+        self.update()
+
+        self.assertTrue(self.action_map.is_active("aim"))
+        self.assertTrue(self.action_map.is_active("fire"))
+
+    def test_combined_trigger_axis(self):
+        joystick = xbox360_controller.VirtualJoystick(0)
+        controller = xbox360_controller.Controller(joystick=joystick, layout=WINDOWS_1)
+        action_map = actions.ActionMap(BINDINGS, layout=WINDOWS_1)
+
+        joystick.set_axis(WINDOWS_1.axes["TRIGGERS"], -1.0)
+        action_map.update(controller.poll())
+
+        self.assertFalse(action_map.is_active("aim"))
+        self.assertTrue(action_map.is_active("fire"))
+
+    def test_rebinding_keeps_values(self):
+        self.joystick.press(LINUX_2.buttons["A"])
+        self.update()
+
+        self.action_map.bind({"fire": "B", "jump": "A"})
+        self.assertTrue(self.action_map.is_active("jump"))
+        self.assertFalse(self.action_map.is_active("fire"))
+
+        self.update()
+        self.assertFalse(self.action_map.just_activated("jump"))
+
+    def test_bad_bindings(self):
+        with self.assertRaises(ValueError):
+            actions.ActionMap({"fire": "TRIGGER>0.5"}, layout=LINUX_2)
+        with self.assertRaises(ValueError):
+            actions.ActionMap({"fire": "RIGHT_TRIGGER>half"}, layout=LINUX_2)
+
+    def test_load_and_reload(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "bindings.json")
+            with open(path, "w") as f:
+                json.dump({"jump": "A"}, f)
+
+            self.action_map.load(path)
+            self.assertFalse(self.action_map.reload())
+
+            with open(path, "w") as f:
+                json.dump({"jump": "B"}, f)
+            os.utime(path, (0, 0))
+
+            self.assertTrue(self.action_map.reload())
+            self.joystick.press(LINUX_2.buttons["B"])
+            self.update()
+            self.assertTrue(self.action_map.is_active("jump"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+#  Copyright (c) 2017 Jon Cooper
+#
+#  This file is part of pygame-xbox360controller.
+#  Documentation, related files, and licensing can be found at
+#
+#      <https://github.com/joncoop/pygame-xbox360controller>.
+
+
+import os
+import tempfile
+import unittest
+
+# Run headless with no controller attached.
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("XBOX360_BACKEND", "virtual")
+
+import calibration
+import xbox360_controller
+
+LINUX_2 = xbox360_controller.LAYOUTS[xbox360_controller.LINUX, 2]
+LINUX_1 = xbox360_controller.LAYOUTS[xbox360_controller.LINUX, 1]
+WINDOWS_1 = xbox360_controller.LAYOUTS[xbox360_controller.WINDOWS, 1]
+
+
+class CalibrationTest(unittest.TestCase):
+
+    def test_stick_coefficients(self):
+        axis = LINUX_2.axes["LEFT_STICK_X"]
+        coefficients = calibration.Calibration({axis: (-0.8, 0.1, 0.6)}).compile(LINUX_2)
+
+        rest, below, above, offset = coefficients[axis]
+        self.assertEqual((rest, offset), (0.1, 0.0))
+        self.assertAlmostEqual(below, 1 / 0.9)
+        self.assertAlmostEqual(above, 2.0)
+
+    def test_trigger_coefficients(self):
+        axis = LINUX_2.axes["RIGHT_TRIGGER"]
+        coefficients = calibration.Calibration({axis: (-0.9, -0.9, 0.7)}).compile(LINUX_2)
+
+        self.assertEqual(coefficients[axis][0], -0.9)
+        self.assertAlmostEqual(coefficients[axis][1], 2 / 1.6)
+        self.assertEqual(coefficients[axis][3], -1.0)
+
+    def test_combined_triggers_are_centered(self):
+        axis = WINDOWS_1.axes["TRIGGERS"]
+        coefficients = calibration.Calibration({axis: (-0.9, 0.05, 0.95)}).compile(WINDOWS_1)
+
+        self.assertEqual(coefficients[axis][3], 0.0)
+
+    def test_calibrated_reads(self):
+        joystick = xbox360_controller.VirtualJoystick(0)
+        x_axis = LINUX_2.axes["LEFT_STICK_X"]
+        trigger = LINUX_2.axes["RIGHT_TRIGGER"]
+
+        calibrated = calibration.Calibration({x_axis: (-0.8, 0.1, 0.6),
+                                              trigger: (-0.9, -0.9, 0.7)}).wrap(joystick, LINUX_2)
+
+        for raw, expected in ((0.1, 0.0), (0.6, 1.0), (-0.8, -1.0), (0.35, 0.5), (1.0, 1.0)):
+            joystick.set_axis(x_axis, raw)
+            self.assertAlmostEqual(calibrated.get_axis(x_axis), expected)
+
+        joystick.set_axis(trigger, -0.9)
+        self.assertAlmostEqual(calibrated.get_axis(trigger), -1.0)
+        joystick.set_axis(trigger, 0.7)
+        self.assertAlmostEqual(calibrated.get_axis(trigger), 1.0)
+
+    def test_untouched_lazy_trigger_passes_through(self):
+        joystick = xbox360_controller.VirtualJoystick(0)
+        trigger = LINUX_1.axes["RIGHT_TRIGGER"]
+        calibrated = calibration.Calibration({trigger: (-0.9, 0.0, 0.7)}).wrap(joystick, LINUX_1)
+
+        self.assertEqual(calibrated.get_axis(trigger), 0)
+
+    def test_calibrator(self):
+        joystick = xbox360_controller.VirtualJoystick(0, name="Worn Pad")
+        calibrator = calibration.Calibrator(joystick)
+
+        joystick.set_axis(0, 0.1)
+        calibrator.rest()
+        for value in (-0.8, 0.6, 0.2):
+            joystick.set_axis(0, value)
+            calibrator.sample()
+
+        measured = calibrator.calibration()
+        self.assertEqual(measured.axes[0], (-0.8, 0.1, 0.6))
+        self.assertEqual(measured.name, "Worn Pad")
+
+    def test_store_round_trip(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "calibrations.json")
+
+            store = calibration.CalibrationStore(path)
+            store.set("pad", calibration.Calibration({0: (-0.8, 0.1, 0.6)}, "Worn Pad"))
+            store.save()
+
+            loaded = calibration.CalibrationStore(path).get("pad")
+            self.assertEqual(loaded.axes, {0: (-0.8, 0.1, 0.6)})
+            self.assertEqual(loaded.name, "Worn Pad")
+
+    def test_controller_uses_calibration(self):
+        joystick = xbox360_controller.VirtualJoystick(0)
+        controller = xbox360_controller.Controller(dead_zone=0.0, joystick=joystick, layout=LINUX_2)
+        x_axis = LINUX_2.axes["LEFT_STICK_X"]
+
+        joystick.set_axis(x_axis, 0.1)
+        self.assertAlmostEqual(controller.get_left_stick()[0], 0.1)
+
+        controller.calibrate(calibration.Calibration({x_axis: (-0.8, 0.1, 0.6)}))
+        self.assertAlmostEqual(controller.get_left_stick()[0], 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
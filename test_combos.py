@@ -0,0 +1,126 @@
+#  Copyright (c) 2017 Jon Cooper
+#
+#  This file is part of pygame-xbox360controller.
+#  Documentation, related files, and licensing can be found at
+#
+#      <https://github.com/joncoop/pygame-xbox360controller>.
+
+
+import os
+import unittest
+
+# Run headless with no controller attached.
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("XBOX360_BACKEND", "virtual")
+
+import combos
+import xbox360_controller
+
+LAYOUT = xbox360_controller.LAYOUTS[xbox360_controller.LINUX, 2]
+
+# d-pad hat values for each direction used below
+HATS = {"NEUTRAL": (0, 0), "DOWN": (0, -1), "DOWN_RIGHT": (1, -1), "RIGHT": (1, 0)}
+
+
+class ComboRecognizerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.joysticks = [xbox360_controller.VirtualJoystick(i) for i in range(2)]
+        self.controllers = [xbox360_controller.Controller(0.0, joystick, layout=LAYOUT)
+                            for joystick in self.joysticks]
+        self.frame = 0
+
+    def recognizer(self, moves):
+        return combos.ComboRecognizer(moves, count=2, layout=LAYOUT)
+
+    def step(self, recognizer, hat=None, button=None, stick_x=None, player=0, frames=1):
+        # Changes one player's inputs, then runs frames frames with nothing else
+        # changing. Returns the names matched, with the frame they matched on.
+        joystick = self.joysticks[player]
+
+        if hat is not None:
+            joystick.set_hat(HATS[hat])
+        if stick_x is not None:
+            joystick.set_axis(self.controllers[player].left_stick_axes[0], stick_x)
+
+        matched = []
+        for _ in range(frames):
+            if button is not None:
+                joystick.press(LAYOUT.buttons[button])
+
+            states = [controller.poll() for controller in self.controllers]
+            matched.extend(recognizer.update(states, self.frame))
+            self.frame += 1
+
+            if button is not None:
+                joystick.release(LAYOUT.buttons[button])
+                button = None
+
+        return matched
+
+    def test_fireball_within_window(self):
+        recognizer = self.recognizer({"fireball": ("DOWN DOWN_RIGHT RIGHT X", 5)})
+
+        # inputs before the combo don't stop it matching
+        self.step(recognizer, hat="DOWN", frames=2)
+        self.step(recognizer, hat="NEUTRAL")
+        self.step(recognizer, hat="DOWN")
+        self.step(recognizer, hat="DOWN_RIGHT")
+        self.step(recognizer, hat="RIGHT")
+        self.assertEqual(self.step(recognizer, button="X"), [(0, "fireball", 6)])
+
+        # the same inputs, too slowly
+        self.step(recognizer, hat="DOWN", frames=3)
+        self.step(recognizer, hat="DOWN_RIGHT", frames=3)
+        self.step(recognizer, hat="RIGHT")
+        self.assertEqual(self.step(recognizer, button="X"), [])
+
+    def test_stick_double_tap(self):
+        recognizer = self.recognizer({"dash": ("RIGHT NEUTRAL RIGHT", None)})
+
+        self.step(recognizer, stick_x=0.9)
+        # still inside the threshold, so still RIGHT
+        self.step(recognizer, stick_x=0.6)
+        self.step(recognizer, stick_x=0.1)
+        self.assertEqual(self.step(recognizer, stick_x=0.8), [(0, "dash", 3)])
+
+    def test_overlapping_combos(self):
+        recognizer = self.recognizer({"quarter_circle": ("DOWN DOWN_RIGHT RIGHT", None),
+                                      "fireball": ("DOWN DOWN_RIGHT RIGHT X", None),
+                                      "roll": ("DOWN_RIGHT RIGHT", None)})
+
+        self.step(recognizer, hat="DOWN")
+        self.step(recognizer, hat="DOWN_RIGHT")
+        self.assertEqual(sorted(self.step(recognizer, hat="RIGHT")),
+                         [(0, "quarter_circle", 2), (0, "roll", 2)])
+        self.assertEqual(self.step(recognizer, button="X"), [(0, "fireball", 3)])
+
+    def test_players_are_separate(self):
+        recognizer = self.recognizer({"dash": ("RIGHT NEUTRAL RIGHT", None)})
+
+        self.step(recognizer, hat="RIGHT", player=1)
+        self.step(recognizer, hat="RIGHT", player=0)
+        self.step(recognizer, hat="NEUTRAL", player=1)
+        self.assertEqual(self.step(recognizer, hat="RIGHT", player=1), [(1, "dash", 3)])
+
+        # players that aren't connected are skipped
+        self.assertEqual(recognizer.update([None, None], self.frame), [])
+
+    def test_reset(self):
+        recognizer = self.recognizer({"dash": ("RIGHT NEUTRAL RIGHT", None)})
+
+        self.step(recognizer, hat="RIGHT")
+        self.step(recognizer, hat="NEUTRAL")
+        recognizer.reset(0)
+        self.assertEqual(self.step(recognizer, hat="RIGHT"), [])
+
+    def test_unknown_step(self):
+        with self.assertRaises(ValueError):
+            self.recognizer({"typo": ("DOWN FORWARD X", 20)})
+        with self.assertRaises(ValueError):
+            self.recognizer({"empty": ("", 20)})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+#  Copyright (c) 2017 Jon Cooper
+#
+#  This file is part of pygame-xbox360controller.
+#  Documentation, related files, and licensing can be found at
+#
+#      <https://github.com/joncoop/pygame-xbox360controller>.
+
+
+import os
+import tempfile
+import unittest
+
+# Run headless with no controller attached.
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("XBOX360_BACKEND", "virtual")
+
+import recording
+import xbox360_controller
+
+
+class RecordingTest(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "session.x360")
+
+        # recorded on a Mac, whatever platform the test runs on
+        self.layout = xbox360_controller.LAYOUTS[xbox360_controller.MAC, 2]
+        self.joystick = xbox360_controller.VirtualJoystick(3)
+        self.controller = xbox360_controller.Controller(joystick=self.joystick, layout=self.layout)
+
+    def record(self, frames):
+        # Each frame is (A held, left stick x, hat). The values are exact in
+        # single precision, which is how axes are stored.
+        a = self.layout.buttons["A"]
+        x_axis = self.controller.left_stick_axes[0]
+
+        with recording.Recorder(self.controller, self.path) as recorder:
+            for held, x, hat in frames:
+                if held:
+                    self.joystick.press(a)
+                else:
+                    self.joystick.release(a)
+                self.joystick.set_axis(x_axis, x)
+                self.joystick.set_hat(hat)
+                self.controller.poll()
+
+        self.assertIsNone(self.controller.recorder)
+        self.assertEqual(recorder.frames, len(frames))
+
+    def replay(self, loop=False):
+        replay = recording.ReplayJoystick(self.path, loop)
+        self.addCleanup(replay.close)
+
+        return replay
+
+    def test_round_trip(self):
+        frames = [(True, 0.5, (0, 0)), (False, -0.75, (1, -1)), (True, 0.0, (-1, 1))]
+        self.record(frames)
+
+        replay = self.replay()
+        self.assertEqual(replay.get_id(), 3)
+        self.assertEqual(replay.frame_count, 3)
+        self.assertIs(replay.get_layout(), self.layout)
+
+        replayed = xbox360_controller.Controller(joystick=replay, layout=replay.get_layout())
+        timestamps = []
+
+        for timestamp, (held, x, hat) in zip(replay, frames):
+            timestamps.append(timestamp)
+            state = replayed.poll()
+
+            self.assertEqual(state.buttons[self.layout.buttons["A"]], int(held))
+            self.assertEqual(state.left_stick[0], replayed.dead_zone_adjustment(x))
+            self.assertEqual(replay.get_hat(0), hat)
+
+        self.assertEqual(timestamps, sorted(timestamps))
+        self.assertFalse(replay.advance())
+
+    def test_loop_and_seek(self):
+        self.record([(False, 0.5, (0, 0)), (False, -0.5, (0, 0))])
+        x_axis = self.controller.left_stick_axes[0]
+
+        replay = self.replay(loop=True)
+        self.assertEqual(replay.get_axis(x_axis), 0.0)
+
+        values = []
+        for _ in range(3):
+            self.assertTrue(replay.advance())
+            values.append(replay.get_axis(x_axis))
+        self.assertEqual(values, [0.5, -0.5, 0.5])
+
+        replay.seek(1)
+        self.assertEqual(replay.get_axis(x_axis), -0.5)
+
+    def test_rejects_other_files(self):
+        with open(self.path, "wb") as f:
+            f.write(b"not a recording")
+
+        with self.assertRaises(ValueError):
+            recording.ReplayJoystick(self.path)
+
+
+if __name__ == "__main__":
+    unittest.main()
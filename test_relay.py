@@ -0,0 +1,87 @@
+#  Copyright (c) 2017 Jon Cooper
+#
+#  This file is part of pygame-xbox360controller.
+#  Documentation, related files, and licensing can be found at
+#
+#      <https://github.com/joncoop/pygame-xbox360controller>.
+
+
+import os
+import time
+import unittest
+
+# Run headless with no controller attached.
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("XBOX360_BACKEND", "virtual")
+
+import relay
+import xbox360_controller
+
+
+class RelayTest(unittest.TestCase):
+
+    def setUp(self):
+        self.receiver = relay.RelayReceiver(("127.0.0.1", 0), timeout=0.05)
+        self.address = self.receiver.sock.getsockname()
+
+        self.layout = self.receiver.layout
+        self.joystick = xbox360_controller.VirtualJoystick(0)
+        self.controller = xbox360_controller.Controller(0, self.joystick, layout=self.layout)
+
+    def tearDown(self):
+        self.receiver.close()
+
+    def receive(self, expected):
+        # loopback packets arrive almost at once, but not synchronously
+        applied = 0
+        deadline = time.monotonic() + 1.0
+
+        while applied < expected and time.monotonic() < deadline:
+            applied += self.receiver.receive()
+            time.sleep(0.001)
+
+        return applied
+
+    def test_round_trip(self):
+        sender = relay.RelaySender(self.address)
+        self.addCleanup(sender.close)
+
+        self.joystick.press(self.layout.buttons["A"])
+        self.joystick.set_axis(self.layout.axes["LEFT_STICK_X"], 0.5)
+        self.controller.poll()
+
+        self.assertTrue(sender.send(1, self.controller))
+        self.assertFalse(sender.send(1, self.controller))
+        self.assertEqual(self.receive(1), 1)
+
+        remote = self.receiver.get(1)
+        remote.poll()
+
+        self.assertEqual(remote.get_buttons(), self.controller.get_buttons())
+        self.assertAlmostEqual(remote.get_left_stick()[0], self.controller.get_left_stick()[0], places=4)
+        self.assertEqual(self.receiver.lost[1], 0)
+
+    def test_restarted_sender_after_timeout(self):
+        sender = relay.RelaySender(self.address, keepalive=0)
+        self.addCleanup(sender.close)
+
+        for _ in range(10):
+            sender.send(0, self.controller)
+        self.assertEqual(self.receive(10), 10)
+
+        time.sleep(0.1)
+        self.receiver.receive()
+        self.assertIsNone(self.receiver.get(0))
+
+        restarted = relay.RelaySender(self.address, keepalive=0)
+        self.addCleanup(restarted.close)
+
+        for _ in range(5):
+            restarted.send(0, self.controller)
+        self.assertEqual(self.receive(5), 5)
+        self.assertIsNotNone(self.receiver.get(0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+#  Copyright (c) 2017 Jon Cooper
+#
+#  This file is part of pygame-xbox360controller.
+#  Documentation, related files, and licensing can be found at
+#
+#      <https://github.com/joncoop/pygame-xbox360controller>.
+
+
+import os
+import unittest
+
+# Run headless with no controller attached.
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("XBOX360_BACKEND", "virtual")
+
+import rollback
+import xbox360_controller
+
+
+def make_state(buttons=0, left_stick=(0.0, 0.0)):
+    state = xbox360_controller.ControllerState()
+    state.button_mask = buttons
+    state.pad = (0, 0, 0, 0)
+    state.left_stick = left_stick
+    state.right_stick = (0.0, 0.0)
+    state.triggers = 0.0
+
+    return state
+
+
+class RollbackTest(unittest.TestCase):
+
+    def setUp(self):
+        self.buffer = rollback.RollbackBuffer(players=2, capacity=16)
+
+    def test_misprediction(self):
+        for frame in range(5):
+            self.buffer.add(0, frame, make_state())
+            self.buffer.add(1, frame, make_state(buttons=1))
+
+        # player 1's input for frames 5 to 7 hasn't arrived
+        for frame in range(5, 8):
+            self.buffer.add(0, frame, make_state())
+            self.assertEqual(self.buffer.get(1, frame).button_mask, 1)
+            self.assertFalse(self.buffer.is_confirmed(1, frame))
+
+        self.assertFalse(self.buffer.add(1, 5, make_state(buttons=1)))
+        self.assertTrue(self.buffer.add(1, 7, make_state(buttons=2)))
+        self.assertTrue(self.buffer.add(1, 6, make_state(buttons=2)))
+
+        self.assertEqual(self.buffer.take_rollback(), 6)
+        self.assertIsNone(self.buffer.take_rollback())
+        self.assertEqual(self.buffer.get(1, 6).button_mask, 2)
+
+    def test_frames_outside_window_are_ignored(self):
+        for frame in range(20):
+            self.buffer.add(0, frame, make_state(left_stick=(frame / 100, 0.0)))
+
+        self.assertFalse(self.buffer.add(0, 3, make_state(left_stick=(0.9, 0.0))))
+        self.assertTrue(self.buffer.is_confirmed(0, 19))
+        self.assertAlmostEqual(self.buffer.get(0, 19).left_stick[0], 0.19, places=4)
+
+    def test_reading_expired_frames(self):
+        for frame in range(20):
+            self.buffer.add(0, frame, make_state(buttons=frame))
+
+        self.assertIsNone(self.buffer.get(0, 3))
+        self.assertFalse(self.buffer.is_confirmed(0, 3))
+        self.assertTrue(self.buffer.is_confirmed(0, 19))
+        self.assertEqual(self.buffer.get(0, 19).button_mask, 19)
+
+    def test_window_follows_predictions(self):
+        for frame in range(4):
+            self.buffer.add(0, frame, make_state(buttons=1))
+
+        # predicting ahead moves the window, so frame 2's entry can be reused
+        self.assertEqual(self.buffer.get(0, 18).button_mask, 0)
+        self.assertIsNone(self.buffer.get(0, 2))
+        self.assertFalse(self.buffer.add(0, 2, make_state(buttons=2)))
+        self.assertEqual(self.buffer.get(0, 3).button_mask, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
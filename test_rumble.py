@@ -0,0 +1,64 @@
+#  Copyright (c) 2017 Jon Cooper
+#
+#  This file is part of pygame-xbox360controller.
+#  Documentation, related files, and licensing can be found at
+#
+#      <https://github.com/joncoop/pygame-xbox360controller>.
+
+
+import os
+import unittest
+
+# Run headless with no controller attached.
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("XBOX360_BACKEND", "virtual")
+
+import rumble
+import xbox360_controller
+
+
+class RumbleTest(unittest.TestCase):
+
+    def setUp(self):
+        self.controller = xbox360_controller.Controller(joystick=xbox360_controller.VirtualJoystick(0))
+        self.backend = rumble.RecordingRumble()
+        self.scheduler = rumble.RumbleScheduler(self.controller, self.backend)
+
+    def calls(self):
+        return [call[1:] for call in self.backend.calls]
+
+    def test_driver_only_called_on_change(self):
+        self.scheduler.play(rumble.Effect(1.0, low=0.5), now=0.0)
+        for step in range(10):
+            self.scheduler.update(step / 20)
+        self.scheduler.update(1.0)
+
+        self.assertEqual(self.calls(), [(0.5, 0.0, 1000), (0, 0, 0)])
+
+    def test_higher_priority_effect_wins(self):
+        self.scheduler.play(rumble.Effect(1.0, low=0.5), now=0.0)
+        self.scheduler.play(rumble.Effect(0.25, high=1.0, priority=1), now=0.5)
+        self.scheduler.update(0.875)
+
+        self.assertEqual(self.calls(), [(0.5, 0.0, 1000), (0.0, 1.0, 250), (0.5, 0.0, 125)])
+
+    def test_longer_effect_extends_duration(self):
+        self.scheduler.play(rumble.Effect(0.5, low=1.0), now=0.0)
+        self.scheduler.play(rumble.Effect(None, low=1.0), now=0.4)
+
+        self.assertEqual(self.calls(), [(1.0, 0.0, 500), (1.0, 0.0, 0)])
+
+    def test_joystick_is_default_backend(self):
+        controller = xbox360_controller.Controller(joystick=xbox360_controller.VirtualJoystick(1))
+        scheduler = rumble.RumbleScheduler(controller)
+
+        scheduler.play(rumble.Effect(None, low=1.0, high=0.5))
+        self.assertEqual(controller.joystick.rumble_values, (1.0, 0.5, 0))
+
+        scheduler.stop_all()
+        self.assertEqual(controller.joystick.rumble_values, (0, 0, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+#  Copyright (c) 2017 Jon Cooper
+#
+#  This file is part of pygame-xbox360controller.
+#  Documentation, related files, and licensing can be found at
+#
+#      <https://github.com/joncoop/pygame-xbox360controller>.
+
+
+import os
+import time
+import unittest
+
+# Run headless with no controller attached.
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("XBOX360_BACKEND", "virtual")
+
+import pygame
+import sampler
+import xbox360_controller
+
+
+class SamplerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.controller = xbox360_controller.Controller(joystick=xbox360_controller.VirtualJoystick(0))
+        self.sampler = sampler.Sampler([self.controller], capacity=8)
+
+    def take_samples(self, first, count):
+        for now in range(first, first + count):
+            self.sampler._take_sample(0, self.controller, self.controller.inputs, float(now))
+
+    def test_wrap_around(self):
+        self.take_samples(0, 5)
+        self.assertEqual([sample.time for sample in self.sampler.drain()], [0, 1, 2, 3, 4])
+
+        # 20 more samples wrap the 8-slot buffer. The oldest slot left is the
+        # next one the writer overwrites, so it's dropped too.
+        self.take_samples(5, 20)
+        self.assertEqual([sample.time for sample in self.sampler.drain()], list(range(18, 25)))
+        self.assertEqual(self.sampler.dropped, 13)
+
+        self.assertEqual(list(self.sampler.drain()), [])
+
+    def test_writer_laps_reader(self):
+        self.take_samples(0, 7)
+        samples = self.sampler.drain()
+        self.assertEqual(next(samples).time, 0)
+
+        # The writer catches up with the reader in the middle of a drain. Slots
+        # it has reached or is about to overwrite are dropped, not read.
+        self.take_samples(7, 3)
+        self.assertEqual([sample.time for sample in samples], [3, 4, 5, 6])
+        self.assertEqual(self.sampler.dropped, 2)
+
+        self.assertEqual([sample.time for sample in self.sampler.drain()], [7, 8, 9])
+
+    def test_tap_within_a_frame(self):
+        a = self.controller.layout.buttons["A"]
+        x_axis = self.controller.left_stick_axes[0]
+
+        for event in (pygame.event.Event(pygame.JOYBUTTONDOWN, joy=0, instance_id=0, button=a),
+                      pygame.event.Event(pygame.JOYAXISMOTION, joy=0, instance_id=0, axis=x_axis, value=0.5),
+                      pygame.event.Event(pygame.JOYBUTTONUP, joy=0, instance_id=0, button=a),
+                      pygame.event.Event(pygame.JOYBUTTONDOWN, joy=1, instance_id=1, button=a)):
+            self.sampler.handle_event(event)
+
+        # the joystick itself never saw the tap
+        self.assertEqual(self.controller.get_buttons()[a], 0)
+
+        samples = [(sample.button_mask >> a & 1, sample.left_x) for sample in self.sampler.drain()]
+        self.assertEqual(samples, [(1, 0.0), (1, 0.5), (0, 0.5)])
+
+    def test_reads_through_controller_inputs(self):
+        self.controller.joystick.set_axis(self.controller.left_stick_axes[0], 0.9)
+        self.controller.detach()
+
+        with self.sampler:
+            time.sleep(0.01)
+
+        values = [sample.left_x for sample in self.sampler.drain()]
+        self.assertTrue(values)
+        self.assertEqual(set(values), {0.0})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+#  Copyright (c) 2017 Jon Cooper
+#
+#  This file is part of pygame-xbox360controller.
+#  Documentation, related files, and licensing can be found at
+#
+#      <https://github.com/joncoop/pygame-xbox360controller>.
+
+
+import multiprocessing
+import os
+import unittest
+from multiprocessing import shared_memory
+
+# Run headless with no controller attached.
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("XBOX360_BACKEND", "virtual")
+
+import shared_state
+import xbox360_controller
+
+LAYOUT = xbox360_controller.LAYOUTS[xbox360_controller.WINDOWS, 2]
+
+
+def read_in_child(name, queue):
+    reader = shared_state.SharedStateReader(name)
+    states = reader.poll()
+    queue.put([None if state is None else (state.buttons, state.left_stick) for state in states])
+    reader.close()
+
+
+class SharedStateTest(unittest.TestCase):
+
+    def setUp(self):
+        self.joystick = xbox360_controller.VirtualJoystick(0)
+        self.controller = xbox360_controller.Controller(0.0, self.joystick, layout=LAYOUT)
+        self.a = LAYOUT.buttons["A"]
+
+        self.publisher = shared_state.SharedStatePublisher([None, self.controller])
+        self.addCleanup(self.publisher.close)
+
+    def reader(self):
+        reader = shared_state.SharedStateReader(self.publisher.name)
+        self.addCleanup(reader.close)
+
+        return reader
+
+    def test_round_trip(self):
+        self.joystick.press(self.a)
+        self.joystick.set_axis(self.controller.left_stick_axes[0], 0.25)
+        self.joystick.set_axis(self.controller.right_stick_axes[1], -0.5)
+        self.joystick.set_axis(self.controller.trigger_axes[0], -1.0)
+        self.joystick.set_axis(self.controller.trigger_axes[1], 1.0)
+        self.joystick.set_hat((1, 1))
+        state = self.controller.poll()
+        self.publisher.publish()
+
+        reader = self.reader()
+        self.assertIs(reader.layout, LAYOUT)
+
+        empty, shared = reader.poll()
+        self.assertIsNone(empty)
+        self.assertEqual(shared.buttons, state.buttons)
+        self.assertEqual(shared.left_stick, state.left_stick)
+        self.assertEqual(shared.right_stick, state.right_stick)
+        self.assertEqual(shared.triggers, state.triggers)
+        self.assertEqual(shared.right_trigger, 1.0)
+        self.assertEqual(shared.pad, (1, 1, 0, 0))
+        self.assertEqual(reader.get(1).frame, 1)
+        self.assertTrue(reader.get(1).just_pressed(self.a))
+
+        self.joystick.release(self.a)
+        self.controller.poll()
+        self.publisher.publish()
+        reader.poll()
+        self.assertTrue(reader.get(1).just_released(self.a))
+
+    def test_slot_being_written_keeps_last_state(self):
+        self.joystick.press(self.a)
+        self.controller.poll()
+        self.publisher.publish()
+
+        reader = self.reader()
+        self.assertEqual(reader.poll()[1].buttons[self.a], 1)
+
+        # a publisher stuck halfway through writing the slot
+        self.joystick.release(self.a)
+        self.controller.poll()
+        self.publisher.publish()
+        offset = shared_state.HEADER_SIZE + shared_state.SLOT_SIZE
+        shared_state.SEQUENCE.pack_into(self.publisher.buffer, offset, self.publisher.sequences[1] + 1)
+
+        self.assertEqual(reader.poll()[1].buttons[self.a], 1)
+
+    def test_read_from_another_process(self):
+        self.joystick.press(self.a)
+        self.joystick.set_axis(self.controller.left_stick_axes[1], 0.75)
+        state = self.controller.poll()
+        self.publisher.publish()
+
+        context = multiprocessing.get_context("spawn")
+        queue = context.Queue()
+        process = context.Process(target=read_in_child, args=(self.publisher.name, queue))
+        process.start()
+        result = queue.get(timeout=30)
+        process.join()
+
+        self.assertEqual(result, [None, (state.buttons, state.left_stick)])
+
+    def test_close_removes_block(self):
+        publisher = shared_state.SharedStatePublisher([self.controller])
+        shared_state.SharedStateReader(publisher.name).close()
+        publisher.close()
+
+        with self.assertRaises(FileNotFoundError):
+            shared_state.SharedStateReader(publisher.name)
+
+    def test_rejects_other_blocks(self):
+        memory = shared_memory.SharedMemory(create=True, size=shared_state.HEADER_SIZE)
+        self.addCleanup(memory.unlink)
+        self.addCleanup(memory.close)
+
+        with self.assertRaises(ValueError):
+            shared_state.SharedStateReader(memory.name)
+
+
+if __name__ == "__main__":
+    unittest.main()
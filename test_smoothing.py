@@ -0,0 +1,97 @@
+#  Copyright (c) 2017 Jon Cooper
+#
+#  This file is part of pygame-xbox360controller.
+#  Documentation, related files, and licensing can be found at
+#
+#      <https://github.com/joncoop/pygame-xbox360controller>.
+
+
+import os
+import unittest
+
+# Run headless with no controller attached.
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("XBOX360_BACKEND", "virtual")
+
+import smoothing
+import xbox360_controller
+
+
+def make_state(left_x=0.0, right_y=0.0, triggers=0.0):
+    state = xbox360_controller.ControllerState()
+    state.left_stick = (left_x, 0.0)
+    state.right_stick = (0.0, right_y)
+    state.triggers = triggers
+
+    return state
+
+
+class SmootherTest(unittest.TestCase):
+
+    def test_exponential(self):
+        smoother = smoothing.Smoother(filters={"left_stick": smoothing.ExponentialFilter(0.5)})
+        outputs = []
+
+        for value in (0.0, 1.0, 1.0):
+            smoother.update(0, make_state(left_x=value, right_y=value), 1 / 60)
+            outputs.append(smoother.get_left_stick(0)[0])
+
+            # axes without a filter are passed through
+            self.assertEqual(smoother.get_right_stick(0)[1], value)
+
+        self.assertEqual(outputs, [0.0, 0.5, 0.75])
+
+    def test_median_removes_spikes(self):
+        smoother = smoothing.Smoother(filters={"triggers": smoothing.MedianFilter(3)})
+        outputs = []
+
+        for value in (0.1, 0.9, 0.1, 0.2, 0.3):
+            smoother.update(0, make_state(triggers=value), 1 / 60)
+            outputs.append(smoother.get_triggers(0))
+
+        # until the window is full, the median of the values so far
+        self.assertEqual(outputs, [0.1, 0.5, 0.1, 0.2, 0.2])
+
+    def test_one_euro_lags_less_when_moving_fast(self):
+        outputs = []
+
+        for beta in (0.0, 1.0):
+            smoother = smoothing.Smoother(filters={"left_x": smoothing.OneEuroFilter(beta=beta)})
+
+            # still, then a quick flick
+            for _ in range(10):
+                smoother.update(0, make_state(left_x=0.25), 1 / 60)
+                self.assertAlmostEqual(smoother.get_left_stick(0)[0], 0.25)
+
+            smoother.update(0, make_state(left_x=1.0), 1 / 60)
+            outputs.append(smoother.get_left_stick(0)[0])
+
+        slow, fast = outputs
+        self.assertGreater(slow, 0.25)
+        self.assertGreater(fast, slow)
+        self.assertLess(fast, 1.0)
+
+    def test_controllers_are_separate(self):
+        smoother = smoothing.Smoother(count=3, filters={"left_stick": smoothing.ExponentialFilter(0.5)})
+
+        smoother.update_all([make_state(left_x=1.0), None, make_state(left_x=-1.0)], 1 / 60)
+        smoother.update_all([make_state(left_x=0.0), None, make_state(left_x=0.0)], 1 / 60)
+
+        self.assertEqual(smoother.get_left_stick(0)[0], 0.5)
+        self.assertEqual(smoother.get_left_stick(1)[0], 0.0)
+        self.assertEqual(smoother.get_left_stick(2)[0], -0.5)
+
+        # after a reset the next value is taken as it is
+        smoother.reset(0)
+        smoother.update_all([make_state(left_x=0.25), None, make_state(left_x=0.0)], 1 / 60)
+        self.assertEqual(smoother.get_left_stick(0)[0], 0.25)
+        self.assertEqual(smoother.get_left_stick(2)[0], -0.25)
+
+    def test_unknown_axis(self):
+        with self.assertRaises(ValueError):
+            smoothing.Smoother(filters={"left_trigger": smoothing.MedianFilter()})
+
+
+if __name__ == "__main__":
+    unittest.main()
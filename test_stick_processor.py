@@ -0,0 +1,103 @@
+#  Copyright (c) 2017 Jon Cooper
+#
+#  This file is part of pygame-xbox360controller.
+#  Documentation, related files, and licensing can be found at
+#
+#      <https://github.com/joncoop/pygame-xbox360controller>.
+
+
+import os
+import unittest
+
+# Run headless with no controller attached.
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("XBOX360_BACKEND", "virtual")
+
+import calibration
+import stick_processor
+import xbox360_controller
+
+
+@unittest.skipIf(stick_processor.np is None, "NumPy isn't installed")
+class StickProcessorTest(unittest.TestCase):
+
+    def setUp(self):
+        self.joystick = xbox360_controller.VirtualJoystick(0)
+        self.controller = xbox360_controller.Controller(joystick=self.joystick)
+        self.x_axis = self.controller.left_stick_axes[0]
+
+    def test_axial_matches_dead_zone_adjustment(self):
+        processor = stick_processor.StickProcessor(1, dead_zone=0.15, shape=stick_processor.AXIAL)
+        values = [n / 20 - 1 for n in range(41)]
+        axes = stick_processor.np.array([values, values[::-1]]).T
+
+        out = processor.process(axes)
+        for (x, y), (out_x, out_y) in zip(axes, out):
+            self.assertAlmostEqual(out_x, self.controller.dead_zone_adjustment(x))
+            self.assertAlmostEqual(out_y, self.controller.dead_zone_adjustment(y))
+
+    def test_radial_keeps_direction(self):
+        processor = stick_processor.StickProcessor(1, dead_zone=0.2, outer_dead_zone=0.1)
+        out = processor.process([[0.1, 0.1], [0.3, -0.4], [-0.54, 0.72], [0.0, -0.95]])
+
+        self.assertEqual(out[0].tolist(), [0.0, 0.0])
+        # a distance of 0.5 is 3/7 of the way from the dead zone to the outer one
+        self.assertAlmostEqual(out[1, 0], 0.6 * 3 / 7)
+        self.assertAlmostEqual(out[1, 1], -0.8 * 3 / 7)
+        # a distance of 0.9 reaches the outer dead zone
+        self.assertAlmostEqual(out[2, 0], -0.6)
+        self.assertAlmostEqual(out[2, 1], 0.8)
+        self.assertAlmostEqual(out[3, 0], 0.0)
+        self.assertAlmostEqual(out[3, 1], -1.0)
+
+    def test_curves(self):
+        axes = [[0.5, -0.5], [0.25, 1.0]]
+        curves = [(stick_processor.QUADRATIC, [[0.25, -0.25], [0.0625, 1.0]]),
+                  (stick_processor.CUBIC, [[0.125, -0.125], [0.015625, 1.0]]),
+                  ([0.0, 0.1, 1.0], [[0.1, -0.1], [0.05, 1.0]])]
+
+        for curve, expected in curves:
+            processor = stick_processor.StickProcessor(1, dead_zone=0.0, shape=stick_processor.AXIAL,
+                                                       curve=curve)
+            with self.subTest(curve=curve):
+                self.assertTrue(stick_processor.np.allclose(processor.process(axes), expected))
+
+    def test_process_in_place(self):
+        axes = stick_processor.np.array([[-0.6, 0.6, 0.0, -1.0]])
+
+        for shape in (stick_processor.RADIAL, stick_processor.AXIAL):
+            processor = stick_processor.StickProcessor(1, dead_zone=0.0, shape=shape)
+            expected = processor.process(axes)
+            values = axes.copy()
+
+            with self.subTest(shape=shape):
+                self.assertIs(processor.process(values, values), values)
+                self.assertTrue(stick_processor.np.allclose(values, expected))
+                self.assertLess(values[0, 0], 0)
+
+    def test_read_follows_detach(self):
+        self.joystick.set_axis(self.x_axis, 0.88)
+        self.controller.detach()
+
+        processor = stick_processor.StickProcessor(1, dead_zone=0.0)
+        self.assertEqual(processor.read([self.controller])[0, 0], 0.0)
+
+    def test_read_is_calibrated(self):
+        self.controller.calibrate(calibration.Calibration({self.x_axis: (-0.8, 0.1, 0.6)}))
+        self.joystick.set_axis(self.x_axis, 0.6)
+
+        processor = stick_processor.StickProcessor(1, dead_zone=0.0, shape=stick_processor.AXIAL)
+        self.assertAlmostEqual(processor.read([self.controller])[0, 0], 1.0)
+
+    def test_read_event_driven(self):
+        controller = xbox360_controller.Controller(joystick=self.joystick, event_driven=True)
+        self.joystick.set_axis(self.x_axis, 0.5)
+
+        # the change hasn't arrived as an event yet
+        processor = stick_processor.StickProcessor(1, dead_zone=0.0)
+        self.assertEqual(processor.read([controller])[0, 0], 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,275 @@
+#  Copyright (c) 2017 Jon Cooper
+#
+#  This file is part of pygame-xbox360controller.
+#  Documentation, related files, and licensing can be found at
+#
+#      <https://github.com/joncoop/pygame-xbox360controller>.
+
+
+import asyncio
+import os
+import random
+import unittest
+
+# Run headless with no controller attached.
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("XBOX360_BACKEND", "virtual")
+
+import pygame
+import xbox360_controller
+
+
+# The joystick button behind each entry of get_buttons() before the layout
+# tables, or None for entries that were always 0.
+BASELINE_BUTTONS = {
+    xbox360_controller.LINUX: (0, 1, 2, 3, 4, 5, 6, 7, None, 9, 10),
+    xbox360_controller.WINDOWS: (0, 1, 2, 3, 4, 5, 6, 7, 8, 9),
+    xbox360_controller.MAC: (None, None, None, None, 4, 5, 6, 7, 8, 9, None, 11, 12, 13, 14),
+}
+
+
+class LayoutTest(unittest.TestCase):
+
+    def test_buttons_match_baseline(self):
+        rng = random.Random(2)
+
+        for (platform_id, version), layout in sorted(xbox360_controller.LAYOUTS.items()):
+            joystick = xbox360_controller.VirtualJoystick(0)
+            controller = xbox360_controller.Controller(joystick=joystick, layout=layout)
+
+            for step in range(50):
+                joystick.buttons[:] = [rng.randrange(2) for _ in joystick.buttons]
+                expected = tuple(0 if button is None else joystick.buttons[button]
+                                 for button in BASELINE_BUTTONS[platform_id])
+
+                with self.subTest(platform=platform_id, version=version, step=step):
+                    self.assertEqual(controller.get_buttons(), expected)
+
+    def test_mac_pad_uses_buttons(self):
+        layout = xbox360_controller.LAYOUTS[xbox360_controller.MAC, 2]
+        joystick = xbox360_controller.VirtualJoystick(0)
+        controller = xbox360_controller.Controller(joystick=joystick, layout=layout)
+
+        # PAD_UP, PAD_DOWN, PAD_LEFT, PAD_RIGHT are buttons 0 to 3
+        joystick.press(0)
+        joystick.press(3)
+        joystick.set_hat((-1, -1))
+        self.assertEqual(controller.get_pad(), (1, 1, 0, 0))
+
+
+class ModuleAttributesTest(unittest.TestCase):
+
+    def test_star_import_exports_constants(self):
+        names = {}
+        exec("from xbox360_controller import *", names)
+
+        for name, value in xbox360_controller.get_constants().items():
+            self.assertEqual(names[name], value)
+        self.assertIs(names["Controller"], xbox360_controller.Controller)
+        self.assertNotIn("pygame", names)
+
+    def test_unknown_names_are_missing_attributes(self):
+        self.assertFalse(hasattr(xbox360_controller, "NOPE"))
+
+        platform_id = xbox360_controller.platform_id
+        xbox360_controller.platform_id = None
+        try:
+            self.assertFalse(hasattr(xbox360_controller, "NOPE"))
+            self.assertIsNone(getattr(xbox360_controller, "ALSO_NOPE", None))
+        finally:
+            xbox360_controller.platform_id = platform_id
+
+
+class EventDrivenTest(unittest.TestCase):
+
+    def test_matches_polling_on_every_layout(self):
+        rng = random.Random(360)
+
+        for key, layout in sorted(xbox360_controller.LAYOUTS.items()):
+            joystick = xbox360_controller.VirtualJoystick(0)
+            polled = xbox360_controller.Controller(joystick=joystick, layout=layout)
+            driven = xbox360_controller.Controller(joystick=joystick, layout=layout, event_driven=True)
+
+            for step in range(500):
+                kind = rng.randrange(3)
+
+                if kind == 0:
+                    axis = rng.randrange(joystick.get_numaxes())
+                    value = rng.choice((0.0, 1.0, -1.0, rng.uniform(-1, 1)))
+                    joystick.set_axis(axis, value)
+                    event = pygame.event.Event(pygame.JOYAXISMOTION, joy=0, instance_id=0,
+                                               axis=axis, value=value)
+                elif kind == 1:
+                    button = rng.randrange(joystick.get_numbuttons())
+                    if rng.randrange(2):
+                        joystick.press(button)
+                        event_type = pygame.JOYBUTTONDOWN
+                    else:
+                        joystick.release(button)
+                        event_type = pygame.JOYBUTTONUP
+                    event = pygame.event.Event(event_type, joy=0, instance_id=0, button=button)
+                else:
+                    value = (rng.randint(-1, 1), rng.randint(-1, 1))
+                    joystick.set_hat(value)
+                    event = pygame.event.Event(pygame.JOYHATMOTION, joy=0, instance_id=0,
+                                               hat=0, value=value)
+
+                driven.handle_event(event)
+
+                with self.subTest(layout=key, step=step):
+                    self.assertEqual(driven.get_buttons(), polled.get_buttons())
+                    self.assertEqual(driven.get_left_stick(), polled.get_left_stick())
+                    self.assertEqual(driven.get_right_stick(), polled.get_right_stick())
+                    self.assertEqual(driven.get_triggers(), polled.get_triggers())
+                    self.assertEqual(driven.get_pad(), polled.get_pad())
+
+    def test_polled_controller_ignores_events(self):
+        controller = xbox360_controller.Controller(joystick=xbox360_controller.VirtualJoystick(0))
+        event = pygame.event.Event(pygame.JOYBUTTONDOWN, joy=0, instance_id=0, button=0)
+
+        self.assertFalse(controller.handle_event(event))
+
+
+
+class ControllerManagerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.manager = xbox360_controller.ControllerManager(max_players=3, event_driven=True, scan=False)
+
+    def test_hot_plug_events(self):
+        manager = self.manager
+
+        self.assertEqual(manager.handle_event(pygame.event.Event(pygame.JOYDEVICEADDED, device_index=0)), 0)
+        self.assertEqual(manager.handle_event(pygame.event.Event(pygame.JOYDEVICEADDED, device_index=1)), 1)
+        controller = manager.get(0)
+
+        event = pygame.event.Event(pygame.JOYBUTTONDOWN, joy=0, instance_id=0, button=0)
+        self.assertEqual(manager.handle_event(event), 0)
+        self.assertEqual(controller.get_buttons()[0], 1)
+
+        self.assertEqual(manager.handle_event(pygame.event.Event(pygame.JOYDEVICEREMOVED, instance_id=0)), 0)
+        self.assertIsNone(manager.get(0))
+        self.assertEqual(controller.get_buttons()[0], 0)
+        self.assertIsNone(manager.handle_event(event))
+        self.assertIsNone(manager.poll()[0])
+
+        # the same Controller object is given the new joystick
+        self.assertEqual(manager.handle_event(pygame.event.Event(pygame.JOYDEVICEADDED, device_index=0)), 0)
+        self.assertIs(manager.get(0), controller)
+        self.assertIs(controller.joystick, xbox360_controller.virtual_joysticks[0])
+
+    def test_slots_are_reused_by_model(self):
+        manager = self.manager
+        first = xbox360_controller.VirtualJoystick(10)
+        second = xbox360_controller.VirtualJoystick(11)
+
+        self.assertEqual(manager.add_joystick(first), 0)
+        self.assertEqual(manager.add_joystick(second), 1)
+        self.assertEqual(manager.add_joystick(first), 0)
+        manager.remove_device(10)
+
+        # another model takes a slot nobody has used before the one first left
+        self.assertEqual(manager.add_joystick(xbox360_controller.VirtualJoystick(12)), 2)
+        self.assertEqual(manager.add_joystick(xbox360_controller.VirtualJoystick(10)), 0)
+        self.assertIsNone(manager.add_joystick(xbox360_controller.VirtualJoystick(13)))
+
+    def test_identical_pads_share_a_key(self):
+        manager = self.manager
+
+        # like two wired 360 pads, which have the same GUID
+        pads = [xbox360_controller.VirtualJoystick(20), xbox360_controller.VirtualJoystick(21)]
+        for pad in pads:
+            pad.get_guid = lambda: "wired-360"
+            manager.add_joystick(pad)
+
+        manager.remove_device(20)
+        manager.remove_device(21)
+        self.assertEqual(manager.add_joystick(pads[1]), 0)
+        self.assertEqual(manager.add_joystick(pads[0]), 1)
+
+
+class AsyncTest(unittest.TestCase):
+
+    def setUp(self):
+        self.joystick = xbox360_controller.VirtualJoystick(0)
+        self.controller = xbox360_controller.Controller(dead_zone=0.0, joystick=self.joystick)
+        self.start = self.controller.layout.buttons["START"]
+        self.x_axis = self.controller.left_stick_axes[0]
+
+    def test_wait_for_button(self):
+        async def press_later():
+            await asyncio.sleep(0.01)
+            self.joystick.press(self.start)
+
+        async def main():
+            asyncio.get_running_loop().create_task(press_later())
+            return await asyncio.wait_for(self.controller.wait_for_button(self.start, rate_hz=1000), 1.0)
+
+        state = asyncio.run(main())
+        self.assertEqual(state.buttons[self.start], 1)
+
+        # the getters read the joystick again afterwards
+        self.joystick.set_axis(self.x_axis, 0.5)
+        self.assertEqual(self.controller.get_left_stick()[0], 0.5)
+
+    def test_stream_polls(self):
+        async def main():
+            states = self.controller.stream(rate_hz=1000)
+            frames = []
+
+            async for state in states:
+                frames.append(self.controller.frame)
+                self.joystick.set_axis(self.x_axis, len(frames) / 10)
+                if len(frames) == 3:
+                    break
+
+            # a snapshot until the stream is closed
+            self.assertEqual(self.controller.get_left_stick()[0], 0.2)
+            await states.aclose()
+
+            return frames
+
+        self.assertEqual(asyncio.run(main()), [1, 2, 3])
+        self.assertEqual(self.controller.get_left_stick()[0], 0.3)
+
+
+class LatencyTest(unittest.TestCase):
+
+    def test_histogram_percentiles(self):
+        histogram = xbox360_controller.LatencyHistogram()
+        for nanoseconds in range(1, 1001):
+            histogram.record(nanoseconds)
+
+        summary = histogram.summary()
+        self.assertEqual(summary["count"], 1000)
+        self.assertEqual(summary["mean"], 500)
+        self.assertEqual(summary["max"], 1000)
+
+        for percent in (50, 90, 99):
+            exact = percent * 10
+            self.assertGreaterEqual(histogram.percentile(percent), exact)
+            self.assertLessEqual(histogram.percentile(percent), exact * 1.25)
+
+    def test_shared_stats_keep_controllers_apart(self):
+        first = xbox360_controller.Controller(joystick=xbox360_controller.VirtualJoystick(0),
+                                              event_driven=True)
+        second = xbox360_controller.Controller(joystick=xbox360_controller.VirtualJoystick(1),
+                                               event_driven=True)
+        stats = first.instrument()
+        second.instrument(stats)
+
+        first.handle_event(pygame.event.Event(pygame.JOYBUTTONDOWN, joy=0, instance_id=0, button=0))
+        delays = stats.histograms["handle_to_read.buttons"]
+
+        second.get_buttons()
+        self.assertEqual(delays.count, 0)
+
+        first.get_buttons()
+        first.get_buttons()
+        self.assertEqual(delays.count, 1)
+        self.assertEqual(stats.histograms["get_buttons"].count, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
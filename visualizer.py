@@ -6,6 +6,9 @@
 #      <https://github.com/joncoop/pygame-xbox360controller>.
 
 
+import argparse
+import collections
+import math
 import pygame
 import xbox360_controller
 
@@ -19,186 +22,425 @@ GREY = (175, 175, 175)
 
 pygame.init()
 
-size = [600, 670]
-screen = pygame.display.set_mode(size)
-pygame.display.set_caption("X-Box 360 Controller")
+PANEL_SIZE = [600, 670]
 
 FPS = 60
 clock = pygame.time.Clock()
 
-# make a controller (should this be in the game loop?)
-controller = xbox360_controller.Controller()
+class TextCache:
+    """
+    Renders text with one shared font and keeps the rendered surfaces. Labels
+    are static so they are all kept. Values change every frame, so only the
+    most recently used ones are kept.
+    """
 
-def display_text(screen, text, x, y):
-    my_font = pygame.font.Font(None, 30)
-    output = my_font.render(text, True, WHITE)
-    screen.blit(output, [x, y])
+    def __init__(self, size=30, max_values=256):
+        self.font = pygame.font.Font(None, size)
+        self.labels = {}
+        self.values = collections.OrderedDict()
+        self.max_values = max_values
 
-# game loop
-running = True
+    def label(self, text):
+        surface = self.labels.get(text)
 
-while running:
-    # event handling
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
+        if surface is None:
+            surface = self.font.render(text, True, WHITE)
+            self.labels[text] = surface
 
-    # joystick stuff
-    pressed = controller.get_buttons()
+        return surface
 
-    a_btn = pressed[xbox360_controller.A]
-    b_btn = pressed[xbox360_controller.B]
-    x_btn = pressed[xbox360_controller.X]
-    y_btn = pressed[xbox360_controller.Y]
-    back = pressed[xbox360_controller.BACK]
-    start = pressed[xbox360_controller.START]
-    # guide = pressed[xbox360_controller.GUIDE]
-    lt_bump = pressed[xbox360_controller.LEFT_BUMP]
-    rt_bump = pressed[xbox360_controller.RIGHT_BUMP]
-    lt_stick_btn = pressed[xbox360_controller.LEFT_STICK_BTN]
-    rt_stick_btn = pressed[xbox360_controller.RIGHT_STICK_BTN]
+    def value(self, text):
+        surface = self.values.get(text)
 
-    lt_x, lt_y = controller.get_left_stick()
-    rt_x, rt_y = controller.get_right_stick()
+        if surface is None:
+            surface = self.font.render(text, True, WHITE)
+            self.values[text] = surface
 
-    triggers = controller.get_triggers()
+            if len(self.values) > self.max_values:
+                self.values.popitem(last=False)
+        else:
+            self.values.move_to_end(text)
 
-    pad_up, pad_right, pad_down, pad_left = controller.get_pad()
+        return surface
 
+text_cache = TextCache()
 
-    # drawing
-    screen.fill(BLACK)
+def display_text(screen, text, x, y):
+    screen.blit(text_cache.label(text), [x, y])
+
+def display_value(screen, label, value, x, y):
+    label_surface = text_cache.label(label)
+    screen.blit(label_surface, [x, y])
+    screen.blit(text_cache.value(str(value)), [x + label_surface.get_width(), y])
+
+class Widget:
+    """
+    One part of the display that is only redrawn when its value changes. The
+    reader function picks the widget's value out of a ControllerState.
+    """
+
+    def __init__(self, rect, reader):
+        self.rect = pygame.Rect(rect)
+        self.reader = reader
+        self.value = None
+
+    def draw(self, surface):
+        pass
+
+class ButtonWidget(Widget):
+    def __init__(self, rect, reader, color, ellipse=True):
+        super().__init__(rect, reader)
+        self.color = color
+        self.ellipse = ellipse
+
+    def draw(self, surface):
+        width = 0 if self.value == 1 else 2
+
+        if self.ellipse:
+            pygame.draw.ellipse(surface, self.color, self.rect, width)
+        else:
+            pygame.draw.rect(surface, self.color, self.rect, width)
+
+class TriggerWidget(Widget):
+    def __init__(self, x, y, reader):
+        super().__init__([x, y - 10, 201, 21], reader)
+        self.x, self.y = x, y
+
+    def draw(self, surface):
+        x, y = self.x, self.y
+        trigger_x = x + 100 + self.value
+
+        pygame.draw.line(surface, WHITE, [x, y], [x + 200, y])
+        pygame.draw.line(surface, WHITE, [trigger_x, y - 10], [trigger_x, y + 10])
+
+class StickWidget(Widget):
+    def __init__(self, x, y, reader):
+        super().__init__([x, y, 121, 121], reader)
+        self.x, self.y = x, y
+
+    def draw(self, surface):
+        x, y = self.x, self.y
+        offset_x, offset_y, pressed = self.value
+
+        stick_x = x + 50 + offset_x
+        stick_y = y + 50 + offset_y
+
+        pygame.draw.line(surface, WHITE, [x + 60, y], [x + 60, y + 120], 1)
+        pygame.draw.line(surface, WHITE, [x, y + 60], [x + 120, y + 60], 1)
+        if pressed == 0:
+            pygame.draw.ellipse(surface, WHITE, [stick_x, stick_y, 20, 20], 2)
+        else:
+            pygame.draw.ellipse(surface, WHITE, [stick_x, stick_y, 20, 20])
+
+class PadWidget(Widget):
+    def __init__(self, x, y, reader):
+        super().__init__([x, y, 100, 100], reader)
+        self.x, self.y = x, y
+
+    def draw(self, surface):
+        x, y = self.x, self.y
+        pad_up, pad_right, pad_down, pad_left = self.value
+
+        pygame.draw.ellipse(surface, WHITE, [x, y, 100, 100])
+        if pad_up:
+            pygame.draw.ellipse(surface, GREY, [x + 40, y, 20, 20])
+        if pad_right:
+            pygame.draw.ellipse(surface, GREY, [x + 80, y + 40, 20, 20])
+        if pad_down:
+            pygame.draw.ellipse(surface, GREY, [x + 40, y +80, 20, 20])
+        if pad_left:
+            pygame.draw.ellipse(surface, GREY, [x, y + 40, 20, 20])
+
+class ValueWidget(Widget):
+    def __init__(self, label, x, y, reader, width=270):
+        super().__init__([x, y, width, 25], reader)
+        self.label = label
+
+    def draw(self, surface):
+        display_value(surface, self.label, self.value, self.rect.x, self.rect.y)
+
+def button(number):
+    return lambda state: state.buttons[number]
+
+def stick_offset(stick, button_number):
+    return lambda state: (round(getattr(state, stick)[0] * 50),
+                          round(getattr(state, stick)[1] * 50),
+                          state.buttons[button_number])
+
+def rounded(reader):
+    return lambda state: round(reader(state), 2)
+
+def rounded_pair(stick):
+    return lambda state: (round(getattr(state, stick)[0], 2), round(getattr(state, stick)[1], 2))
+
+def pad(direction):
+    return lambda state: state.pad[direction]
+
+class ControllerPanel:
+    """
+    The controller mockup and value table for one controller. Only widgets whose
+    values changed are redrawn, along with any widgets they overlap.
+    """
+
+    def __init__(self, surface):
+        self.surface = surface
+
+        A = xbox360_controller.A
+        B = xbox360_controller.B
+        X = xbox360_controller.X
+        Y = xbox360_controller.Y
+        BACK = xbox360_controller.BACK
+        START = xbox360_controller.START
+        LEFT_BUMP = xbox360_controller.LEFT_BUMP
+        RIGHT_BUMP = xbox360_controller.RIGHT_BUMP
+        LEFT_STICK_BTN = xbox360_controller.LEFT_STICK_BTN
+        RIGHT_STICK_BTN = xbox360_controller.RIGHT_STICK_BTN
+
+        # widgets are drawn in this order
+        self.widgets = [
+            # a, b, x, y
+            ButtonWidget([480, 180, 25, 25], button(A), GREEN),
+            ButtonWidget([510, 150, 25, 25], button(B), RED),
+            ButtonWidget([450, 150, 25, 25], button(X), BLUE),
+            ButtonWidget([480, 120, 25, 25], button(Y), AMBER),
+
+            # back, start
+            ButtonWidget([250, 145, 25, 20], button(BACK), WHITE),
+            ButtonWidget([345, 145, 25, 20], button(START), WHITE),
+
+            # bumpers
+            ButtonWidget([100, 50, 50, 25], button(LEFT_BUMP), WHITE, ellipse=False),
+            ButtonWidget([465, 50, 50, 25], button(RIGHT_BUMP), WHITE, ellipse=False),
+
+            TriggerWidget(210, 60, lambda state: round(state.triggers * 100)),
+            StickWidget(65, 100, stick_offset("left_stick", LEFT_STICK_BTN)),
+            StickWidget(330, 190, stick_offset("right_stick", RIGHT_STICK_BTN)),
+            PadWidget(180, 200, lambda state: state.pad),
+
+            # joystick values
+            ValueWidget("A: ", 50, 395, button(A)),
+            ValueWidget("B: ", 50, 420, button(B)),
+            ValueWidget("X: ", 50, 445, button(X)),
+            ValueWidget("Y: ", 50, 470, button(Y)),
+            ValueWidget("LB: ", 50, 495, button(LEFT_BUMP)),
+            ValueWidget("RB: ", 50, 520, button(RIGHT_BUMP)),
+            ValueWidget("Back: ", 50, 545, button(BACK)),
+            ValueWidget("Start: ", 50, 570, button(START)),
+            ValueWidget("LT Stick Btn: ", 50, 595, button(LEFT_STICK_BTN)),
+            ValueWidget("RT Stick Btn: ", 50, 620, button(RIGHT_STICK_BTN)),
+
+            ValueWidget("Left Stick: ", 325, 395, rounded_pair("left_stick"), 275),
+            ValueWidget("Right Stick: ", 325, 420, rounded_pair("right_stick"), 275),
+            ValueWidget("Triggers: ", 325, 445, rounded(lambda state: state.triggers), 275),
+
+            ValueWidget("Up: ", 325, 520, pad(0), 275),
+            ValueWidget("Right: ", 325, 545, pad(1), 275),
+            ValueWidget("Down: ", 325, 570, pad(2), 275),
+            ValueWidget("Left: ", 325, 595, pad(3), 275),
+        ]
+
+        # Clearing a widget's rect erases anything it overlaps, so those widgets
+        # are redrawn with it.
+        self.overlaps = {}
+        for widget in self.widgets:
+            self.overlaps[widget] = [other for other in self.widgets
+                                     if other is not widget and other.rect.colliderect(widget.rect)]
+
+    def draw_static(self, title=None):
+        """
+        Draws everything that never changes. Call this once before update().
+        """
+
+        surface = self.surface
+        surface.fill(BLACK)
+
+        ''' controller outline '''
+        pygame.draw.rect(surface, GREY, [40, 20, 520, 320], 3)
+
+        ''' guide '''
+        pygame.draw.ellipse(surface, GREY, [290, 135, 40, 40])
+
+        ''' headings '''
+        display_text(surface, "BUTTONS", 50, 370)
+        display_text(surface, "AXES", 325, 370)
+        display_text(surface, "D-PAD", 325, 495)
+
+        if title is not None:
+            display_text(surface, title, 325, 635)
+
+    def update(self, state):
+        """
+        Redraws the widgets whose values changed.
+
+        Returns:
+            A list of the rects that were redrawn.
+        """
+
+        changed = set()
+
+        for widget in self.widgets:
+            value = widget.reader(state)
+
+            if value != widget.value:
+                widget.value = value
+                changed.add(widget)
+                changed.update(self.overlaps[widget])
+
+        if not changed:
+            return []
+
+        dirty = []
+        for widget in self.widgets:
+            if widget in changed:
+                self.surface.fill(BLACK, widget.rect)
+                dirty.append(widget.rect)
+
+        for widget in self.widgets:
+            if widget in changed:
+                widget.draw(self.surface)
+
+        return dirty
+
+class GridCell:
+    """
+    One controller's panel in grid mode. The panel is drawn at full size to its
+    own offscreen surface, and only the parts that were redrawn are scaled onto
+    the screen.
+    """
+
+    def __init__(self, slot):
+        self.scale = scale
+        self.origin = [(slot % columns) * cell_size[0], (slot // columns) * cell_size[1]]
+
+        self.surface = pygame.Surface(PANEL_SIZE)
+        self.panel = ControllerPanel(self.surface)
+        self.panel.draw_static("Player {}".format(slot + 1))
+
+    def update(self, state):
+        """
+        Returns:
+            The screen rects that changed.
+        """
+
+        return [self.present(rect) for rect in self.panel.update(state)]
 
-    ''' controller outline '''
-    pygame.draw.rect(screen, GREY, [40, 20, 520, 320], 3)
+    def present(self, rect=None):
+        """
+        Scales part of the panel onto the screen.
 
-    ''' a, b, x, y '''
-    x, y = 450, 120
+        Returns:
+            The screen rect that was drawn.
+        """
 
-    if a_btn == 1:
-        pygame.draw.ellipse(screen, GREEN, [x + 30, y + 60, 25, 25])
-    else:
-        pygame.draw.ellipse(screen, GREEN, [x + 30, y + 60, 25, 25], 2)
+        if rect is None:
+            rect = self.surface.get_rect()
 
-    if b_btn == 1:
-        pygame.draw.ellipse(screen, RED, [x + 60, y + 30, 25, 25])
-    else:
-        pygame.draw.ellipse(screen, RED, [x + 60, y + 30, 25, 25], 2)
+        # Grow the area a little so the scaled edges don't leave seams.
+        rect = rect.inflate(4, 4).clip(self.surface.get_rect())
 
-    if x_btn == 1:
-        pygame.draw.ellipse(screen, BLUE, [x, y + 30, 25, 25])
-    else:
-        pygame.draw.ellipse(screen, BLUE, [x, y + 30, 25, 25], 2)
+        left = math.floor(rect.left * self.scale)
+        top = math.floor(rect.top * self.scale)
+        width = max(math.ceil(rect.right * self.scale) - left, 1)
+        height = max(math.ceil(rect.bottom * self.scale) - top, 1)
 
-    if y_btn == 1:
-        pygame.draw.ellipse(screen, AMBER, [x + 30, y, 25, 25])
-    else:
-        pygame.draw.ellipse(screen, AMBER, [x + 30, y, 25, 25], 2)
+        scaled = pygame.transform.smoothscale(self.surface.subsurface(rect), [width, height])
+        screen_rect = screen.blit(scaled, [self.origin[0] + left, self.origin[1] + top])
 
-    ''' back, start '''
-    x, y = 250, 145
+        return screen_rect
 
-    if back == 1:
-        pygame.draw.ellipse(screen, WHITE, [x, y, 25, 20])
-    else:
-        pygame.draw.ellipse(screen, WHITE, [x, y, 25, 20], 2)
+def run_single():
+    # make a controller (should this be in the game loop?)
+    controller = xbox360_controller.Controller()
 
-    pygame.draw.ellipse(screen, GREY, [x + 40, y - 10, 40, 40])
+    panel = ControllerPanel(screen)
+    panel.draw_static()
+    pygame.display.flip()
 
-    if start == 1:
-        pygame.draw.ellipse(screen, WHITE, [x + 95, y, 25, 20])
-    else:
-        pygame.draw.ellipse(screen, WHITE, [x + 95, y, 25, 20], 2)
+    # game loop
+    running = True
 
-    ''' bumpers '''
-    x, y = 100, 50
+    while running:
+        # event handling
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
 
-    if lt_bump == 1:
-        pygame.draw.rect(screen, WHITE, [x, 50, y, 25])
-    else:
-        pygame.draw.rect(screen, WHITE, [x, 50, y, 25], 2)
+        # joystick stuff
+        state = controller.poll()
 
-    if rt_bump == 1:
-        pygame.draw.rect(screen, WHITE, [x + 365, y, 50, 25])
-    else:
-        pygame.draw.rect(screen, WHITE, [x + 365, y, 50, 25], 2)
+        # drawing
+        dirty_rects = panel.update(state)
 
-    ''' triggers '''
-    x, y = 210, 60
+        # update screen
+        if dirty_rects:
+            pygame.display.update(dirty_rects)
 
-    trigger_x = x + 100 + round(triggers * 100)
-    pygame.draw.line(screen, WHITE, [x, y], [x + 200, y])
-    pygame.draw.line(screen, WHITE, [trigger_x, y - 10], [trigger_x, y + 10])
+        clock.tick(FPS)
 
-    ''' left stick '''
-    x, y = 65, 100
+def run_grid(players):
+    # Event-driven controllers only change when an event arrives, so only the
+    # cells of controllers that sent events need updating.
+    manager = xbox360_controller.ControllerManager(max_players=players, event_driven=True)
+    cells = [GridCell(slot) for slot in range(players)]
 
-    left_x = x + 50 + round(lt_x * 50)
-    left_y = y + 50 + round(lt_y * 50)
+    for cell in cells:
+        cell.present()
+    pygame.display.flip()
 
-    pygame.draw.line(screen, WHITE, [x + 60, y], [x + 60, y + 120], 1)
-    pygame.draw.line(screen, WHITE, [x, y + 60], [x + 120, y + 60], 1)
-    if lt_stick_btn == 0:
-        pygame.draw.ellipse(screen, WHITE, [left_x, left_y, 20, 20], 2)
+    changed = set(range(players))
+
+    # game loop
+    running = True
+
+    while running:
+        # event handling
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+
+            # handles hot-plugging as well as input
+            slot = manager.handle_event(event)
+            if slot is not None:
+                changed.add(slot)
+
+        # drawing
+        dirty_rects = []
+        for slot in changed:
+            controller = manager.controllers[slot]
+            if controller is not None:
+                dirty_rects.extend(cells[slot].update(controller.state))
+        changed.clear()
+
+        # update screen
+        if dirty_rects:
+            pygame.display.update(dirty_rects)
+
+        clock.tick(FPS)
+
+# The panels can be imported without opening a window, e.g. by benchmark.py.
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Show the values returned by xbox360_controller.")
+    parser.add_argument("--grid", type=int, metavar="N",
+                        help="show up to N controllers in a grid instead of a single controller")
+    args = parser.parse_args()
+
+    if args.grid:
+        # fit the grid in roughly 1280x960
+        columns = math.ceil(math.sqrt(args.grid))
+        rows = math.ceil(args.grid / columns)
+        scale = min(1280 / (columns * PANEL_SIZE[0]), 960 / (rows * PANEL_SIZE[1]), 1)
+        cell_size = [int(PANEL_SIZE[0] * scale), int(PANEL_SIZE[1] * scale)]
+        size = [columns * cell_size[0], rows * cell_size[1]]
     else:
-        pygame.draw.ellipse(screen, WHITE, [left_x, left_y, 20, 20])
-
-    ''' right stick '''
-    x, y = 330, 190
+        size = PANEL_SIZE
 
-    right_x = x + 50 + round(rt_x * 50)
-    right_y = y + 50 + round(rt_y * 50)
+    screen = pygame.display.set_mode(size)
+    pygame.display.set_caption("X-Box 360 Controller")
 
-    pygame.draw.line(screen, WHITE, [x + 60, y], [x + 60, y + 120], 1)
-    pygame.draw.line(screen, WHITE, [x, y + 60], [x + 120, y + 60], 1)
-    if rt_stick_btn == 0:
-        pygame.draw.ellipse(screen, WHITE, [right_x, right_y, 20, 20], 2)
+    if args.grid:
+        run_grid(args.grid)
     else:
-        pygame.draw.ellipse(screen, WHITE, [right_x, right_y, 20, 20])
-
-    ''' hat '''
-    x, y = 180, 200
-
-    pygame.draw.ellipse(screen, WHITE, [x, y, 100, 100])
-    if pad_up:
-        pygame.draw.ellipse(screen, GREY, [x + 40, y, 20, 20])
-    if pad_right:
-        pygame.draw.ellipse(screen, GREY, [x + 80, y + 40, 20, 20])
-    if pad_down:
-        pygame.draw.ellipse(screen, GREY, [x + 40, y +80, 20, 20])
-    if pad_left:
-        pygame.draw.ellipse(screen, GREY, [x, y + 40, 20, 20])
-
-    ''' joystick values '''
-    x, y = 50, 370
-    display_text(screen, "BUTTONS", x, y)
-    display_text(screen, "A: {}".format(a_btn), x, y+ 25)
-    display_text(screen, "B: {}".format(b_btn), x, y + 50)
-    display_text(screen, "X: {}".format(x_btn), x, y + 75)
-    display_text(screen, "Y: {}".format(y_btn), x, y + 100)
-    display_text(screen, "LB: {}".format(lt_bump), x, y + 125)
-    display_text(screen, "RB: {}".format(rt_bump), x, y + 150)
-    display_text(screen, "Back: {}".format(back), x, y + 175)
-    display_text(screen, "Start: {}".format(start), x, y + 200)
-    display_text(screen, "LT Stick Btn: {}".format(lt_stick_btn), x, y + 225)
-    display_text(screen, "RT Stick Btn: {}".format(rt_stick_btn), x, y + 250)
-
-    display_text(screen, "AXES", x + 275, y)
-    display_text(screen, "Left Stick: ({}, {})".format(round(lt_x, 2), round(lt_y, 2)), x + 275, y + 25)
-    display_text(screen, "Right Stick: ({}, {})".format(round(rt_x, 2), round(rt_y, 2)), x + 275, y + 50)
-    display_text(screen, "Triggers: {}".format(round(triggers, 2)), x + 275, y + 75)
-
-    display_text(screen, "D-PAD", x + 275, y + 125)
-    display_text(screen, "Up: {}".format(pad_up), x + 275, y + 150)
-    display_text(screen, "Right: {}".format(pad_right), x + 275, y + 175)
-    display_text(screen, "Down: {}".format(pad_down), x + 275, y + 200)
-    display_text(screen, "Left: {}".format(pad_left), x + 275, y + 225)
-
-    pygame.display.flip()
-
-    # update screen
-    pygame.display.flip()
-    clock.tick(FPS)
+        run_single()
 
-# close window on quit
-pygame.quit ()
+    # close window on quit
+    pygame.quit ()
@@ -6,121 +6,854 @@
 #      <https://github.com/joncoop/pygame-xbox360controller>.
 
 
-import pygame
+import contextlib
+import importlib.metadata
+import json
+import operator
+import os
 import sys
+import time
 
 LINUX = 0
 MAC = 1
 WINDOWS = 2
 
 platform = sys.platform
-version = int(pygame.version.ver[0])
-
-if platform.startswith("lin"):
-    platform_id = LINUX
-elif platform.startswith("darwin"):
-    platform_id = MAC
-elif platform.startswith("win"):
-    platform_id = WINDOWS
-
-if platform_id == LINUX:
-    # buttons
-    A = 0
-    B = 1
-    X = 2
-    Y = 3
-    LEFT_BUMP = 4
-    RIGHT_BUMP = 5
-    BACK = 6
-    START = 7
-    # GUIDE = 8
-    LEFT_STICK_BTN = 9
-    RIGHT_STICK_BTN = 10
-
-    # axes
-    LEFT_STICK_X = 0
-    LEFT_STICK_Y = 1
-    RIGHT_STICK_X = 3
-    RIGHT_STICK_Y = 4
-    LEFT_TRIGGER = 2
-    RIGHT_TRIGGER = 5
-
-elif platform_id == WINDOWS:
-    # buttons
-    A = 0
-    B = 1
-    X = 2
-    Y = 3
-    LEFT_BUMP = 4
-    RIGHT_BUMP = 5
-    BACK = 6
-    START = 7
-    LEFT_STICK_BTN = 8
-    RIGHT_STICK_BTN = 9
-
-    # axes
-    LEFT_STICK_X = 0
-    LEFT_STICK_Y = 1
-    if version == 2:
-        RIGHT_STICK_X = 2
-        RIGHT_STICK_Y = 3
-        LEFT_TRIGGER = 4
-        RIGHT_TRIGGER = 5
-    else:
-        RIGHT_STICK_X = 4
-        RIGHT_STICK_Y = 3
-        TRIGGERS = 2
-
-elif platform_id == MAC:
-    # buttons
-    A = 11
-    B = 12
-    X = 13
-    Y = 14
-    LEFT_BUMP = 8
-    RIGHT_BUMP = 9
-    BACK = 5
-    START = 4
-    LEFT_STICK_BTN = 6
-    RIGHT_STICK_BTN = 7
-
-    # d-pad
-    PAD_UP = 0
-    PAD_DOWN = 1
-    PAD_LEFT = 2
-    PAD_RIGHT = 3
-
-    # axes
-    LEFT_STICK_X = 0
-    LEFT_STICK_Y = 1
-    RIGHT_STICK_X = 2
-    RIGHT_STICK_Y = 3
-    LEFT_TRIGGER = 4
-    RIGHT_TRIGGER = 5
+
+# pygame is only imported once something needs it. See import_pygame().
+pygame = None
+
+# The platform and pygame version are worked out the first time a Controller is
+# made or one of platform_id, version or the input constants is used. Reading
+# them from this module does this automatically. See resolve_platform().
+
+# How the triggers are reported. See Controller.get_triggers().
+TRIGGERS_SPLIT = 0       # one axis per trigger, -1 when released
+TRIGGERS_SPLIT_LAZY = 1  # one axis per trigger, but 0 until first pulled
+TRIGGERS_COMBINED = 2    # both triggers share a single axis
+
+
+class Layout:
+    """
+    Describes where each input on the controller shows up in pygame's button,
+    axis and hat numbering for one platform and pygame version.
+    """
+
+    def __init__(self, buttons, axes, triggers, pad_buttons=None):
+        """
+        Args:
+            buttons: A dict mapping button names to pygame button numbers.
+            axes: A dict mapping axis names to pygame axis numbers.
+            triggers: One of TRIGGERS_SPLIT, TRIGGERS_SPLIT_LAZY or
+                TRIGGERS_COMBINED.
+            pad_buttons: A dict mapping d-pad directions to pygame button
+                numbers, or None if the d-pad is reported as hat 0.
+        """
+
+        self.buttons = buttons
+        self.axes = axes
+        self.triggers = triggers
+        self.pad_buttons = pad_buttons
+
+        # get_buttons() returns a tuple indexed by button number. Numbers that
+        # don't belong to a named button are always 0.
+        self.num_buttons = max(buttons.values()) + 1
+        self.button_reads = tuple(sorted(buttons.values()))
+
+        slots = [0] * self.num_buttons
+        for position, button in enumerate(self.button_reads):
+            slots[button] = position + 1
+        self.button_gather = operator.itemgetter(*slots)
+
+    def constants(self):
+        """
+        Returns:
+            A dict of every button, axis and d-pad constant in this layout.
+        """
+
+        constants = dict(self.buttons)
+        constants.update(self.axes)
+        if self.pad_buttons is not None:
+            constants.update(self.pad_buttons)
+
+        return constants
+
+
+LINUX_BUTTONS = {"A": 0, "B": 1, "X": 2, "Y": 3,
+                 "LEFT_BUMP": 4, "RIGHT_BUMP": 5,
+                 "BACK": 6, "START": 7,
+                 # "GUIDE": 8,
+                 "LEFT_STICK_BTN": 9, "RIGHT_STICK_BTN": 10}
+
+LINUX_AXES = {"LEFT_STICK_X": 0, "LEFT_STICK_Y": 1,
+              "RIGHT_STICK_X": 3, "RIGHT_STICK_Y": 4,
+              "LEFT_TRIGGER": 2, "RIGHT_TRIGGER": 5}
+
+WINDOWS_BUTTONS = {"A": 0, "B": 1, "X": 2, "Y": 3,
+                   "LEFT_BUMP": 4, "RIGHT_BUMP": 5,
+                   "BACK": 6, "START": 7,
+                   "LEFT_STICK_BTN": 8, "RIGHT_STICK_BTN": 9}
+
+WINDOWS_AXES_1 = {"LEFT_STICK_X": 0, "LEFT_STICK_Y": 1,
+                  "RIGHT_STICK_X": 4, "RIGHT_STICK_Y": 3,
+                  "TRIGGERS": 2}
+
+WINDOWS_AXES_2 = {"LEFT_STICK_X": 0, "LEFT_STICK_Y": 1,
+                  "RIGHT_STICK_X": 2, "RIGHT_STICK_Y": 3,
+                  "LEFT_TRIGGER": 4, "RIGHT_TRIGGER": 5}
+
+MAC_BUTTONS = {"A": 11, "B": 12, "X": 13, "Y": 14,
+               "LEFT_BUMP": 8, "RIGHT_BUMP": 9,
+               "BACK": 5, "START": 4,
+               "LEFT_STICK_BTN": 6, "RIGHT_STICK_BTN": 7}
+
+MAC_PAD = {"PAD_UP": 0, "PAD_DOWN": 1, "PAD_LEFT": 2, "PAD_RIGHT": 3}
+
+MAC_AXES = {"LEFT_STICK_X": 0, "LEFT_STICK_Y": 1,
+            "RIGHT_STICK_X": 2, "RIGHT_STICK_Y": 3,
+            "LEFT_TRIGGER": 4, "RIGHT_TRIGGER": 5}
+
+# Layouts are keyed by (platform_id, pygame major version).
+LAYOUTS = {
+    (LINUX, 1): Layout(LINUX_BUTTONS, LINUX_AXES, TRIGGERS_SPLIT_LAZY),
+    (LINUX, 2): Layout(LINUX_BUTTONS, LINUX_AXES, TRIGGERS_SPLIT_LAZY),
+    (WINDOWS, 1): Layout(WINDOWS_BUTTONS, WINDOWS_AXES_1, TRIGGERS_COMBINED),
+    (WINDOWS, 2): Layout(WINDOWS_BUTTONS, WINDOWS_AXES_2, TRIGGERS_SPLIT),
+    (MAC, 1): Layout(MAC_BUTTONS, MAC_AXES, TRIGGERS_SPLIT_LAZY, MAC_PAD),
+    (MAC, 2): Layout(MAC_BUTTONS, MAC_AXES, TRIGGERS_SPLIT_LAZY, MAC_PAD),
+}
+
+
+
+def import_pygame():
+    """
+    Imports pygame the first time it is needed, along with the pygame event
+    types this module uses. Tools that never touch a joystick, such as log
+    analyzers, can import this module without paying for pygame.
+
+    Returns:
+        The pygame module.
+    """
+
+    global pygame, JOYAXISMOTION, JOYHATMOTION, JOYBUTTONDOWN, JOYBUTTONUP
+    global JOYSTICK_EVENTS, JOYDEVICEADDED, JOYDEVICEREMOVED
+
+    if pygame is None:
+        import pygame as module
+
+        JOYAXISMOTION = module.JOYAXISMOTION
+        JOYHATMOTION = module.JOYHATMOTION
+        JOYBUTTONDOWN = module.JOYBUTTONDOWN
+        JOYBUTTONUP = module.JOYBUTTONUP
+
+        # events handled by event-driven controllers
+        JOYSTICK_EVENTS = (JOYAXISMOTION, JOYHATMOTION, JOYBUTTONDOWN, JOYBUTTONUP)
+
+        # hot-plug events, which only exist in pygame 2
+        JOYDEVICEADDED = getattr(module, "JOYDEVICEADDED", None)
+        JOYDEVICEREMOVED = getattr(module, "JOYDEVICEREMOVED", None)
+
+        pygame = module
+
+    return pygame
+
+
+def detect_platform():
+    """
+    Returns:
+        LINUX, MAC or WINDOWS, or None if the platform isn't supported.
+    """
+
+    if platform.startswith("lin"):
+        return LINUX
+    elif platform.startswith("darwin"):
+        return MAC
+    elif platform.startswith("win"):
+        return WINDOWS
+
+    return None
+
+
+def detect_pygame_version():
+    """
+    Returns:
+        The major version of pygame. The installed package's metadata is used
+        when pygame hasn't been imported yet, so pygame isn't imported just to
+        check its version.
+    """
+
+    if pygame is not None:
+        return int(pygame.version.ver.split(".")[0])
+
+    for package in ("pygame", "pygame-ce"):
+        try:
+            return int(importlib.metadata.version(package).split(".")[0])
+        except importlib.metadata.PackageNotFoundError:
+            pass
+
+    return int(import_pygame().version.ver.split(".")[0])
+
+
+def resolve_platform():
+    """
+    Sets platform_id and version if they haven't been set already. Assign to
+    them beforehand to use another platform's layout.
+
+    Returns:
+        (platform_id, version)
+    """
+
+    module = globals()
+
+    if "platform_id" not in module:
+        module["platform_id"] = detect_platform()
+    if "version" not in module:
+        module["version"] = detect_pygame_version()
+
+    return module["platform_id"], module["version"]
+
+
+def get_layout():
+    """
+    Returns:
+        The Layout for the current platform and pygame version.
+    """
+
+    platform_id, version = resolve_platform()
+
+    try:
+        return LAYOUTS[platform_id, version]
+    except KeyError:
+        raise RuntimeError("no controller layout for platform {!r} with pygame {}".format(
+            platform, version)) from None
+
+
+def layout_key(layout):
+    """
+    Returns:
+        The (platform_id, pygame version) key of a layout in LAYOUTS, or the
+        current platform's key for a layout that isn't in it.
+    """
+
+    for key, value in LAYOUTS.items():
+        if value is layout:
+            return key
+
+    return resolve_platform()
+
+
+def get_constants():
+    """
+    Returns:
+        A dict of the button, axis and d-pad constants (A, B, LEFT_STICK_X, ...)
+        for the current platform.
+    """
+
+    return get_layout().constants()
+
+
+# The input constants are added to these in __all__. See __getattr__().
+PUBLIC_NAMES = ("LINUX", "MAC", "WINDOWS", "platform", "platform_id", "version",
+                "TRIGGERS_SPLIT", "TRIGGERS_SPLIT_LAZY", "TRIGGERS_COMBINED", "Layout", "LAYOUTS",
+                "import_pygame", "detect_platform", "detect_pygame_version", "resolve_platform",
+                "get_layout", "layout_key", "get_constants", "VirtualJoystick", "pygame_backend",
+                "virtual_backend", "BACKENDS", "use_backend", "LatencyHistogram", "LatencyStats",
+                "ControllerState", "Controller", "device_key", "ControllerManager")
+
+
+def __getattr__(name):
+    # Called for module attributes that don't exist yet, which is how the
+    # platform, the input constants and the pygame event types are resolved
+    # lazily. Once resolved they become ordinary module attributes.
+    if name in ("platform_id", "version"):
+        resolve_platform()
+        return globals()[name]
+
+    if name in ("JOYSTICK_EVENTS", "JOYDEVICEADDED", "JOYDEVICEREMOVED", "JOYAXISMOTION",
+                "JOYHATMOTION", "JOYBUTTONDOWN", "JOYBUTTONUP"):
+        import_pygame()
+        return globals()[name]
+
+    if name == "__all__":
+        # what "from xbox360_controller import *" exports: the public names,
+        # platform_id and version, and this platform's input constants
+        names = list(PUBLIC_NAMES)
+        if resolve_platform() in LAYOUTS:
+            names.extend(sorted(get_constants()))
+        return names
+
+    # Names that aren't constants on any platform are plain missing attributes,
+    # so hasattr() and getattr() with a default work on every platform.
+    if name.isupper() and any(name in layout.constants() for layout in LAYOUTS.values()):
+        constants = get_constants()
+        if name in constants:
+            globals().update(constants)
+            return constants[name]
+
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+
+
+class VirtualJoystick:
+    """
+    An in-memory joystick with the same methods as pygame.joystick.Joystick.
+    Its inputs are set from code, so a Controller can run with no hardware
+    attached, e.g. in tests or under SDL_VIDEODRIVER=dummy.
+    """
+
+    def __init__(self, id_num=0, num_axes=6, num_buttons=15, num_hats=1, name="Virtual Controller"):
+        """
+        Args:
+            id_num: The ID reported by get_id() (default 0)
+            num_axes: The number of axes (default 6)
+            num_buttons: The number of buttons. The default of 15 covers every
+                platform's layout. (default 15)
+            num_hats: The number of hats (default 1)
+            name: The name reported by get_name() (default "Virtual Controller")
+        """
+
+        self.id = id_num
+        self.name = name
+        self.axes = [0.0] * num_axes
+        self.buttons = [0] * num_buttons
+        self.hats = [(0, 0)] * num_hats
+
+        # the last (low, high, duration) passed to rumble()
+        self.rumble_values = (0, 0, 0)
+
+    # scripting
+
+    def press(self, button):
+        self.buttons[button] = 1
+
+    def release(self, button):
+        self.buttons[button] = 0
+
+    def set_axis(self, axis_number, value):
+        self.axes[axis_number] = value
+
+    def set_hat(self, value, hat_number=0):
+        self.hats[hat_number] = value
+
+    def reset(self):
+        """
+        Releases every button and centers every axis and hat.
+        """
+
+        self.axes[:] = [0.0] * len(self.axes)
+        self.buttons[:] = [0] * len(self.buttons)
+        self.hats[:] = [(0, 0)] * len(self.hats)
+
+    # pygame.joystick.Joystick methods
+
+    def init(self):
+        pass
+
+    def quit(self):
+        pass
+
+    def get_init(self):
+        return True
+
+    def get_id(self):
+        return self.id
+
+    def get_instance_id(self):
+        return self.id
+
+    def get_guid(self):
+        return "virtual-{}".format(self.id)
+
+    def get_name(self):
+        return self.name
+
+    def get_numaxes(self):
+        return len(self.axes)
+
+    def get_numbuttons(self):
+        return len(self.buttons)
+
+    def get_numhats(self):
+        return len(self.hats)
+
+    def get_axis(self, axis_number):
+        return self.axes[axis_number]
+
+    def get_button(self, button):
+        return self.buttons[button]
+
+    def get_hat(self, hat_number):
+        return self.hats[hat_number]
+
+    def rumble(self, low_frequency, high_frequency, duration):
+        self.rumble_values = (low_frequency, high_frequency, duration)
+        return True
+
+    def stop_rumble(self):
+        self.rumble_values = (0, 0, 0)
+
+
+# Backends open the joystick for a device index when a Controller is created
+# without one. They can be any function that takes the index and returns an
+# object with the pygame.joystick.Joystick methods.
+
+def pygame_backend(index):
+    return import_pygame().joystick.Joystick(index)
+
+
+# joysticks created by virtual_backend(), by device index
+virtual_joysticks = {}
+
+def virtual_backend(index):
+    joystick = VirtualJoystick(index)
+    virtual_joysticks[index] = joystick
+
+    return joystick
+
+
+BACKENDS = {"pygame": pygame_backend, "virtual": virtual_backend}
+
+# Set XBOX360_BACKEND=virtual to run games with no controller attached.
+backend = BACKENDS[os.environ.get("XBOX360_BACKEND", "pygame")]
+
+
+def use_backend(new_backend):
+    """
+    Changes how controllers created from now on open their joystick.
+
+    Args:
+        new_backend: A name from BACKENDS ("pygame" or "virtual") or a function
+            that takes a device index and returns a joystick.
+    """
+
+    global backend
+
+    if isinstance(new_backend, str):
+        new_backend = BACKENDS[new_backend]
+
+    backend = new_backend
+
+
+class LatencyHistogram:
+    """
+    Counts durations in nanoseconds using fixed buckets, four per power of two.
+    Recording a value is a few integer operations, and percentiles are accurate
+    to within a quarter of the value.
+    """
+
+    def __init__(self):
+        self.counts = [0] * 256
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def record(self, nanoseconds):
+        if nanoseconds < 4:
+            index = max(nanoseconds, 0)
+        else:
+            bits = nanoseconds.bit_length()
+            index = bits * 4 + ((nanoseconds >> (bits - 3)) & 3)
+
+        self.counts[index] += 1
+        self.count += 1
+        self.total += nanoseconds
+        if nanoseconds > self.max:
+            self.max = nanoseconds
+
+    def percentile(self, percent):
+        """
+        Returns:
+            The upper bound, in nanoseconds, of the bucket holding the given
+            percentile, or 0 if nothing has been recorded.
+        """
+
+        if self.count == 0:
+            return 0
+
+        target = self.count * percent / 100
+        seen = 0
+
+        for index, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= target:
+                return min(self.bucket_limit(index), self.max)
+
+        return self.max
+
+    @staticmethod
+    def bucket_limit(index):
+        if index < 4:
+            return index
+
+        bits, sub = divmod(index, 4)
+        return ((5 + sub) << (bits - 3)) - 1
+
+    def summary(self):
+        """
+        Returns:
+            A dict with the count, mean, p50, p90, p99 and max, in nanoseconds.
+        """
+
+        return {"count": self.count,
+                "mean": self.total // self.count if self.count else 0,
+                "p50": self.percentile(50),
+                "p90": self.percentile(90),
+                "p99": self.percentile(99),
+                "max": self.max}
+
+
+class LatencyStats:
+    """
+    A set of named LatencyHistograms. Controller.instrument() records how long
+    each getter takes under its own name. For event-driven controllers it also
+    records how long after handle_event() each input is first read, under
+    "handle_to_read.buttons", "handle_to_read.left_stick" and so on.
+
+    pygame doesn't pass on SDL's event timestamps, so the time an event spent in
+    the queue before the game took it off can't be measured. The hardware to
+    read latency is that time plus handle_to_read.
+    """
+
+    def __init__(self):
+        self.histograms = {}
+
+        # when each (controller, input group) last changed and hasn't been read
+        # since
+        self.pending = {}
+
+    def histogram(self, name):
+        histogram = self.histograms.get(name)
+
+        if histogram is None:
+            histogram = LatencyHistogram()
+            self.histograms[name] = histogram
+
+        return histogram
+
+    def timed(self, name, function, group=None, controller=None):
+        """
+        Returns:
+            A wrapper around function that records each call's duration under
+            name. If group is given, the wrapper also records how long ago that
+            input group last changed on controller, if it hasn't been read
+            since.
+        """
+
+        histogram = self.histogram(name)
+        perf_counter_ns = time.perf_counter_ns
+
+        if group is None:
+            def wrapper(*args):
+                start = perf_counter_ns()
+                result = function(*args)
+                histogram.record(perf_counter_ns() - start)
+
+                return result
+        else:
+            delay = self.histogram("handle_to_read." + group)
+            pending = self.pending
+            key = (controller, group)
+
+            def wrapper(*args):
+                start = perf_counter_ns()
+                result = function(*args)
+                end = perf_counter_ns()
+                histogram.record(end - start)
+
+                changed = pending.pop(key, None)
+                if changed is not None:
+                    delay.record(end - changed)
+
+                return result
+
+        return wrapper
+
+    @contextlib.contextmanager
+    def measure(self, name):
+        """
+        Times a block of code, e.g. a game's event handling loop.
+
+            with stats.measure("events"):
+                for event in pygame.event.get():
+                    ...
+        """
+
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.histogram(name).record(time.perf_counter_ns() - start)
+
+    def input_changed(self, controller, group):
+        self.pending[controller, group] = time.perf_counter_ns()
+
+    def summary(self):
+        """
+        Returns:
+            A dict with the summary of every histogram, by name.
+        """
+
+        return {name: histogram.summary() for name, histogram in sorted(self.histograms.items())}
+
+    def export(self, path):
+        """
+        Writes the summary and the raw bucket counts to a JSON file.
+        """
+
+        report = {"summary": self.summary(),
+                  "buckets": {name: histogram.counts for name, histogram in self.histograms.items()}}
+
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+
+    def reset(self):
+        self.histograms.clear()
+        self.pending.clear()
+
+
+class ControllerState:
+    """
+    A snapshot of every input on a controller. Controller.poll() refills the
+    same object each frame so all reads within a frame are consistent.
+
+    triggers is the combined value of get_triggers(). left_trigger and
+    right_trigger are each trigger on its own, from 0 (released) to 1. On
+    layouts where both triggers share one axis (Windows with pygame 1), they
+    are worked out from the combined value, so pulling both reads as neither.
+    """
+
+    __slots__ = ("buttons", "left_stick", "right_stick", "triggers", "left_trigger", "right_trigger",
+                 "pad", "button_mask")
+
+    def __init__(self):
+        self.buttons = ()
+        self.button_mask = 0
+        self.left_stick = (0, 0)
+        self.right_stick = (0, 0)
+        self.triggers = 0.0
+        self.left_trigger = 0.0
+        self.right_trigger = 0.0
+        self.pad = (0, 0, 0, 0)
+
+    def split_triggers(self):
+        """
+        Sets left_trigger and right_trigger from triggers, for states that only
+        have the combined value.
+        """
+
+        triggers = self.triggers
+        self.left_trigger = -triggers if triggers < 0 else 0.0
+        self.right_trigger = triggers if triggers > 0 else 0.0
 
 
 class Controller:
 
     id_num = 0
     
-    def __init__(self, dead_zone=0.15):
+    def __init__(self, dead_zone=0.15, joystick=None, event_driven=False, layout=None, calibration=None):
         """
         Initializes a controller. IDs for controllers begin at 0 and increment by 1
         each time a controller is initialized.
 
         Args:
             dead_zone: The size of dead zone for the analog sticks (default 0.15)
+            joystick: An object with the same methods as pygame.joystick.Joystick
+                to read from, such as a VirtualJoystick or a
+                recording.ReplayJoystick. If None, the current backend opens the
+                next device. (default None)
+            event_driven: If True, the controller is kept up to date by passing
+                pygame's joystick events to handle_event() instead of reading the
+                hardware. See handle_event(). (default False)
+            layout: The Layout to use instead of the current platform's, e.g. to
+                read a recording made on another platform. (default None)
+            calibration: A calibration.Calibration for the pad. See
+                calibrate(). (default None)
         """
         
-        self.joystick = pygame.joystick.Joystick(Controller.id_num)
-        self.joystick.init()
+        if joystick is None:
+            joystick = backend(Controller.id_num)
+            Controller.id_num += 1
+
         self.dead_zone = dead_zone
 
-        # Linux and Mac triggers behave funny. See get_triggers().
+        # Resolve the platform's layout once so the reads don't need to check
+        # the platform each time.
+        self.layout = layout if layout is not None else get_layout()
+        axes = self.layout.axes
+
+        self.left_stick_axes = (axes["LEFT_STICK_X"], axes["LEFT_STICK_Y"])
+        self.right_stick_axes = (axes["RIGHT_STICK_X"], axes["RIGHT_STICK_Y"])
+
+        if self.layout.triggers == TRIGGERS_COMBINED:
+            self.trigger_axes = (axes["TRIGGERS"],)
+            self._read_triggers = self._read_combined_triggers
+        elif self.layout.triggers == TRIGGERS_SPLIT_LAZY:
+            self.trigger_axes = (axes["LEFT_TRIGGER"], axes["RIGHT_TRIGGER"])
+            self._read_triggers = self._read_split_lazy_triggers
+        else:
+            self.trigger_axes = (axes["LEFT_TRIGGER"], axes["RIGHT_TRIGGER"])
+            self._read_triggers = self._read_split_triggers
+
+        if self.layout.pad_buttons is None:
+            self._read_pad = self._read_hat_pad
+        else:
+            pad = self.layout.pad_buttons
+            self.pad_buttons = (pad["PAD_UP"], pad["PAD_RIGHT"], pad["PAD_DOWN"], pad["PAD_LEFT"])
+            self._read_pad = self._read_button_pad
+
+        # Once poll() is called, the getters are served from this snapshot.
+        self.state = ControllerState()
+        self.polled = False
+
+        # Edge detection. Button n is bit n of the masks, so the button constants
+        # work as bit numbers. Both masks and the frame count advance on poll().
+        self.button_bits = tuple(1 << i for i in range(self.layout.num_buttons))
+        self.previous_mask = 0
+        self.frame = 0
+        self.press_frames = [0] * self.layout.num_buttons
+
+        # Set by recording.Recorder to capture each poll().
+        self.recorder = None
+
+        # Set by rumble.RumbleScheduler to be updated on each poll().
+        self.rumble = None
+
+        # Set by instrument().
+        self.latency = None
+
+        # Where the reads come from. In event-driven mode this is a mirror of the
+        # joystick that handle_event() keeps up to date. Either may be wrapped by
+        # the calibration. See attach().
+        self.event_driven = event_driven
+        self.calibration = calibration
+        self.mirror = None
+
+        if event_driven:
+            # event-driven controllers need pygame's event types
+            import_pygame()
+
+            # which reader to rerun when an axis or button changes
+            self.axis_readers = {}
+            for axis in self.left_stick_axes:
+                self.axis_readers[axis] = self._read_left_stick
+            for axis in self.right_stick_axes:
+                self.axis_readers[axis] = self._read_right_stick
+            for axis in self.trigger_axes:
+                self.axis_readers[axis] = self._read_triggers
+
+            # input groups, for latency instrumentation
+            self.reader_groups = {self._read_buttons: "buttons",
+                                  self._read_left_stick: "left_stick",
+                                  self._read_right_stick: "right_stick",
+                                  self._read_triggers: "triggers",
+                                  self._read_pad: "pad"}
+
+            self.button_readers = dict.fromkeys(self.layout.button_reads, self._read_buttons)
+            if self.layout.pad_buttons is None:
+                self.hat_reader = self._read_pad
+            else:
+                self.hat_reader = None
+                self.button_readers.update(dict.fromkeys(self.pad_buttons, self._read_pad))
+
+        self.attach(joystick)
+
+    def attach(self, joystick):
+        """
+        Makes the controller read from a different joystick, e.g. when a pad is
+        reconnected. The controller keeps its settings and edge-detection state.
+
+        Args:
+            joystick: An object with the same methods as pygame.joystick.Joystick.
+        """
+
+        joystick.init()
+        self.joystick = joystick
+        self.connected = True
+
+        if hasattr(joystick, "get_instance_id"):
+            self.instance_id = joystick.get_instance_id()
+        else:
+            self.instance_id = joystick.get_id()
+
+        # Linux and Mac triggers behave funny. See get_triggers(). A new joystick
+        # starts out with unused triggers again.
         self.left_trigger_used = False
         self.right_trigger_used = False
 
-        Controller.id_num += 1
+        if self.event_driven:
+            self.mirror = self._mirror_joystick()
+            inputs = self.mirror
+        else:
+            inputs = joystick
+
+        # The calibration is compiled here, once per connection, so reads only
+        # apply the precomputed corrections.
+        if self.calibration is not None:
+            inputs = self.calibration.wrap(inputs, self.layout)
+
+        self.inputs = inputs
+
+        if self.event_driven:
+            self.polled = True
+            self._read_all()
+
+    def calibrate(self, calibration):
+        """
+        Corrects the off-center sticks and short ranges of a worn pad. With the
+        sticks centered, a smaller dead zone can be used without drift.
+
+        Args:
+            calibration: A calibration.Calibration, or None to read the raw
+                values again.
+        """
+
+        self.calibration = calibration
+
+        if self.connected:
+            self.attach(self.joystick)
+
+    def detach(self):
+        """
+        Marks the controller as disconnected. Until attach() is called, every
+        input reads as released and centered.
+        """
+
+        inputs = self.inputs
+        self.connected = False
+        self.inputs = self.mirror = VirtualJoystick(self.instance_id, inputs.get_numaxes(),
+                                                    inputs.get_numbuttons(), inputs.get_numhats())
+        self._read_all()
+
+    def instrument(self, stats=None):
+        """
+        Turns on latency instrumentation. Every call to poll(), handle_event() and
+        the getters is timed. For event-driven controllers, the time from
+        handle_event() to the first read of each changed input is recorded too. Instrumentation
+        costs nothing until it is turned on.
+
+        Args:
+            stats: A LatencyStats to record into, e.g. one shared by several
+                controllers. If None, a new one is made. (default None)
+
+        Returns:
+            The LatencyStats being recorded into. It is also kept in latency.
+        """
+
+        if stats is None:
+            stats = LatencyStats()
+
+        self.latency = stats
+
+        for name, group in (("get_buttons", "buttons"),
+                            ("get_left_stick", "left_stick"),
+                            ("get_right_stick", "right_stick"),
+                            ("get_triggers", "triggers"),
+                            ("get_pad", "pad"),
+                            ("poll", None),
+                            ("handle_event", None)):
+            method = getattr(Controller, name).__get__(self)
+            setattr(self, name, stats.timed(name, method, group, self))
+
+        return stats
 
     def get_id(self):
         """
@@ -149,6 +882,192 @@ class Controller:
         else:
             return 0
 
+    def poll(self):
+        """
+        Reads every input on the controller in one pass and stores it in the
+        controller's state snapshot. After the first call to poll(), get_buttons(),
+        get_left_stick(), get_right_stick(), get_triggers() and get_pad() return
+        values from the snapshot instead of reading the hardware, so poll() should
+        be called once per frame.
+
+        Returns:
+            The ControllerState for this controller. The same object is reused on
+            every call.
+        """
+
+        self.polled = True
+        self._read_all()
+        self._update_edges()
+
+        if self.recorder is not None:
+            self.recorder.record()
+
+        if self.rumble is not None:
+            self.rumble.update()
+
+        return self.state
+
+    def handle_event(self, event):
+        """
+        Updates an event-driven controller from a pygame event. Pass every event
+        from pygame.event.get() to this function. Events from other controllers
+        and non-joystick events are ignored. Only the inputs named in the event
+        are recomputed, so reading the controller costs nothing between events
+        and the hardware is never swept.
+
+        Returns:
+            True if the event changed this controller's state, False otherwise.
+        """
+
+        if not self.event_driven or event.type not in JOYSTICK_EVENTS:
+            return False
+
+        if getattr(event, "instance_id", event.joy) != self.instance_id:
+            return False
+
+        inputs = self.mirror
+
+        if event.type == JOYAXISMOTION:
+            inputs.axes[event.axis] = event.value
+            reader = self.axis_readers.get(event.axis)
+        elif event.type == JOYHATMOTION:
+            inputs.hats[event.hat] = event.value
+            reader = self.hat_reader if event.hat == 0 else None
+        else:
+            inputs.buttons[event.button] = int(event.type == JOYBUTTONDOWN)
+            reader = self.button_readers.get(event.button)
+
+        if reader is None:
+            return False
+
+        reader()
+
+        if self.latency is not None:
+            self.latency.input_changed(self, self.reader_groups[reader])
+
+        return True
+
+    async def stream(self, rate_hz=60, pump=False):
+        """
+        Polls the controller at a steady rate for use with asyncio. Between polls
+        the coroutine sleeps, so other tasks on the event loop run and no CPU is
+        spent waiting. Don't poll the same controller anywhere else while
+        streaming, or the edge detection will see two frames per tick.
+
+            async for state in my_controller.stream(rate_hz=120):
+                ...
+
+        While streaming, the getters return the values of the latest poll. Once
+        the stream is closed, the controller reads the way it did before, so a
+        controller that wasn't being polled reads the joystick again. A stream
+        left with break is only closed when it is garbage collected, so call its
+        aclose() to go back straight away.
+
+        Args:
+            rate_hz: Polls per second (default 60)
+            pump: Whether to call pygame.event.pump() before each poll. Set this
+                if nothing else handles pygame's events, since SDL only refreshes
+                joystick values when events are pumped. (default False)
+
+        Yields:
+            The controller's ControllerState after each poll.
+        """
+
+        # imported here so games that don't use asyncio don't pay for it
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        period = 1.0 / rate_hz
+        next_time = loop.time()
+
+        if pump:
+            pump_events = import_pygame().event.pump
+
+        # poll() switches the getters to the snapshot; this is undone at the end
+        was_polled = self.polled
+
+        try:
+            while True:
+                if pump:
+                    pump_events()
+
+                yield self.poll()
+
+                next_time += period
+                delay = next_time - loop.time()
+
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                else:
+                    # fell behind; yield to the loop and start counting again
+                    next_time = loop.time()
+                    await asyncio.sleep(0)
+        finally:
+            self.polled = was_polled
+
+    async def wait_for_button(self, button, rate_hz=60, pump=False):
+        """
+        Waits until the button is pressed. Use asyncio.wait_for() to give up
+        after a timeout. Afterwards the controller reads the way it did before,
+        as with stream().
+
+            await my_controller.wait_for_button(xbox360_controller.START)
+
+        Args:
+            button: A button constant such as START.
+            rate_hz: Polls per second while waiting (default 60)
+            pump: See stream(). (default False)
+
+        Returns:
+            The controller's ControllerState from the poll that saw the press.
+        """
+
+        states = self.stream(rate_hz, pump)
+
+        try:
+            async for state in states:
+                if self.just_pressed(button):
+                    return state
+        finally:
+            await states.aclose()
+
+    def just_pressed(self, button):
+        """
+        Returns:
+            True if the button went down between the last two calls to poll().
+        """
+
+        return bool((self.state.button_mask & ~self.previous_mask) >> button & 1)
+
+    def just_released(self, button):
+        """
+        Returns:
+            True if the button went up between the last two calls to poll().
+        """
+
+        return bool((self.previous_mask & ~self.state.button_mask) >> button & 1)
+
+    def held_frames(self, button):
+        """
+        Returns:
+            The number of polls the button has been held for, counting the
+            current one, or 0 if it isn't pressed.
+        """
+
+        if self.state.button_mask >> button & 1:
+            return self.frame - self.press_frames[button] + 1
+
+        return 0
+
+    def get_changed_mask(self):
+        """
+        Returns:
+            A bitmask of the buttons whose state changed between the last two
+            calls to poll(). Bit n is set if button n changed.
+        """
+
+        return self.state.button_mask ^ self.previous_mask
+
     def get_buttons(self):
         """
         Gets the state of each button on the controller.
@@ -157,47 +1076,10 @@ class Controller:
             A tuple with the state of each button. 1 is pressed, 0 is unpressed.
         """
 
-        if platform_id == LINUX:
-            return (self.joystick.get_button(A),
-                    self.joystick.get_button(B),
-                    self.joystick.get_button(X),
-                    self.joystick.get_button(Y),
-                    self.joystick.get_button(LEFT_BUMP),
-                    self.joystick.get_button(RIGHT_BUMP),
-                    self.joystick.get_button(BACK),
-                    self.joystick.get_button(START),
-                    0, # Unused, since Guide only works on Linux
-                    self.joystick.get_button(LEFT_STICK_BTN),
-                    self.joystick.get_button(RIGHT_STICK_BTN))
-
-        elif platform_id == WINDOWS:
-            return (self.joystick.get_button(A),
-                    self.joystick.get_button(B),
-                    self.joystick.get_button(X),
-                    self.joystick.get_button(Y),
-                    self.joystick.get_button(LEFT_BUMP),
-                    self.joystick.get_button(RIGHT_BUMP),
-                    self.joystick.get_button(BACK),
-                    self.joystick.get_button(START),
-                    self.joystick.get_button(LEFT_STICK_BTN),
-                    self.joystick.get_button(RIGHT_STICK_BTN))
-
-        elif platform_id == MAC:
-            return (0, # Unused
-                    0, # Unused
-                    0, # Unused
-                    0, # Unused
-                    self.joystick.get_button(START),
-                    self.joystick.get_button(BACK),
-                    self.joystick.get_button(LEFT_STICK_BTN),
-                    self.joystick.get_button(RIGHT_STICK_BTN),
-                    self.joystick.get_button(LEFT_BUMP),
-                    self.joystick.get_button(RIGHT_BUMP),
-                    0, # Unused
-                    self.joystick.get_button(A),
-                    self.joystick.get_button(B),
-                    self.joystick.get_button(X),
-                    self.joystick.get_button(Y))
+        if not self.polled:
+            self._read_buttons()
+
+        return self.state.buttons
 
     def get_left_stick(self):
         """
@@ -212,10 +1094,10 @@ class Controller:
             Positive values are right and down.
         """
 
-        left_stick_x = self.dead_zone_adjustment(self.joystick.get_axis(LEFT_STICK_X))
-        left_stick_y = self.dead_zone_adjustment(self.joystick.get_axis(LEFT_STICK_Y))
+        if not self.polled:
+            self._read_left_stick()
 
-        return (left_stick_x, left_stick_y)
+        return self.state.left_stick
 
     def get_right_stick(self):
         """
@@ -230,10 +1112,10 @@ class Controller:
             Positive values are right and down.
         """
 
-        right_stick_x = self.dead_zone_adjustment(self.joystick.get_axis(RIGHT_STICK_X))
-        right_stick_y = self.dead_zone_adjustment(self.joystick.get_axis(RIGHT_STICK_Y))
+        if not self.polled:
+            self._read_right_stick()
 
-        return (right_stick_x, right_stick_y)
+        return self.state.right_stick
 
     def get_triggers(self):
         """
@@ -255,33 +1137,10 @@ class Controller:
             simultaneously, then the sum of the trigger pulls is returned.
         """
 
-        trigger_axis = 0.0
+        if not self.polled:
+            self._read_triggers()
 
-        if platform_id == LINUX or platform_id == MAC:
-            left = self.joystick.get_axis(LEFT_TRIGGER)
-            right = self.joystick.get_axis(RIGHT_TRIGGER)
-
-            if left != 0:
-                self.left_trigger_used = True
-            if right != 0:
-                self.right_trigger_used = True
-
-            if not self.left_trigger_used:
-                left = -1
-            if not self.right_trigger_used:
-                right = -1
-
-            trigger_axis = (-1 * left + right) / 2
-
-        elif platform_id == WINDOWS:
-            if version == 2:
-                left = self.joystick.get_axis(LEFT_TRIGGER)
-                right = self.joystick.get_axis(RIGHT_TRIGGER)
-                trigger_axis = (-1 * left + right) / 2
-            else:
-                trigger_axis = -1 * self.joystick.get_axis(TRIGGERS)
-
-        return trigger_axis
+        return self.state.triggers
 
     def get_pad(self):
         """
@@ -293,18 +1152,304 @@ class Controller:
             to have up to two 1s in the returned tuple.
         """
 
-        if platform_id == LINUX or platform_id == WINDOWS:
-            hat_x, hat_y = self.joystick.get_hat(0)
+        if not self.polled:
+            self._read_pad()
+
+        return self.state.pad
+
+    def _mirror_joystick(self):
+        joystick = self.joystick
+        mirror = VirtualJoystick(joystick.get_id(), joystick.get_numaxes(),
+                                 joystick.get_numbuttons(), joystick.get_numhats())
+
+        # one sweep to start from the current state
+        mirror.axes[:] = map(joystick.get_axis, range(joystick.get_numaxes()))
+        mirror.buttons[:] = map(joystick.get_button, range(joystick.get_numbuttons()))
+        mirror.hats[:] = map(joystick.get_hat, range(joystick.get_numhats()))
+
+        return mirror
+
+    def _read_all(self):
+        self._read_buttons()
+        self._read_left_stick()
+        self._read_right_stick()
+        self._read_triggers()
+        self._read_pad()
+
+    def _update_edges(self):
+        state = self.state
+        mask = sum(map(operator.mul, state.buttons, self.button_bits))
+
+        self.previous_mask = state.button_mask
+        state.button_mask = mask
+        self.frame += 1
+
+        # Only buttons that just went down need their press frame recorded.
+        pressed = mask & ~self.previous_mask
+        while pressed:
+            lowest = pressed & -pressed
+            self.press_frames[lowest.bit_length() - 1] = self.frame
+            pressed ^= lowest
+
+    def _read_buttons(self):
+        # Read the named buttons, then spread them out to their button numbers
+        # with 0 in the unused slots.
+        values = (0, *map(self.inputs.get_button, self.layout.button_reads))
+        self.state.buttons = self.layout.button_gather(values)
+
+    def _read_left_stick(self):
+        left_stick_x = self.dead_zone_adjustment(self.inputs.get_axis(self.left_stick_axes[0]))
+        left_stick_y = self.dead_zone_adjustment(self.inputs.get_axis(self.left_stick_axes[1]))
+
+        self.state.left_stick = (left_stick_x, left_stick_y)
+
+    def _read_right_stick(self):
+        right_stick_x = self.dead_zone_adjustment(self.inputs.get_axis(self.right_stick_axes[0]))
+        right_stick_y = self.dead_zone_adjustment(self.inputs.get_axis(self.right_stick_axes[1]))
+
+        self.state.right_stick = (right_stick_x, right_stick_y)
+
+    def _read_split_triggers(self):
+        left = self.inputs.get_axis(self.trigger_axes[0])
+        right = self.inputs.get_axis(self.trigger_axes[1])
+
+        state = self.state
+        state.triggers = (-1 * left + right) / 2
+        state.left_trigger = (left + 1) / 2
+        state.right_trigger = (right + 1) / 2
+
+    def _read_split_lazy_triggers(self):
+        left = self.inputs.get_axis(self.trigger_axes[0])
+        right = self.inputs.get_axis(self.trigger_axes[1])
+
+        if left != 0:
+            self.left_trigger_used = True
+        if right != 0:
+            self.right_trigger_used = True
+
+        if not self.left_trigger_used:
+            left = -1
+        if not self.right_trigger_used:
+            right = -1
+
+        state = self.state
+        state.triggers = (-1 * left + right) / 2
+        state.left_trigger = (left + 1) / 2
+        state.right_trigger = (right + 1) / 2
+
+    def _read_combined_triggers(self):
+        self.state.triggers = -1 * self.inputs.get_axis(self.trigger_axes[0])
+        self.state.split_triggers()
+
+    def _read_hat_pad(self):
+        hat_x, hat_y = self.inputs.get_hat(0)
+
+        self.state.pad = (int(hat_y == 1), int(hat_x == 1), int(hat_y == -1), int(hat_x == -1))
+
+    def _read_button_pad(self):
+        self.state.pad = tuple(map(self.inputs.get_button, self.pad_buttons))
+
+
+def device_key(joystick):
+    """
+    pygame doesn't expose serial numbers or device paths, so this identifies a
+    model of pad rather than one particular pad. Every wired X-Box 360 pad has
+    the same GUID, for example.
+
+    Returns:
+        A key for the kind of pad a joystick is, which stays the same across
+        connections: its GUID, or its name where GUIDs aren't available.
+    """
+
+    if hasattr(joystick, "get_guid"):
+        return joystick.get_guid()
+
+    return joystick.get_name()
+
+
+class ControllerManager:
+    """
+    Owns a Controller for every connected pad and handles pads being plugged in
+    and unplugged. Each pad is given a player slot, and an unplugged pad's slot
+    is kept while there are slots nobody has used. A reconnected pad goes back to
+    a free slot last used by the same model of pad (see device_key()), and gets
+    that slot's Controller object, so references held by the game stay valid.
+    Pads of the same model can't be told apart, so when several identical pads
+    are unplugged they can come back in each other's slots.
+    """
+
+    def __init__(self, max_players=8, dead_zone=0.15, event_driven=False, scan=True, calibrations=None):
+        """
+        Args:
+            max_players: The number of player slots (default 8)
+            dead_zone: The dead zone for each Controller (default 0.15)
+            event_driven: Whether to create event-driven controllers. See
+                Controller.handle_event(). (default False)
+            scan: Whether to add the pygame joysticks that are already connected
+                (default True)
+            calibrations: A calibration.CalibrationStore. Each pad is given its
+                stored calibration when it connects. (default None)
+        """
+
+        self.dead_zone = dead_zone
+        self.event_driven = event_driven
+        self.calibrations = calibrations
+
+        self.controllers = [None] * max_players
+        self.connected = [False] * max_players
+
+        # The device_key() of the pad that last used each slot. A reconnected
+        # pad prefers a free slot with a matching key.
+        self.slot_keys = [None] * max_players
+
+        # instance ID -> slot, for routing events
+        self.slots = {}
+
+        # needed for the hot-plug event types
+        import_pygame()
+
+        if scan:
+            for index in range(pygame.joystick.get_count()):
+                self.add_device(index)
+
+    def add_device(self, device_index):
+        """
+        Opens a device with the current backend and gives it a player slot.
+
+        Returns:
+            The slot number, or None if every slot is taken.
+        """
+
+        return self.add_joystick(backend(device_index))
+
+    def add_joystick(self, joystick):
+        """
+        Gives a joystick a player slot. Adding a joystick that already has a slot
+        does nothing.
+
+        Returns:
+            The slot number, or None if every slot is taken.
+        """
+
+        joystick.init()
+
+        if hasattr(joystick, "get_instance_id"):
+            instance_id = joystick.get_instance_id()
+        else:
+            instance_id = joystick.get_id()
+
+        if instance_id in self.slots:
+            return self.slots[instance_id]
+
+        key = device_key(joystick)
+
+        slot = self._free_slot(key)
+        if slot is None:
+            return None
+
+        calibration = None
+        if self.calibrations is not None:
+            calibration = self.calibrations.get(key)
+
+        controller = self.controllers[slot]
+        if controller is None:
+            controller = Controller(self.dead_zone, joystick, self.event_driven, calibration=calibration)
+            self.controllers[slot] = controller
+        else:
+            controller.calibration = calibration
+            controller.attach(joystick)
+
+        self.connected[slot] = True
+        self.slot_keys[slot] = key
+        self.slots[instance_id] = slot
+
+        return slot
+
+    def remove_device(self, instance_id):
+        """
+        Frees the slot of a device that was unplugged. The slot's Controller is
+        kept, reading as released, until the pad is reconnected.
+
+        Returns:
+            The slot number, or None if the device didn't have a slot.
+        """
+
+        slot = self.slots.pop(instance_id, None)
+
+        if slot is not None:
+            self.connected[slot] = False
+            self.controllers[slot].detach()
+
+        return slot
+
+    def handle_event(self, event):
+        """
+        Handles pygame 2's JOYDEVICEADDED and JOYDEVICEREMOVED events. For
+        event-driven controllers, joystick input events are also passed on to the
+        controller they belong to. Pass every event from pygame.event.get() to
+        this function.
+
+        Returns:
+            The slot number the event applied to, or None.
+        """
+
+        if event.type == JOYDEVICEADDED:
+            return self.add_device(event.device_index)
+
+        if event.type == JOYDEVICEREMOVED:
+            return self.remove_device(event.instance_id)
+
+        if self.event_driven and event.type in JOYSTICK_EVENTS:
+            slot = self.slots.get(getattr(event, "instance_id", event.joy))
+
+            if slot is not None and self.controllers[slot].handle_event(event):
+                return slot
+
+        return None
+
+    def poll(self):
+        """
+        Polls every connected controller. Call this once per frame.
+
+        Returns:
+            A list with the ControllerState of each slot, or None for slots with
+            no pad connected.
+        """
+
+        return [controller.poll() if connected else None
+                for controller, connected in zip(self.controllers, self.connected)]
+
+    def get(self, slot):
+        """
+        Returns:
+            The Controller in the given slot if its pad is connected, None
+            otherwise.
+        """
+
+        if self.connected[slot]:
+            return self.controllers[slot]
+
+        return None
+
+    def get_slot(self, event):
+        """
+        Returns:
+            The slot of the controller that a joystick event came from, or None.
+        """
+
+        return self.slots.get(getattr(event, "instance_id", event.joy))
 
-            up = int(hat_y == 1)
-            right = int(hat_x == 1)
-            down = int(hat_y == -1)
-            left = int(hat_x == -1)
+    def _free_slot(self, key):
+        free = [slot for slot, connected in enumerate(self.connected) if not connected]
 
-        elif platform_id == MAC:
-            up = self.joystick.get_button(PAD_UP)
-            right = self.joystick.get_button(PAD_RIGHT)
-            down = self.joystick.get_button(PAD_DOWN)
-            left = self.joystick.get_button(PAD_LEFT)
+        # a slot this model of pad had, then a slot nobody has used, then any
+        for slot in free:
+            if self.slot_keys[slot] == key:
+                return slot
+        for slot in free:
+            if self.slot_keys[slot] is None:
+                return slot
+        if free:
+            return free[0]
 
-        return up, right, down, left
+        return None